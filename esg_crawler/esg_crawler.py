@@ -13,50 +13,1149 @@ Usage:
 
 import asyncio
 import aiohttp
+import contextlib
+import copy
+import csv
+import gzip
+import hashlib
+import heapq
+import html as html_lib
+import importlib.util
+import io
 import json
 import logging
+import math
+import multiprocessing
+import signal
+import socket
+import sqlite3
 import sys
 import time
+import zlib
 import argparse
-from dataclasses import dataclass, asdict
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict, replace
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterable, AsyncIterable, AsyncIterator, Union
 from urllib.parse import urljoin, urlparse, urlunparse
 import re
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xml.etree import ElementTree
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag, NavigableString
+from bs4.element import PreformattedString
 import asyncpg
 from tqdm import tqdm
 import os
 from dotenv import load_dotenv
 
-# NLP imports for Version 4.0
-try:
-    import nltk
-    from nltk.sentiment import SentimentIntensityAnalyzer
-    from nltk.tokenize import sent_tokenize, word_tokenize
-    from nltk.corpus import stopwords
-    from nltk.stem import WordNetLemmatizer
-    from collections import Counter
-    import numpy as np
-    NLP_AVAILABLE = True
-except ImportError:
-    NLP_AVAILABLE = False
-    print("Warning: NLP libraries not available. Version 4.0 will fall back to Version 3.0 functionality.")
-
 # Load environment variables from .env file
 load_dotenv()
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('esg_crawler.log'),
-        logging.StreamHandler(sys.stdout)
+logger = logging.getLogger(__name__)
+
+# NLP libraries for Version 4.0 are heavy (nltk, numpy, VADER lexicon, WordNet),
+# so they are imported on first use by _load_nlp_libraries() rather than here.
+# NLP_AVAILABLE stays None until the first import attempt.
+NLP_AVAILABLE: Optional[bool] = None
+nltk = None
+np = None
+SentimentIntensityAnalyzer = None
+sent_tokenize = None
+word_tokenize = None
+stopwords = None
+WordNetLemmatizer = None
+
+# Process-wide NLP state shared by every crawler instance
+_nltk_data_checked = False
+_nlp_tools: Optional[Dict[str, Any]] = None
+
+
+def _load_numpy() -> bool:
+    """Import numpy on first use; vectorized scoring needs it even without nltk"""
+    global np
+    
+    if np is None:
+        try:
+            import numpy as _np
+        except ImportError:
+            return False
+        np = _np
+    return True
+
+
+# PDF text extraction (document stage) uses pypdf when installed; checked once on first use
+PDF_AVAILABLE: Optional[bool] = None
+
+
+def _pdf_support_available() -> bool:
+    """Report whether pypdf is installed for the optional document stage"""
+    global PDF_AVAILABLE
+    
+    if PDF_AVAILABLE is None:
+        PDF_AVAILABLE = importlib.util.find_spec('pypdf') is not None
+        if not PDF_AVAILABLE:
+            logger.warning("pypdf not available. Document analysis is skipped (pip install -r requirements-pdf.txt).")
+    return PDF_AVAILABLE
+
+
+PARQUET_AVAILABLE: Optional[bool] = None
+
+
+def _parquet_support_available() -> bool:
+    """Report whether pyarrow is installed for Parquet export"""
+    global PARQUET_AVAILABLE
+    
+    if PARQUET_AVAILABLE is None:
+        PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+    return PARQUET_AVAILABLE
+
+
+def extract_pdf_text(data: bytes, max_pages: int, max_chars: int) -> Dict[str, Any]:
+    """Extract text from the first max_pages pages of a PDF; runs in a document worker process"""
+    from pypdf import PdfReader
+    
+    reader = PdfReader(io.BytesIO(data), strict=False)
+    try:
+        title = (reader.metadata.title if reader.metadata else None) or ""
+    except Exception:
+        title = ""
+    parts = []
+    chars = 0
+    pages_read = 0
+    for page in reader.pages:
+        if pages_read >= max_pages or chars >= max_chars:
+            break
+        text = page.extract_text() or ""
+        parts.append(text)
+        chars += len(text)
+        pages_read += 1
+    
+    title = f"{title}\n{parts[0][:DOCUMENT_TITLE_CHARS]}" if parts else title
+    return {"text": "\n".join(parts)[:max_chars], "title": title, "pages_read": pages_read,
+            "page_count": len(reader.pages)}
+
+
+def _record_document_worker_pid(worker_pid):
+    """Document worker initializer: publish the worker's pid to the crawler"""
+    worker_pid.value = os.getpid()
+
+
+def _load_nlp_libraries() -> bool:
+    """Import the optional NLP libraries on first use and report availability"""
+    global NLP_AVAILABLE, nltk, SentimentIntensityAnalyzer, sent_tokenize, word_tokenize, stopwords, WordNetLemmatizer
+    
+    if NLP_AVAILABLE is not None:
+        return NLP_AVAILABLE
+    
+    try:
+        import nltk as _nltk
+        from nltk.sentiment import SentimentIntensityAnalyzer as _SentimentIntensityAnalyzer
+        from nltk.tokenize import sent_tokenize as _sent_tokenize, word_tokenize as _word_tokenize
+        from nltk.corpus import stopwords as _stopwords
+        from nltk.stem import WordNetLemmatizer as _WordNetLemmatizer
+    except ImportError:
+        _nltk = None
+    
+    if _nltk is None or not _load_numpy():
+        NLP_AVAILABLE = False
+        logger.warning("NLP libraries not available. Version 4.0 will fall back to Version 3.0 functionality.")
+        return NLP_AVAILABLE
+    
+    nltk = _nltk
+    SentimentIntensityAnalyzer = _SentimentIntensityAnalyzer
+    sent_tokenize = _sent_tokenize
+    word_tokenize = _word_tokenize
+    stopwords = _stopwords
+    WordNetLemmatizer = _WordNetLemmatizer
+    NLP_AVAILABLE = True
+    return NLP_AVAILABLE
+
+
+# Companies are sharded across crawler processes by a Knuth multiplicative hash of
+# smm_company_id: the high 16 bits of the low 32 bits of id * multiplier. The same formula
+# is evaluated in SQL (_SHARD_HASH in SHARDED_CRAWLER_QUERIES) and in Python (company_shard),
+# so every host computes identical partitions, for negative ids too (two's complement bits).
+SHARD_HASH_MULTIPLIER = 2654435761
+
+
+def company_shard(company_id: int, shard_count: int) -> int:
+    """Return the 0-based shard index of a company for the given number of shards"""
+    return (((company_id * SHARD_HASH_MULTIPLIER) & 0xFFFFFFFF) >> 16) % shard_count
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a 'K/N' shard spec (K is 1-based) into a 0-based (index, count) tuple"""
+    try:
+        shard_number, shard_count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', expected K/N (e.g. 1/4)")
+    
+    if shard_count < 1 or not 1 <= shard_number <= shard_count:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', K must be between 1 and N")
+    
+    return shard_number - 1, shard_count
+
+
+# Near-duplicate pages (parked domains, registrar placeholders, shared templates) are
+# recognised by a 64-bit simhash over word 3-shingles of the visible text. Fingerprints
+# at most NEAR_DUPLICATE_DISTANCE bits apart count as the same page. Splitting the
+# fingerprint into NEAR_DUPLICATE_DISTANCE + 1 bands guarantees such a pair shares one
+# band exactly, so lookups only compare fingerprints that collide on a band.
+SIMHASH_BITS = 64
+NEAR_DUPLICATE_DISTANCE = 3
+SIMHASH_BANDS = NEAR_DUPLICATE_DISTANCE + 1
+
+
+# Parameterized statements of the hot SQL paths (see CrawlerQueries).
+# In statements that select companies, $1/$2 are always the shard count and index ((1, 0)
+# covers the whole table), so the text of a statement never varies with versions, shards or paging.
+# Unsharded runs use CRAWLER_QUERIES, whose shard filter only compares the parameters
+# (a one-time filter in the plan); sharded runs use SHARDED_CRAWLER_QUERIES, which hash
+# every row. The hash multiplies the 16-bit halves of the id separately, so no product
+# overflows bigint whatever the id.
+_ALL_SHARDS = "$1::int = 1 AND $2::int = 0"
+_SHARD_HASH = f"""((((smm_company_id::bigint & 65535) * {SHARD_HASH_MULTIPLIER}
+                + (((smm_company_id::bigint >> 16) & 65535) * {SHARD_HASH_MULTIPLIER} & 65535) * 65536)
+                & 4294967295) >> 16)"""
+_SHARD_FILTER = f"{_SHARD_HASH} % $1::int = $2::int"
+_COMPANY_FILTER = f"""primary_domain IS NOT NULL
+            AND primary_domain != ''
+            AND {_ALL_SHARDS}"""
+
+# $3: requested versions; true when the company lacks an analysis for any of them
+_MISSING_VERSIONS = """(esg_info IS NULL OR EXISTS (
+                SELECT 1 FROM unnest($3::text[]) AS version
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM jsonb_array_elements(
+                        CASE 
+                            WHEN jsonb_typeof(esg_info) = 'array' THEN esg_info
+                            WHEN esg_info IS NOT NULL THEN jsonb_build_array(esg_info)
+                            ELSE '[]'::jsonb
+                        END
+                    ) AS elem
+                    WHERE elem->>'crawler_version' = version
+                )
+            ))"""
+
+CRAWLER_QUERIES = {
+    # $4: force (all companies), $5: keyset lower bound, $6: limit (NULL = all), $7: offset
+    "select_companies": f"""
+            SELECT smm_company_id, name, primary_domain as website, esg_info
+            FROM smm_companies
+            WHERE {_COMPANY_FILTER}
+            AND ($4::bool OR {_MISSING_VERSIONS})
+            AND smm_company_id > $5::bigint
+            ORDER BY smm_company_id
+            LIMIT $6::bigint OFFSET $7::bigint
+            """,
+    "count_companies": f"""
+            SELECT COUNT(*)
+            FROM smm_companies
+            WHERE {_COMPANY_FILTER}
+            AND ($4::bool OR {_MISSING_VERSIONS})
+            """,
+    # Every company with a website in the shard, streamed through a cursor
+    "select_recrawl_candidates": f"""
+            SELECT smm_company_id, name, primary_domain as website, esg_info
+            FROM smm_companies
+            WHERE {_COMPANY_FILTER}
+            """,
+    "select_export_companies": f"""
+            SELECT smm_company_id, name, primary_domain as website, esg_info
+            FROM smm_companies
+            WHERE esg_info IS NOT NULL
+            AND {_ALL_SHARDS}
+            """,
+    # $3: keyset lower bound, $4: batch size
+    "select_history_batch": f"""
+            SELECT smm_company_id, esg_info::text AS esg_info
+            FROM smm_companies
+            WHERE smm_company_id > $3::bigint
+            AND esg_info IS NOT NULL
+            AND {_ALL_SHARDS}
+            ORDER BY smm_company_id
+            LIMIT $4::bigint
+            """,
+    # Only overwrite rows that were not changed by a crawler since they were read
+    "rewrite_history": """
+            UPDATE smm_companies
+            SET esg_info = $1
+            WHERE smm_company_id = $2
+            AND esg_info = $3::jsonb
+            """,
+    # $3: crawler version, $4: feature schema
+    "select_page_features": f"""
+            SELECT smm_company_id, features, sustainability_links, has_esg_reports
+            FROM esg_page_features
+            WHERE crawler_version = $3::text
+            AND feature_schema = $4::int
+            AND {_ALL_SHARDS}
+            ORDER BY smm_company_id
+            """,
+    # $4: force, $5: job queue version key. Forced runs also re-queue finished jobs, so they
+    # cover the whole table; otherwise existing jobs are left alone (the WHERE is false)
+    "enqueue_jobs": f"""
+            INSERT INTO esg_crawl_jobs (crawler_version, smm_company_id)
+            SELECT $5::text, smm_company_id
+            FROM smm_companies
+            WHERE {_COMPANY_FILTER}
+            AND ($4::bool OR {_MISSING_VERSIONS})
+            ON CONFLICT (crawler_version, smm_company_id) DO UPDATE
+            SET status = 'pending', attempts = 0, leased_by = NULL, lease_expires_at = NULL,
+                last_error = NULL, updated_at = NOW()
+            WHERE $4::bool AND esg_crawl_jobs.status IN ('done', 'failed')
+            """,
+    "select_company": """
+            SELECT smm_company_id, name, primary_domain as website, esg_info
+            FROM smm_companies
+            WHERE smm_company_id = $1::bigint
+            """,
+    # $3: company ids
+    "select_companies_by_ids": f"""
+            SELECT smm_company_id, name, primary_domain as website, esg_info
+            FROM smm_companies
+            WHERE {_COMPANY_FILTER}
+            AND smm_company_id = ANY($3::bigint[])
+            ORDER BY smm_company_id
+            """,
+    "lock_esg_info": """
+            SELECT esg_info FROM smm_companies 
+            WHERE smm_company_id = $1
+            FOR UPDATE
+            """,
+    "update_esg_info": """
+            UPDATE smm_companies 
+            SET esg_info = $1, updated_at = NOW()
+            WHERE smm_company_id = $2
+            """,
+    "version_statistics": f"""
+            SELECT 
+                elem->>'crawler_version' as version,
+                COUNT(DISTINCT smm_company_id) as company_count
+            FROM smm_companies,
+            LATERAL jsonb_array_elements(
+                CASE 
+                    WHEN jsonb_typeof(esg_info) = 'array' THEN esg_info
+                    WHEN esg_info IS NOT NULL THEN jsonb_build_array(esg_info)
+                    ELSE '[]'::jsonb
+                END
+            ) AS elem
+            WHERE {_COMPANY_FILTER}
+            AND elem->>'crawler_version' IS NOT NULL
+            GROUP BY elem->>'crawler_version'
+            ORDER BY elem->>'crawler_version'
+            """,
+    # Page fingerprints, see _store_page_fingerprint / _find_stored_duplicate. BIGINT is signed, so
+    # simhash holds the fingerprint's two's complement; bands are unsigned and fit any BIGINT
+    "upsert_page_fingerprint": f"""
+            INSERT INTO esg_page_fingerprints (smm_company_id, page_url, simhash,
+                {", ".join(f"band{band}" for band in range(SIMHASH_BANDS))})
+            VALUES ($1, $2, $3, {", ".join(f"${band + 4}" for band in range(SIMHASH_BANDS))})
+            ON CONFLICT (smm_company_id) DO UPDATE
+            SET page_url = EXCLUDED.page_url, simhash = EXCLUDED.simhash,
+                {", ".join(f"band{band} = EXCLUDED.band{band}" for band in range(SIMHASH_BANDS))},
+                updated_at = NOW()
+            """,
+    # $1..$SIMHASH_BANDS: bands of the fingerprint, then the company to exclude
+    "select_fingerprint_candidates": f"""
+            SELECT f.smm_company_id, f.page_url, f.simhash, c.esg_info
+            FROM esg_page_fingerprints f
+            JOIN smm_companies c ON c.smm_company_id = f.smm_company_id
+            WHERE ({" OR ".join(f"f.band{band} = ${band + 1}" for band in range(SIMHASH_BANDS))})
+            AND f.smm_company_id != ${SIMHASH_BANDS + 1}
+            """,
+    "upsert_page_features": """
+            INSERT INTO esg_page_features (
+                smm_company_id, crawler_version, page_url, feature_schema, features,
+                sustainability_score, confidence_level, sustainability_links, has_esg_reports
+            )
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+            ON CONFLICT (crawler_version, smm_company_id) DO UPDATE
+            SET page_url = EXCLUDED.page_url,
+                feature_schema = EXCLUDED.feature_schema,
+                features = EXCLUDED.features,
+                sustainability_score = EXCLUDED.sustainability_score,
+                confidence_level = EXCLUDED.confidence_level,
+                sustainability_links = EXCLUDED.sustainability_links,
+                has_esg_reports = EXCLUDED.has_esg_reports,
+                analyzed_at = NOW()
+            """,
+    # Job queue, $1: job queue version key. Expired leases that already used up their
+    # attempts ($2) are parked as failed
+    "reap_expired_jobs": """
+            UPDATE esg_crawl_jobs
+            SET status = 'failed', leased_by = NULL, lease_expires_at = NULL, updated_at = NOW()
+            WHERE crawler_version = $1
+            AND status = 'leased'
+            AND lease_expires_at < NOW()
+            AND attempts >= $2
+            """,
+    # $2: limit, $3: worker id, $4: max attempts, $5: lease seconds
+    "claim_jobs": """
+            WITH claimed AS (
+                SELECT q.crawler_version, q.smm_company_id, c.name, c.primary_domain, c.esg_info
+                FROM esg_crawl_jobs AS q
+                JOIN smm_companies AS c ON c.smm_company_id = q.smm_company_id
+                WHERE q.crawler_version = $1
+                AND q.attempts < $4
+                AND (q.status = 'pending' OR (q.status = 'leased' AND q.lease_expires_at < NOW()))
+                ORDER BY q.smm_company_id
+                LIMIT $2
+                FOR UPDATE OF q SKIP LOCKED
+            )
+            UPDATE esg_crawl_jobs AS j
+            SET status = 'leased',
+                leased_by = $3,
+                lease_expires_at = NOW() + make_interval(secs => $5),
+                attempts = j.attempts + 1,
+                updated_at = NOW()
+            FROM claimed
+            WHERE j.crawler_version = claimed.crawler_version
+            AND j.smm_company_id = claimed.smm_company_id
+            RETURNING claimed.smm_company_id, claimed.name, claimed.primary_domain as website, claimed.esg_info
+            """,
+    # $2: worker id, $3: company ids, $4: lease seconds
+    "renew_leases": """
+            UPDATE esg_crawl_jobs
+            SET lease_expires_at = NOW() + make_interval(secs => $4), updated_at = NOW()
+            WHERE crawler_version = $1
+            AND leased_by = $2
+            AND status = 'leased'
+            AND smm_company_id = ANY($3::bigint[])
+            """,
+    # $2: company id, $3: worker id
+    "complete_job": """
+            UPDATE esg_crawl_jobs
+            SET status = 'done', leased_by = NULL, lease_expires_at = NULL, last_error = NULL, updated_at = NOW()
+            WHERE crawler_version = $1 AND smm_company_id = $2 AND leased_by = $3
+            """,
+    # $2: worker id, $3: company ids, $4: max attempts, $5: error (NULL keeps the last one)
+    "release_jobs": """
+            UPDATE esg_crawl_jobs
+            SET status = CASE WHEN attempts >= $4 THEN 'failed' ELSE 'pending' END,
+                leased_by = NULL,
+                lease_expires_at = NULL,
+                last_error = COALESCE($5, last_error),
+                updated_at = NOW()
+            WHERE crawler_version = $1
+            AND leased_by = $2
+            AND smm_company_id = ANY($3::bigint[])
+            """,
+    "count_active_jobs": """
+            SELECT COUNT(*)
+            FROM esg_crawl_jobs AS q
+            JOIN smm_companies AS c ON c.smm_company_id = q.smm_company_id
+            WHERE q.crawler_version = $1
+            AND (q.status = 'pending' OR (q.status = 'leased' AND q.lease_expires_at >= NOW()))
+            """,
+    # Companies analyzed for every requested version ($2) are those whose version set contains them all
+    "summary_count_companies": """
+            SELECT (COALESCE(SUM(company_count), 0)
+                  - CASE WHEN $1::bool THEN 0
+                         ELSE COALESCE(SUM(company_count) FILTER (WHERE analyzed_versions @> $2::text[]), 0) END)::bigint
+            FROM esg_version_stats
+            """,
+    "summary_version_statistics": """
+            SELECT version, SUM(company_count)::bigint as company_count
+            FROM esg_version_stats, unnest(analyzed_versions) AS version
+            GROUP BY version
+            HAVING SUM(company_count) > 0
+            ORDER BY version
+            """,
+}
+
+SHARDED_CRAWLER_QUERIES = {name: statement.replace(_ALL_SHARDS, _SHARD_FILTER)
+                           for name, statement in CRAWLER_QUERIES.items()}
+
+
+class CrawlerQueries:
+    """
+    Named, parameterized SQL statements with per-statement timings
+    
+    The statement texts never change, so asyncpg's per-connection statement cache
+    prepares each one once per pooled connection and reuses it on every later
+    acquisition. (asyncpg PreparedStatement objects cannot be kept per connection
+    instead: they are invalidated when the connection goes back to the pool.)
+    """
+    
+    def __init__(self, statements: Dict[str, str]):
+        self.statements = statements
+        self.timings: Dict[str, List[float]] = {}  # name -> [calls, total seconds, max seconds]
+    
+    async def _run(self, method: str, conn, name: str, *args):
+        started = time.perf_counter()
+        try:
+            return await getattr(conn, method)(self.statements[name], *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            timing = self.timings.setdefault(name, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += elapsed
+            timing[2] = max(timing[2], elapsed)
+    
+    async def fetch(self, conn, name: str, *args) -> List[asyncpg.Record]:
+        return await self._run("fetch", conn, name, *args)
+    
+    async def fetchrow(self, conn, name: str, *args) -> Optional[asyncpg.Record]:
+        return await self._run("fetchrow", conn, name, *args)
+    
+    async def fetchval(self, conn, name: str, *args) -> Any:
+        return await self._run("fetchval", conn, name, *args)
+    
+    async def execute(self, conn, name: str, *args) -> str:
+        return await self._run("execute", conn, name, *args)
+    
+    async def executemany(self, conn, name: str, args: Iterable[Tuple[Any, ...]]):
+        return await self._run("executemany", conn, name, args)
+    
+    def cursor(self, conn, name: str, *args, prefetch: Optional[int] = None):
+        """Server-side cursor over a statement (inside a transaction); not timed, the caller consumes it"""
+        return conn.cursor(self.statements[name], *args, prefetch=prefetch)
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Calls, mean and max milliseconds per statement"""
+        return {
+            name: {"calls": calls, "mean_ms": round(total / calls * 1000, 2), "max_ms": round(longest * 1000, 2)}
+            for name, (calls, total, longest) in sorted(self.timings.items()) if calls
+        }
+    
+    def log_summary(self):
+        """Log the statement timings of the run"""
+        for name, timing in self.summary().items():
+            logger.info(f"SQL {name}: {timing['calls']} calls, mean {timing['mean_ms']}ms, max {timing['max_ms']}ms")
+
+
+# Typed columns of exported analyses: one row per esg_info entry
+EXPORT_COLUMNS = [
+    ("smm_company_id", "int64"),
+    ("company_name", "string"),
+    ("primary_domain", "string"),
+    ("crawler_version", "string"),
+    ("analysis_timestamp", "timestamp"),
+    ("is_latest", "bool"),  # Latest analysis of this company for this version
+    ("has_esg_reports", "bool"),
+    ("detection_method", "string"),
+    ("sustainability_score", "float64"),
+    ("confidence_level", "float64"),
+    ("cascade_tier", "string"),
+    ("keywords_found", "int32"),
+    ("esg_urls_discovered", "int32"),
+    ("reused_from_company_id", "int64"),
+    ("base_url", "string"),
+    ("is_accessible", "bool"),
+    ("status_code", "int32"),
+    ("content_type", "string"),
+    ("page_size", "int64"),
+    ("language", "string"),
+    ("has_navigation", "bool"),
+    ("sustainability_section_found", "bool"),
+    ("sustainability_links_found", "int32"),
+    ("total_links_found", "int32"),
+    ("response_time", "float64"),
+    ("error_message", "string"),
+    ("content_fingerprint", "string"),
+    ("etag", "string"),
+]
+
+
+def flatten_analysis(company: Dict[str, Any], analysis: Dict[str, Any], is_latest: bool) -> Dict[str, Any]:
+    """Flatten one esg_info entry of a company into the EXPORT_COLUMNS layout"""
+    page = analysis.get('website_analysis') or {}
+    evidence = analysis.get('crawling_evidence') or {}
+    timestamp = analysis.get('analysis_timestamp')
+    try:
+        timestamp = datetime.fromisoformat(timestamp) if timestamp else None
+    except (TypeError, ValueError):
+        timestamp = None
+    if timestamp is not None and timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    keywords = evidence.get('keywords_found')
+    esg_urls = (evidence.get('url_discovery') or {}).get('esg_urls')
+    list_totals = evidence.get('list_totals') or {}  # Uncapped lengths of compacted lists
+    
+    def number(value, kind):
+        try:
+            return kind(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+    
+    return {
+        "smm_company_id": company['smm_company_id'],
+        "company_name": company.get('name'),
+        "primary_domain": company.get('website'),
+        "crawler_version": analysis.get('crawler_version', '1.0'),
+        "analysis_timestamp": timestamp,
+        "is_latest": is_latest,
+        "has_esg_reports": analysis.get('has_esg_reports'),
+        "detection_method": evidence.get('detection_method'),
+        "sustainability_score": number(evidence.get('sustainability_score'), float),
+        "confidence_level": number(evidence.get('confidence_level'), float),
+        "cascade_tier": (evidence.get('cascade') or {}).get('tier'),
+        "keywords_found": len(keywords) if isinstance(keywords, list) else None,
+        "esg_urls_discovered": list_totals.get('url_discovery.esg_urls', len(esg_urls)) if isinstance(esg_urls, list) else None,
+        "reused_from_company_id": number((evidence.get('reused_from') or {}).get('smm_company_id'), int),
+        "base_url": page.get('base_url'),
+        "is_accessible": page.get('is_accessible'),
+        "status_code": number(page.get('status_code'), int),
+        "content_type": page.get('content_type'),
+        "page_size": number(page.get('page_size'), int),
+        "language": page.get('language'),
+        "has_navigation": page.get('has_navigation'),
+        "sustainability_section_found": page.get('sustainability_section_found'),
+        "sustainability_links_found": number(page.get('sustainability_links_found'), int),
+        "total_links_found": number(page.get('total_links_found'), int),
+        "response_time": number(page.get('response_time'), float),
+        "error_message": page.get('error_message'),
+        "content_fingerprint": page.get('content_fingerprint'),
+        "etag": page.get('etag'),
+    }
+
+# Channel the smm_companies trigger notifies with the smm_company_id of new or re-domained companies
+COMPANY_NOTIFY_CHANNEL = "esg_company_changed"
+
+# Re-crawl scheduling: the chance a page changed since its last analysis follows a Poisson
+# process whose rate is the company's observed change rate, smoothed towards one change per
+# RECRAWL_PRIOR_DAYS. The chance is weighted by the last answer: negatives are likeliest to
+# flip (companies start publishing reports), failed fetches may have recovered.
+RECRAWL_PRIOR_CHANGES = 1.0
+RECRAWL_PRIOR_DAYS = 180.0
+RECRAWL_STATUS_WEIGHTS = {"negative": 1.0, "error": 0.8, "positive": 0.5}
+
+PIPELINE_STAGES = ("prefilter", "fetch", "analyze", "sink")
+
+
+def parse_stage_workers(value: str) -> Dict[str, int]:
+    """Parse 'stage=N,...' pipeline worker counts, e.g. 'fetch=32,sink=4'"""
+    workers = {}
+    for part in (part.strip() for part in value.split(',') if part.strip()):
+        stage, _, count = part.partition('=')
+        stage = stage.strip()
+        if stage not in PIPELINE_STAGES:
+            raise argparse.ArgumentTypeError(f"invalid stage '{stage}', choose from {', '.join(PIPELINE_STAGES)}")
+        try:
+            workers[stage] = int(count)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid worker count in '{part}', expected {stage}=N")
+        if workers[stage] < 1:
+            raise argparse.ArgumentTypeError(f"invalid worker count in '{part}', must be at least 1")
+    return workers
+
+# Marker stored in crawling_evidence once it has been written in the compact format
+EVIDENCE_FORMAT = "compact-1"
+
+# Evidence lists that are capped to CrawlerConfig.evidence_list_limit when stored
+CAPPED_EVIDENCE_LISTS = {
+    "quantitative_patterns": ["percentages_found", "targets_found", "metrics_found", "years_found", "numerical_goals"],
+    "document_discovery": ["pdf_documents", "doc_documents", "sustainability_documents"],
+    "url_discovery": ["esg_urls"],
+}
+
+# robots.txt/sitemap discovery limits that do not need tuning per run
+ROBOTS_MAX_BYTES = 512 * 1024
+SITEMAP_CHUNK_SIZE = 64 * 1024
+DISCOVERY_MAX_ESG_URLS = 200  # ESG URLs kept per domain (evidence stores at most evidence_list_limit)
+DISCOVERY_CACHE_MAX_DOMAINS = 10000  # Expired entries are pruned once the cache grows past this
+
+# Navigation/menu container detection shared by the single-pass navigation analysis
+NAV_CONTAINER_TAGS = ('nav', 'ul', 'div')
+NAV_CONTAINER_CLASS_PATTERN = re.compile(r'nav|menu', re.I)
+NAV_PATTERN = re.compile(r'nav', re.I)
+MENU_PATTERN = re.compile(r'menu', re.I)
+
+# Text preparation for the v4 NLP stage: subtrees that never hold page content,
+# block-level tags that delimit text blocks, and a cheap sentence splitter
+BOILERPLATE_TAGS = {'head', 'script', 'style', 'noscript', 'template', 'svg', 'iframe',
+                    'nav', 'header', 'footer', 'aside'}
+BOILERPLATE_ATTR_PATTERN = re.compile(r'cookie|consent|gdpr|footer|breadcrumb|navbar|navigation|\bnav\b|menu|popup|modal', re.I)
+BLOCK_TAGS = {'p', 'div', 'li', 'section', 'article', 'main', 'td', 'th', 'tr', 'br', 'blockquote',
+              'dd', 'dt', 'table', 'ul', 'ol', 'figcaption', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?])\s+')
+
+# Numeric inputs of the v2-v4 scoring formulas, recorded per page in
+# crawling_evidence.scoring_features and used as columns of the batch feature matrix
+SCORING_FEATURES = [
+    # Version 2.0: keyword tiers, regex flags, navigation and title hits
+    "high_impact_keywords", "medium_impact_keywords", "low_impact_keywords",
+    "quantitative_pattern", "targets_pattern", "navigation_matches", "title_matches",
+    # Version 3.0: document discovery and quantitative extraction
+    "total_documents", "sustainability_documents", "percentages", "targets", "numerical_goals",
+    # Version 4.0: NLP sub-scores
+    "nlp_available", "esg_sentiment", "esg_topics", "commitment_strength", "credibility",
+    "forward_statements", "named_entities", "has_verification", "has_specific_metrics",
+]
+# Stored in esg_page_features.feature_schema; bump whenever SCORING_FEATURES changes
+# so --rescore never reads vectors laid out for a different feature list.
+FEATURE_SCHEMA_VERSION = 1
+
+
+def scoring_feature_vector(evidence: Optional[Dict[str, Any]]) -> List[float]:
+    """Return the SCORING_FEATURES vector of a detection's evidence (missing features are 0)"""
+    features = (evidence or {}).get("scoring_features") or {}
+    return [float(features.get(name, 0.0)) for name in SCORING_FEATURES]
+
+
+# Weights, caps and thresholds of the v2-v4 scoring formulas. The per-page detectors
+# use these defaults; --rescore can apply a different definition to stored features.
+DEFAULT_SCORING = {
+    "2.0": {
+        "high_impact_weight": 0.1, "high_impact_cap": 0.4,
+        "medium_impact_weight": 0.05, "medium_impact_cap": 0.3,
+        "low_impact_weight": 0.02, "low_impact_cap": 0.1,
+        "quantitative_bonus": 0.15, "targets_bonus": 0.05,
+        "navigation_weight": 0.1, "title_weight": 0.2,
+        "content_multiplier": 6.0, "navigation_multiplier": 2.0, "title_multiplier": 2.0,
+        "base_confidence": 0.3, "confidence_per_data_point": 0.1,
+        "score_threshold": 2.0, "confidence_threshold": 0.6,
+    },
+    "3.0": {
+        "document_weight": 0.1, "document_cap": 0.3, "sustainability_document_weight": 0.15,
+        "percentage_weight": 0.05, "percentage_cap": 0.2,
+        "target_weight": 0.1, "target_cap": 0.3,
+        "numerical_goal_weight": 0.08, "numerical_goal_cap": 0.25,
+        "document_confidence_weight": 0.1, "document_confidence_cap": 0.2,
+        "target_confidence_weight": 0.05, "target_confidence_cap": 0.1,
+        "score_threshold": 2.5, "confidence_threshold": 0.7,
+    },
+    "4.0": {
+        "sentiment_threshold": 0.1, "sentiment_weight": 0.5, "sentiment_cap": 0.5,
+        "topic_weight": 0.1, "topic_cap": 0.8,
+        "commitment_weight": 0.6, "credibility_weight": 0.4, "nlp_score_cap": 2.0,
+        "forward_statement_weight": 0.05, "forward_statement_cap": 0.15,
+        "entity_weight": 0.01, "entity_cap": 0.1,
+        "verification_bonus": 0.1, "specific_metrics_bonus": 0.05, "nlp_confidence_cap": 0.3,
+        "score_threshold": 3.0, "confidence_threshold": 0.75, "commitment_threshold": 0.7,
+    },
+}
+
+
+def merge_scoring(overrides: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, Dict[str, float]]:
+    """Return DEFAULT_SCORING with per-version overrides applied"""
+    scoring = {version: dict(weights) for version, weights in DEFAULT_SCORING.items()}
+    for version, weights in (overrides or {}).items():
+        if version not in scoring:
+            raise ValueError(f"Unknown scoring version '{version}'")
+        unknown = set(weights) - set(scoring[version])
+        if unknown:
+            raise ValueError(f"Unknown scoring parameters for version {version}: {', '.join(sorted(unknown))}")
+        scoring[version].update(weights)
+    return scoring
+
+
+def score_feature_matrix(features, version: str,
+                         scoring: Optional[Dict[str, Dict[str, float]]] = None) -> Tuple[Any, Any, Any]:
+    """
+    Vectorized v2-v4 scoring over a (pages x SCORING_FEATURES) numpy matrix
+    
+    Mirrors _detect_esg_content_v2/_v3/_v4 (including the rounding v3 and v4
+    inherit from the stored v2 values) and returns (scores, confidences, has_esg)
+    arrays. Requires numpy, loaded by _load_numpy().
+    """
+    scoring = scoring or DEFAULT_SCORING
+    f = {name: features[:, i] for i, name in enumerate(SCORING_FEATURES)}
+    
+    # Version 2.0
+    w = scoring["2.0"]
+    content_quality = (
+        np.minimum(w["high_impact_cap"], f["high_impact_keywords"] * w["high_impact_weight"])
+        + np.minimum(w["medium_impact_cap"], f["medium_impact_keywords"] * w["medium_impact_weight"])
+        + np.minimum(w["low_impact_cap"], f["low_impact_keywords"] * w["low_impact_weight"])
+        + f["quantitative_pattern"] * w["quantitative_bonus"]
+        + f["targets_pattern"] * w["targets_bonus"]
+    )
+    nav_score = f["navigation_matches"] * w["navigation_weight"]
+    title_score = f["title_matches"] * w["title_weight"]
+    score = np.round(np.minimum(10.0, content_quality * w["content_multiplier"]
+                                + nav_score * w["navigation_multiplier"]
+                                + title_score * w["title_multiplier"]), 2)
+    data_points = (f["high_impact_keywords"] + f["medium_impact_keywords"] + f["low_impact_keywords"]
+                   + f["navigation_matches"] + f["title_matches"])
+    confidence = np.round(np.minimum(1.0, w["base_confidence"] + data_points * w["confidence_per_data_point"]), 3)
+    has_esg = (score >= w["score_threshold"]) | (confidence >= w["confidence_threshold"])
+    if version == "2.0":
+        return score, confidence, has_esg
+    
+    # Version 3.0
+    w = scoring["3.0"]
+    doc_score = (
+        np.where(f["total_documents"] > 0, np.minimum(f["total_documents"] * w["document_weight"], w["document_cap"]), 0.0)
+        + f["sustainability_documents"] * w["sustainability_document_weight"]
+    )
+    quant_score = (
+        np.minimum(f["percentages"] * w["percentage_weight"], w["percentage_cap"])
+        + np.minimum(f["targets"] * w["target_weight"], w["target_cap"])
+        + np.minimum(f["numerical_goals"] * w["numerical_goal_weight"], w["numerical_goal_cap"])
+    )
+    score = np.minimum(score + doc_score + quant_score, 10.0)
+    confidence = np.minimum(
+        confidence
+        + np.minimum(f["sustainability_documents"] * w["document_confidence_weight"], w["document_confidence_cap"])
+        + np.minimum(f["targets"] * w["target_confidence_weight"], w["target_confidence_cap"]),
+        1.0
+    )
+    has_esg = (score >= w["score_threshold"]) | (confidence >= w["confidence_threshold"]) | has_esg
+    if version == "3.0":
+        return score, confidence, has_esg
+    
+    # Version 4.0 (NLP terms only count for pages where the NLP stage produced results)
+    w = scoring["4.0"]
+    nlp = f["nlp_available"] > 0
+    sentiment = f["esg_sentiment"]
+    nlp_score = np.minimum(
+        np.where(sentiment > w["sentiment_threshold"], np.minimum(sentiment * w["sentiment_weight"], w["sentiment_cap"]), 0.0)
+        + np.minimum(f["esg_topics"] * w["topic_weight"], w["topic_cap"])
+        + f["commitment_strength"] * w["commitment_weight"]
+        + f["credibility"] * w["credibility_weight"],
+        w["nlp_score_cap"]
+    )
+    nlp_confidence = np.minimum(
+        np.minimum(f["forward_statements"] * w["forward_statement_weight"], w["forward_statement_cap"])
+        + np.minimum(f["named_entities"] * w["entity_weight"], w["entity_cap"])
+        + f["has_verification"] * w["verification_bonus"]
+        + f["has_specific_metrics"] * w["specific_metrics_bonus"],
+        w["nlp_confidence_cap"]
+    )
+    score = np.minimum(score + np.where(nlp, nlp_score, 0.0), 10.0)
+    confidence = np.minimum(confidence + np.where(nlp, nlp_confidence, 0.0), 1.0)
+    has_esg = ((score >= w["score_threshold"]) | (confidence >= w["confidence_threshold"])
+               | (f["commitment_strength"] >= w["commitment_threshold"]) | has_esg)
+    return score, confidence, has_esg
+
+
+# Keyword tiers of the v2 content-quality score, also used to scan report documents
+SUSTAINABILITY_KEYWORD_TIERS = {
+    'high_impact': [
+        'sustainability report', 'carbon footprint', 'net zero', 
+        'science-based targets', 'ESG strategy', 'climate action'
+    ],
+    'medium_impact': [
+        'green initiatives', 'renewable energy', 'energy efficiency',
+        'waste reduction', 'circular economy'
+    ],
+    'low_impact': [
+        'eco-friendly', 'sustainable practices', 'environmental awareness'
     ]
+}
+
+# Document stage: words in a PDF's link text or URL that make it a likely ESG report
+REPORT_RANKING_TERMS = {
+    'sustainability report': 3, 'esg report': 3, 'impact report': 3, 'csr report': 3,
+    'responsibility report': 3, 'climate report': 3,
+    'sustainability': 2, 'esg': 2, 'csr': 2, 'climate': 2, 'tcfd': 2, 'environmental': 1,
+    'annual report': 1, 'annual-report': 1,
+}
+DOCUMENT_CHUNK_SIZE = 64 * 1024
+# A PDF confirms has_esg_reports only when its title (metadata or the opening text of its first
+# page) names an ESG report and its text cites a reporting framework or standard disclosure.
+# Annual reports and brochures that merely mention "our sustainability report" do not.
+DOCUMENT_TITLE_CHARS = 600
+REPORT_TYPE_PATTERN = re.compile(
+    r'\b(gri|sasb|tcfd|issb|esrs|csrd|cdp|ghg protocol|scope [123]|un global compact'
+    r'|sustainable development goals|materiality assessment)\b'
 )
-logger = logging.getLogger(__name__)
+
+# Short pages (blank, script-only, a title and a cookie banner) share most of their shingles with
+# unrelated short pages, so they are not fingerprinted
+SIMHASH_MIN_TOKENS = 50
+INVISIBLE_MARKUP_PATTERN = re.compile(r'<(script|style|noscript|template|svg)\b.*?</\1\s*>|<!--.*?-->', re.I | re.S)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def page_simhash(html: str) -> Optional[int]:
+    """Return the simhash of a page's visible text, computed from raw HTML without building a DOM"""
+    text = html_lib.unescape(TAG_PATTERN.sub(' ', INVISIBLE_MARKUP_PATTERN.sub(' ', html)))
+    tokens = WORD_PATTERN.findall(text.lower())
+    if len(tokens) < SIMHASH_MIN_TOKENS:
+        return None
+    
+    shingles = {' '.join(tokens[i:i + 3]) for i in range(len(tokens) - 2)}
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big')
+              for shingle in shingles]
+    
+    # Each bit of the fingerprint is the majority vote of that bit over all shingle hashes
+    if _load_numpy():
+        bit_matrix = np.unpackbits(np.array(hashes, dtype='>u8').view(np.uint8).reshape(-1, 8), axis=1)
+        bit_counts = bit_matrix.sum(axis=0).tolist()
+    else:
+        bit_counts = [sum((h >> (SIMHASH_BITS - 1 - bit)) & 1 for h in hashes) for bit in range(SIMHASH_BITS)]
+    
+    fingerprint = 0
+    for count in bit_counts:
+        fingerprint = (fingerprint << 1) | (count * 2 > len(hashes))
+    return fingerprint
+
+
+def simhash_bands(fingerprint: int) -> List[int]:
+    """Split a fingerprint into SIMHASH_BANDS equal-width bands"""
+    width = SIMHASH_BITS // SIMHASH_BANDS
+    return [(fingerprint >> (width * band)) & ((1 << width) - 1) for band in range(SIMHASH_BANDS)]
+
+
+def simhash_distance(a: int, b: int) -> int:
+    """Hamming distance between two fingerprints"""
+    return bin(a ^ b).count('1')
+
+
+class SimhashIndex:
+    """In-memory near-duplicate index mapping fingerprints to arbitrary values, evicting the oldest entries"""
+    
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self._bands: List[Dict[int, List[Tuple[int, Any]]]] = [{} for _ in range(SIMHASH_BANDS)]
+        self._entries: deque = deque()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def clear(self):
+        """Drop every indexed fingerprint"""
+        for band in self._bands:
+            band.clear()
+        self._entries.clear()
+    
+    def add(self, fingerprint: int, value: Any):
+        entry = (fingerprint, value)
+        for band_index, band in enumerate(simhash_bands(fingerprint)):
+            self._bands[band_index].setdefault(band, []).append(entry)
+        self._entries.append(entry)
+        
+        if len(self._entries) > self.max_entries:
+            oldest = self._entries.popleft()
+            for band_index, band in enumerate(simhash_bands(oldest[0])):
+                bucket = self._bands[band_index][band]
+                bucket.remove(oldest)
+                if not bucket:
+                    del self._bands[band_index][band]
+    
+    def find(self, fingerprint: int, accept: Optional[Callable[[Any], bool]] = None) -> Optional[Tuple[Any, int]]:
+        """Return (value, distance) of the closest indexed near-duplicate accepted by accept(value)"""
+        best = None
+        for band_index, band in enumerate(simhash_bands(fingerprint)):
+            for candidate, value in self._bands[band_index].get(band, ()):
+                distance = simhash_distance(fingerprint, candidate)
+                if distance > NEAR_DUPLICATE_DISTANCE or (best and best[1] <= distance):
+                    continue
+                if accept is None or accept(value):
+                    best = (value, distance)
+        return best
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on in-flight homepage fetches
+    
+    After each window of completed fetches (at least one per allowed slot) the limit
+    grows by one while the window's p95 latency stays within latency_budget and its
+    overload error rate within error_budget, and is halved otherwise. Latency percentiles
+    only count successful fetches (failures are what the error rate measures), and
+    fetches started before the last decrease are not held against the new limit. Recent
+    successful latencies also provide the p99 after which a slow fetch is hedged.
+    """
+    
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 latency_budget: float = 7.5, error_budget: float = 0.1, min_window: int = 20):
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_budget = latency_budget
+        self.error_budget = error_budget
+        self.min_window = min_window
+        self.in_flight = 0
+        self.hedged = 0
+        self._condition = asyncio.Condition()
+        self._window: List[Tuple[float, bool]] = []
+        self._recent_latencies: deque = deque(maxlen=200)
+        self._last_decrease = 0.0
+    
+    async def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to pass to release()"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return time.monotonic()
+    
+    async def release(self, started: float, failed: bool):
+        """Record a finished fetch and adjust the limit once a window is complete"""
+        latency = time.monotonic() - started
+        async with self._condition:
+            self.in_flight -= 1
+            if not failed:
+                self._recent_latencies.append(latency)
+            if started >= self._last_decrease:
+                self._window.append((latency, failed))
+                if len(self._window) >= max(int(self.limit), self.min_window):
+                    self._adjust()
+            self._condition.notify_all()
+    
+    def hedge_delay(self) -> Optional[float]:
+        """p99 of recent fetch latencies, or None until enough fetches have completed"""
+        if len(self._recent_latencies) < 20:
+            return None
+        return self._percentile(self._recent_latencies, 0.99)
+    
+    @staticmethod
+    def _percentile(values, fraction: float) -> float:
+        ordered = sorted(values)
+        return ordered[max(0, math.ceil(len(ordered) * fraction) - 1)]
+    
+    def _adjust(self):
+        latencies = [latency for latency, failed in self._window if not failed]
+        p95 = self._percentile(latencies, 0.95) if latencies else 0.0
+        error_rate = sum(failed for _, failed in self._window) / len(self._window)
+        previous = int(self.limit)
+        
+        if p95 <= self.latency_budget and error_rate <= self.error_budget:
+            self.limit = min(float(self.maximum), self.limit + 1)
+        else:
+            self.limit = max(float(self.minimum), self.limit / 2)
+            self._last_decrease = time.monotonic()
+        self._window.clear()
+        
+        if int(self.limit) != previous:
+            logger.info(f"Fetch concurrency {previous} -> {int(self.limit)} "
+                        f"(p95 {p95:.2f}s, error rate {error_rate:.0%}, hedged so far {self.hedged})")
+
+
+class LoopLagMonitor:
+    """
+    Heartbeat that measures event-loop scheduling delay
+    
+    Every interval the heartbeat records how late it woke up. Synchronous sections of
+    the crawler (parsing, detection, serialization) report their duration through
+    section(); when a heartbeat is later than threshold, the longest section that ran
+    since the previous heartbeat is recorded as the stall's stage and company.
+    """
+    
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, max_events: int = 10,
+                 max_samples: int = 100000):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_events = max_events
+        self.samples: deque = deque(maxlen=max_samples)
+        self.stalls = 0
+        self.events: List[Tuple[float, str, str, float]] = []  # Worst stalls: (lag, stage, label, section time)
+        self._sections: deque = deque(maxlen=1000)
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start the heartbeat on the running loop"""
+        if self._task is None:
+            self._sections.clear()
+            self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+    
+    async def stop(self):
+        """Stop the heartbeat"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    @contextlib.contextmanager
+    def section(self, stage: str, label: Any = ""):
+        """Time a synchronous section so a stall it causes can be attributed to it"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._sections.append((time.perf_counter() - started, stage, str(label)))
+    
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.samples.append(lag)
+            sections = list(self._sections)
+            self._sections.clear()
+            
+            if lag >= self.threshold:
+                self.stalls += 1
+                duration, stage, label = max(sections, default=(0.0, "unattributed", ""))
+                logger.warning(f"Event loop lagged {lag * 1000:.0f}ms; longest section: {stage} {label} ({duration * 1000:.0f}ms)")
+                self.events.append((lag, stage, label, duration))
+                self.events.sort(key=lambda event: event[0], reverse=True)
+                del self.events[self.max_events:]
+    
+    def summary(self) -> Dict[str, Any]:
+        """Lag percentiles in milliseconds, stall count and the worst stalls"""
+        if not self.samples:
+            return {"samples": 0, "stalls": 0, "worst": []}
+        ordered = sorted(self.samples)
+        
+        def percentile(fraction: float) -> float:
+            return round(ordered[max(0, math.ceil(len(ordered) * fraction) - 1)] * 1000, 1)
+        
+        return {
+            "samples": len(ordered),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(ordered[-1] * 1000, 1),
+            "stalls": self.stalls,
+            "worst": [{"lag_ms": round(lag * 1000, 1), "stage": stage, "company": label,
+                       "section_ms": round(duration * 1000, 1)}
+                      for lag, stage, label, duration in self.events]
+        }
+    
+    def log_summary(self):
+        """Log the lag percentiles and the worst stalls"""
+        summary = self.summary()
+        if not summary["samples"]:
+            return
+        logger.info(f"Event loop lag over {summary['samples']} heartbeats: p50 {summary['p50_ms']}ms, "
+                    f"p95 {summary['p95_ms']}ms, p99 {summary['p99_ms']}ms, max {summary['max_ms']}ms; "
+                    f"{summary['stalls']} stalls over {self.threshold * 1000:.0f}ms")
+        for event in summary["worst"][:5]:
+            logger.info(f"  {event['lag_ms']}ms lag during {event['stage']} {event['company']} ({event['section_ms']}ms section)")
+
+
+SUPPORTED_VERSIONS = ['1.0', '2.0', '3.0', '4.0']
+
+
+def parse_versions(value: str) -> List[str]:
+    """Parse a comma-separated list of crawler versions, e.g. '1.0,3.0,4.0'"""
+    versions = []
+    for version in (part.strip() for part in value.split(',')):
+        if version not in SUPPORTED_VERSIONS:
+            raise argparse.ArgumentTypeError(f"invalid version '{version}', choose from {', '.join(SUPPORTED_VERSIONS)}")
+        if version not in versions:
+            versions.append(version)
+    
+    if not versions:
+        raise argparse.ArgumentTypeError("at least one version is required")
+    
+    return versions
+
+
+def install_uvloop() -> bool:
+    """Make asyncio.run() use uvloop when it is installed; returns whether it was installed"""
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("uvloop is not installed (pip install uvloop); using the default asyncio event loop")
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info(f"Using uvloop {uvloop.__version__} event loop")
+    return True
+
+
+def setup_logging():
+    """Configure file and console logging for CLI runs"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('esg_crawler.log'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
 
 @dataclass
 class CrawlerConfig:
@@ -66,6 +1165,46 @@ class CrawlerConfig:
     request_delay: float = 1.0
     timeout: int = 15
     user_agent: str = "ESGReportBot/1.0"
+    compact_evidence: bool = False  # Store crawling evidence in the compact encoding (EVIDENCE_FORMAT)
+    evidence_list_limit: int = 25  # Max items kept per evidence list by the compact encoding
+    keep_analyses_per_version: int = 0  # Latest analyses kept per version in esg_info (0 = keep all)
+    cascade: bool = False  # v4: decide from cheap tiers first, run NLP only for ambiguous pages
+    cascade_negative_score: float = 1.0  # Below this score (and confidence) a page may be a confident negative
+    cascade_negative_confidence: float = 0.45  # Both are also capped by the v4 thresholds minus the largest NLP boosts
+    nlp_token_budget: int = 2000  # Max whitespace tokens of ESG-relevant text passed to the NLP stage
+    nlp_context_sentences: int = 1  # Neighbouring sentences kept around each ESG keyword hit
+    store_features: bool = False  # Persist each page's scoring feature vector to esg_page_features (created on first write)
+    dedupe_pages: bool = False  # Reuse the analysis of another company's near-duplicate page seen earlier in the run
+    dedupe_store: bool = False  # Also look up and record fingerprints in esg_page_fingerprints
+    dedupe_index_size: int = 5000  # Pages kept in the in-run near-duplicate index
+    store_fingerprints: bool = False  # Fingerprint pages without dedupe, so --recrawl can detect page changes
+    url_result_cache_size: int = 1000  # Completed per-URL analyses kept within a batch for companies sharing a website
+    sitemap_discovery: bool = False  # Find ESG pages via robots.txt Sitemap entries and sitemap XML
+    discovery_cache_ttl: int = 3600  # Seconds robots.txt/sitemap discovery results are reused per domain
+    sitemap_max_files: int = 5  # Sitemaps (including sitemap index children) read per domain
+    sitemap_max_bytes: int = 5_000_000  # Decompressed bytes read per sitemap
+    sitemap_max_urls: int = 50000  # Sitemap URLs scanned per domain
+    analyze_documents: bool = False  # Open the top-ranked sustainability PDFs (v3+) and scan their text
+    document_max_count: int = 2  # PDFs analyzed per site
+    document_max_bytes: int = 8_000_000  # Download cap per PDF; PDFs larger than this (per HEAD) are skipped
+    document_max_pages: int = 15  # Pages of text extracted per PDF
+    document_max_chars: int = 200_000  # Characters of extracted text scanned per PDF
+    document_timeout: int = 60  # Seconds allowed per PDF download and per text extraction
+    adaptive_concurrency: bool = False  # Process companies concurrently, with AIMD-limited homepage fetches
+    max_concurrency: int = 32  # Upper bound of the adaptive fetch limit
+    latency_budget: Optional[float] = None  # p95 fetch latency (s) above which concurrency backs off (default timeout/2)
+    hedge_requests: bool = False  # Re-issue fetches still running past the recent p99 latency
+    serve_workers: int = 4  # Service mode: companies analyzed concurrently
+    serve_queue_size: int = 1000  # Service mode: queued companies before requests are rejected
+    pipeline_prefilter_workers: int = 8  # Pipeline mode: concurrent DNS lookups
+    pipeline_fetch_workers: int = 16  # Pipeline mode: concurrent homepage fetches (further limited by adaptive concurrency)
+    pipeline_analyze_workers: int = 1  # Pipeline mode: parse/detection workers (CPU-bound on the event loop)
+    pipeline_sink_workers: int = 2  # Pipeline mode: concurrent database writes
+    pipeline_queue_size: int = 100  # Pipeline mode: capacity of each stage's inbox
+    pipeline_report_interval: float = 30.0  # Pipeline mode: seconds between queue depth log lines
+    summary_stats: bool = False  # Answer counts from esg_version_stats when --refresh-stats installed it (unsharded runs)
+    loop_monitor: bool = False  # Measure event-loop lag with a heartbeat and report it when the run ends
+    loop_lag_threshold: float = 0.1  # Heartbeat lag (s) logged as a stall with the section that caused it
 
 @dataclass
 class WebsiteAnalysis:
@@ -82,6 +1221,9 @@ class WebsiteAnalysis:
     total_links_found: int = 0
     response_time: Optional[float] = None
     error_message: Optional[str] = None
+    content_fingerprint: Optional[str] = None  # Hex simhash of the visible text (near-duplicate detection)
+    etag: Optional[str] = None  # Homepage validators, compared across analyses by the re-crawl scheduler
+    last_modified: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
@@ -105,330 +1247,1762 @@ class ESGReportAnalysisResult:
         """Convert to dictionary"""
         return asdict(self)
 
-class ESGReportCrawler:
-    """Standalone ESG report crawler for database operations"""
+# Completed analyses shared by the companies of one batch or request, oldest first:
+# (normalized URL, versions) -> {version: result}. Callers own it (an OrderedDict), so
+# finishing one batch never drops the results another batch is still using.
+URLResults = Dict[Tuple[str, Tuple[str, ...]], Dict[str, ESGReportAnalysisResult]]
+
+@dataclass
+class PipelineItem:
+    """A company moving through the crawl pipeline"""
+    company: Dict[str, Any]
+    versions: List[str]
+    collection_timestamp: str
+    fetched: Optional[Tuple[WebsiteAnalysis, Optional[str], Optional[Dict[str, Any]]]] = None
+    results: Optional[Dict[str, ESGReportAnalysisResult]] = None  # Set once analyzed (or failed); later stages pass it on
+    flight: Optional[asyncio.Future] = None  # Shared analysis of the item's URL, resolved when the item is analyzed
+
+
+class PipelineStage:
+    """One crawl pipeline stage: a bounded inbox drained by a fixed number of workers"""
     
-    def __init__(self, config: CrawlerConfig = None, version: str = "1.0"):
-        self.config = config or CrawlerConfig()
-        self.db_pool = None
-        self.version = version
-        
-        # ESG/Sustainability-related URL patterns for detection
-        self.esg_url_patterns = [
-            r'/sustainability',
-            r'/esg',
-            r'/csr',
-            r'/corporate-responsibility',
-            r'/environmental',
-            r'/social-responsibility',
-            r'/governance',
-            r'/annual-report',
-            r'/impact-report',
-            r'/investor-relations',
-            r'/responsibility',
-            r'/climate',
-            r'/carbon'
-        ]
-        
-        # Keywords that indicate ESG/sustainability reports
-        self.esg_keywords = [
-            'sustainability report',
-            'esg report',
-            'csr report',
-            'environmental report',
-            'social responsibility report',
-            'annual sustainability',
-            'impact report',
-            'corporate responsibility report',
-            'governance report',
-            'climate report',
-            'carbon report',
-            'environmental social governance'
-        ]
+    def __init__(self, name: str, workers: int, queue_size: int,
+                 handle: Callable[[PipelineItem], Any]):
+        self.name = name
+        self.workers = max(1, workers)
+        self.handle = handle  # Coroutine returning the item for the next stage, or None to drop it
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.failed = 0
+        self.busy = 0.0  # Seconds spent in handle() across workers
+        self.blocked = 0.0  # Seconds spent waiting for room downstream (backpressure)
+        self.peak_depth = 0
     
-    async def init_database(self):
-        """Initialize database connection pool"""
-        try:
-            # Database configuration from environment variables
-            db_config = {
-                'host': os.getenv('DB_HOST', 'localhost'),
-                'port': int(os.getenv('DB_PORT', 5432)),
-                'database': os.getenv('DB_NAME', 'nexus'),
-                'user': os.getenv('DB_USER', 'postgres'),
-                'password': os.getenv('DB_PASSWORD', ''),
-            }
+    async def put(self, item: Optional[PipelineItem]) -> float:
+        """Queue an item (None closes one worker), waiting while the inbox is full; returns the wait"""
+        started = time.monotonic()
+        await self.queue.put(item)
+        self.peak_depth = max(self.peak_depth, self.queue.qsize())
+        return time.monotonic() - started
+    
+    async def close(self):
+        """Tell every worker that no more items will arrive"""
+        for _ in range(self.workers):
+            await self.queue.put(None)
+    
+    async def run(self, downstream: Optional["PipelineStage"]):
+        """Process items until closed, then close the downstream stage"""
+        await asyncio.gather(*(self._work(downstream) for _ in range(self.workers)))
+        if downstream is not None:
+            await downstream.close()
+    
+    async def _work(self, downstream: Optional["PipelineStage"]):
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                return
             
-            self.db_pool = await asyncpg.create_pool(
-                **db_config,
-                min_size=1,
-                max_size=10,
-                command_timeout=60
+            started = time.monotonic()
+            try:
+                output = await self.handle(item)
+            except Exception as e:
+                self.failed += 1
+                output = None
+                logger.error(f"Pipeline stage {self.name} failed for company {item.company['smm_company_id']}: {e}")
+            self.busy += time.monotonic() - started
+            self.processed += 1
+            
+            if output is not None and downstream is not None:
+                self.blocked += await downstream.put(output)
+    
+    def depth(self) -> str:
+        """Current inbox depth, e.g. 'fetch 12/100'"""
+        return f"{self.name} {self.queue.qsize()}/{self.queue.maxsize}"
+    
+    def summary(self) -> str:
+        """Totals for the end-of-run log"""
+        return (f"{self.name}: {self.processed} items, {self.failed} failed, {self.workers} workers, "
+                f"busy {self.busy:.1f}s, blocked downstream {self.blocked:.1f}s, "
+                f"peak queue {self.peak_depth}/{self.queue.maxsize}")
+
+# Companies read per SQLite query and writes per SQLite commit in DB-free runs
+SQLITE_PAGE_SIZE = 1000
+SQLITE_COMMIT_EVERY = 500
+
+
+def _open_text(path: str, mode: str = "rt"):
+    """Open a text file, gzip-compressed when the name ends in .gz"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def _company_from_record(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Normalize a file record into the get_companies_to_process format; None without id or website"""
+    company_id = record.get('smm_company_id', record.get('id'))
+    website = record.get('website') or record.get('primary_domain')
+    if company_id in (None, '') or not website or not str(website).strip():
+        return None
+    
+    esg_info = record.get('esg_info')
+    if isinstance(esg_info, str):
+        try:
+            esg_info = json.loads(esg_info) if esg_info.strip() else None
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring unreadable esg_info of company {company_id}")
+            esg_info = None
+    return {'smm_company_id': int(company_id), 'name': record.get('name') or '',
+            'website': str(website).strip(), 'esg_info': esg_info}
+
+
+def _arrow_export_schema():
+    """Import pyarrow lazily and return (pyarrow, pyarrow.parquet, schema of EXPORT_COLUMNS)"""
+    if not _parquet_support_available():
+        raise RuntimeError("Parquet output requires pyarrow (pip install -r requirements-export.txt)")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    arrow_types = {"int64": pa.int64(), "int32": pa.int32(), "float64": pa.float64(), "bool": pa.bool_(),
+                   "string": pa.string(), "timestamp": pa.timestamp("us")}
+    return pa, pq, pa.schema([(name, arrow_types[kind]) for name, kind in EXPORT_COLUMNS])
+
+
+class CompanySource(ABC):
+    """Where a run reads companies from; batches use the get_companies_to_process row format"""
+    
+    uses_database = False
+    
+    async def open(self):
+        pass
+    
+    async def close(self):
+        pass
+    
+    async def count(self, crawler: "ESGReportCrawler", force_reanalysis: bool) -> Optional[int]:
+        """Companies the run will see, or None when unknown without reading the whole source"""
+        return None
+    
+    async def get(self, crawler: "ESGReportCrawler", company_id: int) -> Optional[Dict[str, Any]]:
+        """One company by id (ignoring shard and versions), or None when it is not in the source"""
+        return None
+    
+    @abstractmethod
+    def batches(self, crawler: "ESGReportCrawler", batch_size: int,
+                force_reanalysis: bool) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield batches of companies in this crawler's shard that need analysis"""
+
+
+class DatabaseCompanySource(CompanySource):
+    """smm_companies through the crawler's asyncpg pool (the default source)"""
+    
+    uses_database = True
+    
+    async def count(self, crawler: "ESGReportCrawler", force_reanalysis: bool) -> Optional[int]:
+        return await crawler.get_total_companies_count(force_reanalysis)
+    
+    async def get(self, crawler: "ESGReportCrawler", company_id: int) -> Optional[Dict[str, Any]]:
+        return await crawler.get_company(company_id)
+    
+    async def batches(self, crawler: "ESGReportCrawler", batch_size: int, force_reanalysis: bool):
+        # Keyset paging: rows analyzed meanwhile drop out of the selection without shifting pages
+        after_id = None
+        while True:
+            companies = await crawler.get_companies_to_process(limit=batch_size, after_id=after_id,
+                                                               force_reanalysis=force_reanalysis)
+            if not companies:
+                return
+            yield companies
+            after_id = companies[-1]['smm_company_id']
+
+
+class FileCompanySource(CompanySource):
+    """Companies from a local file, filtered by shard and missing versions like the SQL selection"""
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    @abstractmethod
+    def records(self) -> Iterable[Dict[str, Any]]:
+        """Raw records of the file in order, before normalization and filtering"""
+    
+    async def get(self, crawler: "ESGReportCrawler", company_id: int) -> Optional[Dict[str, Any]]:
+        for record in self.records():
+            company = _company_from_record(record)
+            if company is not None and company['smm_company_id'] == company_id:
+                return company
+        return None
+    
+    async def batches(self, crawler: "ESGReportCrawler", batch_size: int, force_reanalysis: bool):
+        batch = []
+        for record in self.records():
+            company = _company_from_record(record)
+            if company is None or not crawler._selects_company(company, force_reanalysis):
+                continue
+            batch.append(company)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+class CsvCompanySource(FileCompanySource):
+    """CSV with a header row: smm_company_id (or id), name, website (or primary_domain), optional esg_info JSON"""
+    
+    def records(self) -> Iterable[Dict[str, Any]]:
+        with _open_text(self.path) as f:
+            yield from csv.DictReader(f)
+
+
+class JsonlCompanySource(FileCompanySource):
+    """One JSON object per line with the CSV columns; reads the output of JsonlResultSink"""
+    
+    def records(self) -> Iterable[Dict[str, Any]]:
+        with _open_text(self.path) as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable line {line_number} of {self.path}")
+
+
+class SqliteCompanySource(FileCompanySource):
+    """
+    A SQLite table with the smm_companies columns (smm_company_id, name, primary_domain, esg_info)
+    
+    Pages are read by smm_company_id and each query is finished before the next, so a
+    SqliteResultSink on the same file can write analyses back while the run reads.
+    """
+    
+    def __init__(self, path: str, table: str = "smm_companies"):
+        super().__init__(path)
+        self.table = table
+    
+    def records(self) -> Iterable[Dict[str, Any]]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            after_id = None
+            while True:
+                rows = conn.execute(
+                    f"SELECT smm_company_id, name, primary_domain, esg_info FROM {self.table} "
+                    f"WHERE smm_company_id > ? ORDER BY smm_company_id LIMIT ?",
+                    (after_id if after_id is not None else -2**63, SQLITE_PAGE_SIZE)
+                ).fetchall()
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(row)
+                after_id = rows[-1]['smm_company_id']
+        finally:
+            conn.close()
+
+
+class ResultSink(ABC):
+    """Where a run writes the analyses of each company; opened only by runs that store analyses"""
+    
+    uses_database = False
+    
+    async def open(self):
+        pass
+    
+    async def close(self):
+        pass
+    
+    @abstractmethod
+    async def write(self, crawler: "ESGReportCrawler", company: Dict[str, Any],
+                    esg_results: Dict[str, ESGReportAnalysisResult], replace_existing: bool = False):
+        """Store the new analyses of one company"""
+
+
+class DatabaseResultSink(ResultSink):
+    """esg_info of smm_companies through the crawler's asyncpg pool (the default sink)"""
+    
+    uses_database = True
+    
+    async def write(self, crawler: "ESGReportCrawler", company: Dict[str, Any],
+                    esg_results: Dict[str, ESGReportAnalysisResult], replace_existing: bool = False):
+        await crawler.update_company_esg_info_versions(company['smm_company_id'], esg_results,
+                                                       replace_existing=replace_existing)
+
+
+class JsonlResultSink(ResultSink):
+    """
+    One line per company with its esg_info after the run; readable again by JsonlCompanySource
+    
+    A run replaces an existing file: lines go to a temporary file next to it, which is
+    renamed over the path when the sink closes, so a run killed midway leaves the previous
+    file intact. With append, lines are added to the existing file instead (a gzip file
+    gains a member).
+    """
+    
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.append = append
+        self._file = None
+        self._temp_path: Optional[str] = None
+    
+    async def open(self):
+        if self.append:
+            self._file = _open_text(self.path, "at")
+            return
+        # Same directory, so the rename cannot cross filesystems; same suffix, so .gz stays gzip
+        directory, name = os.path.split(self.path)
+        self._temp_path = os.path.join(directory, f".{os.getpid()}.{name}")
+        self._file = _open_text(self._temp_path, "wt")
+    
+    async def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._temp_path is not None:
+            os.replace(self._temp_path, self.path)
+            self._temp_path = None
+    
+    async def write(self, crawler: "ESGReportCrawler", company: Dict[str, Any],
+                    esg_results: Dict[str, ESGReportAnalysisResult], replace_existing: bool = False):
+        esg_info = crawler._merged_esg_info(company, esg_results, replace_existing)
+        with crawler._loop_section("serialize", company['smm_company_id']):
+            line = json.dumps({'smm_company_id': company['smm_company_id'], 'name': company['name'],
+                               'website': company['website'], 'esg_info': esg_info})
+        self._file.write(line + "\n")
+
+
+class SqliteResultSink(ResultSink):
+    """Upserts esg_info into a SQLite table with the smm_companies columns, committing in batches"""
+    
+    def __init__(self, path: str, table: str = "smm_companies"):
+        self.path = path
+        self.table = table
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending = 0
+    
+    async def open(self):
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {self.table} (
+            smm_company_id INTEGER PRIMARY KEY,
+            name TEXT,
+            primary_domain TEXT,
+            esg_info TEXT
+        )
+        """)
+        self._conn.commit()
+    
+    async def close(self):
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+    
+    async def write(self, crawler: "ESGReportCrawler", company: Dict[str, Any],
+                    esg_results: Dict[str, ESGReportAnalysisResult], replace_existing: bool = False):
+        esg_info = crawler._merged_esg_info(company, esg_results, replace_existing)
+        with crawler._loop_section("serialize", company['smm_company_id']):
+            self._conn.execute(
+                f"INSERT INTO {self.table} (smm_company_id, name, primary_domain, esg_info) VALUES (?, ?, ?, ?) "
+                f"ON CONFLICT (smm_company_id) DO UPDATE SET esg_info = excluded.esg_info",
+                (company['smm_company_id'], company['name'], company['website'], json.dumps(esg_info))
+            )
+        self._pending += 1
+        if self._pending >= SQLITE_COMMIT_EVERY:
+            self._conn.commit()
+            self._pending = 0
+
+
+class ParquetResultSink(ResultSink):
+    """
+    The new analyses as EXPORT_COLUMNS rows in one Parquet file, one row group per chunk_rows rows
+    
+    Like JsonlResultSink, a run replaces an existing file through a temporary file renamed on close.
+    Parquet files cannot be appended to.
+    """
+    
+    def __init__(self, path: str, chunk_rows: int = 50000):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self._rows: List[Dict[str, Any]] = []
+        self._writer = None
+        self._temp_path: Optional[str] = None
+    
+    async def open(self):
+        self._pa, pq, self._schema = _arrow_export_schema()
+        directory, name = os.path.split(self.path)
+        self._temp_path = os.path.join(directory, f".{os.getpid()}.{name}")
+        self._writer = pq.ParquetWriter(self._temp_path, self._schema, compression="zstd")
+    
+    async def close(self):
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+        if self._temp_path is not None:
+            os.replace(self._temp_path, self.path)
+            self._temp_path = None
+    
+    async def write(self, crawler: "ESGReportCrawler", company: Dict[str, Any],
+                    esg_results: Dict[str, ESGReportAnalysisResult], replace_existing: bool = False):
+        for analysis in crawler._analysis_entries(esg_results):
+            self._rows.append(flatten_analysis(company, analysis, is_latest=True))
+        if len(self._rows) >= self.chunk_rows:
+            self._flush()
+    
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+
+def company_source_for_path(path: str) -> CompanySource:
+    """Pick the company source for a file by its extension (.csv, .jsonl, .sqlite; optionally .gz)"""
+    name = path.lower()
+    if name.endswith((".csv", ".csv.gz")):
+        return CsvCompanySource(path)
+    if name.endswith((".jsonl", ".jsonl.gz", ".ndjson", ".ndjson.gz")):
+        return JsonlCompanySource(path)
+    if name.endswith((".db", ".sqlite", ".sqlite3")):
+        return SqliteCompanySource(path)
+    raise ValueError(f"Unknown company source '{path}', expected .csv, .jsonl or .sqlite")
+
+
+def result_sink_for_path(path: str, append: bool = False) -> ResultSink:
+    """Pick the result sink for a file by its extension (.jsonl, .sqlite, .parquet)"""
+    name = path.lower()
+    if name.endswith((".jsonl", ".jsonl.gz", ".ndjson", ".ndjson.gz")):
+        return JsonlResultSink(path, append=append)
+    if name.endswith((".db", ".sqlite", ".sqlite3")):
+        return SqliteResultSink(path)
+    if name.endswith(".parquet"):
+        if append:
+            raise ValueError(f"Result sink '{path}' is Parquet, which cannot be appended to")
+        return ParquetResultSink(path)
+    raise ValueError(f"Unknown result sink '{path}', expected .jsonl, .sqlite or .parquet")
+
+
+class ESGReportCrawler:
+    """Standalone ESG report crawler for database operations"""
+    
+    def __init__(self, config: CrawlerConfig = None, version: str = "1.0",
+                 shard: Optional[Tuple[int, int]] = None, versions: Optional[List[str]] = None,
+                 source: Optional[CompanySource] = None, sink: Optional[ResultSink] = None):
+        self.config = config or CrawlerConfig()
+        self.db_pool = None
+        # Where process_source reads companies and where every mode writes analyses
+        self.source = source or DatabaseCompanySource()
+        self.sink = sink or DatabaseResultSink()
+        # Detector versions run over every fetched page; self.version is the primary one
+        self.versions = list(versions) if versions else [version]
+        self.version = self.versions[0]
+        # Key for version-scoped bookkeeping such as the job queue ("1.0" or "1.0,3.0,4.0")
+        self.version_key = ",".join(self.versions)
+        self._detection_memo: Optional[Dict[str, Tuple[bool, Dict[str, Any]]]] = None
+        self._navigation_cache: Optional[Tuple[BeautifulSoup, Dict[str, Any]]] = None
+        self.shard = shard  # 0-based (index, count) or None to cover the whole table
+        self._feature_store_ready: Optional[bool] = None  # None until esg_page_features is checked
+        self._version_stats_ready: Optional[bool] = None  # None until esg_version_stats is checked
+        self.queries = CrawlerQueries(SHARDED_CRAWLER_QUERIES if shard else CRAWLER_QUERIES)
+        self._fingerprint_store_ready: Optional[bool] = None
+        # Simhashing costs CPU on the event loop, so pages are only fingerprinted when something reads it
+        self._fingerprint_pages = self.config.dedupe_pages or self.config.dedupe_store or self.config.store_fingerprints
+        # Near-duplicate index of pages analyzed in this run: fingerprint -> (company_id, website, {version: analysis})
+        self._page_index = SimhashIndex(self.config.dedupe_index_size)
+        # Singleflight state keyed on (normalized URL, versions, reuse): analyses in flight. Completed
+        # analyses are kept in URLResults owned by each batch or request, not here
+        self._url_flights: Dict[Tuple[str, Tuple[str, ...], bool], asyncio.Future] = {}
+        self._url_flight_waiters: Counter = Counter()  # flight -> callers still waiting for it
+        
+        # ESG/Sustainability-related URL patterns for detection
+        self.esg_url_patterns = [
+            r'/sustainability',
+            r'/esg',
+            r'/csr',
+            r'/corporate-responsibility',
+            r'/environmental',
+            r'/social-responsibility',
+            r'/governance',
+            r'/annual-report',
+            r'/impact-report',
+            r'/investor-relations',
+            r'/responsibility',
+            r'/climate',
+            r'/carbon'
+        ]
+        
+        # Keywords that indicate ESG/sustainability reports
+        self.esg_keywords = [
+            'sustainability report',
+            'esg report',
+            'csr report',
+            'environmental report',
+            'social responsibility report',
+            'annual sustainability',
+            'impact report',
+            'corporate responsibility report',
+            'governance report',
+            'climate report',
+            'carbon report',
+            'environmental social governance'
+        ]
+        
+        # Combined form of esg_url_patterns for scanning large sitemap URL lists
+        self._esg_url_regex = re.compile('|'.join(self.esg_url_patterns))
+        # Sitemap file names rarely use path segments (sitemap-sustainability.xml), so match the bare terms
+        self._esg_sitemap_regex = re.compile('|'.join(pattern.lstrip('/') for pattern in self.esg_url_patterns))
+        # Per-domain discovery results: domain -> (expiry on the monotonic clock, shared discovery task)
+        self._discovery_cache: Dict[str, Tuple[float, asyncio.Future]] = {}
+        self._document_pool: Optional[ProcessPoolExecutor] = None
+        self._document_worker_pid = None
+        self._fetch_limiter: Optional[AdaptiveConcurrencyLimiter] = None
+        if self.config.adaptive_concurrency:
+            self._fetch_limiter = AdaptiveConcurrencyLimiter(
+                maximum=self.config.max_concurrency,
+                latency_budget=self.config.latency_budget or self.config.timeout / 2
+            )
+        self._http_session: Optional[aiohttp.ClientSession] = None  # Shared by homepage fetches in service mode
+        self._loop_monitor: Optional[LoopLagMonitor] = None
+        if self.config.loop_monitor:
+            self._loop_monitor = LoopLagMonitor(threshold=self.config.loop_lag_threshold)
+    
+    def _loop_section(self, stage: str, label: Any = ""):
+        """Context manager around synchronous work, timed when the loop-lag monitor is on"""
+        if self._loop_monitor is None:
+            return contextlib.nullcontext()
+        return self._loop_monitor.section(stage, label)
+    
+    async def init_database(self, open_sink: bool = False):
+        """Initialize database connection pool (and open self.sink for runs that store analyses)"""
+        try:
+            # Database configuration from environment variables
+            db_config = {
+                'host': os.getenv('DB_HOST', 'localhost'),
+                'port': int(os.getenv('DB_PORT', 5432)),
+                'database': os.getenv('DB_NAME', 'nexus'),
+                'user': os.getenv('DB_USER', 'postgres'),
+                'password': os.getenv('DB_PASSWORD', ''),
+            }
+            
+            self.db_pool = await asyncpg.create_pool(
+                **db_config,
+                min_size=1,
+                max_size=10,
+                command_timeout=60,
+                statement_cache_size=max(100, 2 * len(CRAWLER_QUERIES))
             )
             logger.info("Database connection pool initialized")
             
+            # Every run opens and closes the pool, so the loop-lag monitor and the sink span the run.
+            # Runs that only read (stats, export, enqueue, ...) leave the sink closed, so file sinks are untouched.
+            if self._loop_monitor:
+                self._loop_monitor.start()
+            if open_sink:
+                await self.sink.open()
+            
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
             raise
     
     async def close_database(self):
         """Close database connection pool"""
+        await self.sink.close()
+        if self._loop_monitor:
+            await self._loop_monitor.stop()
+            self._loop_monitor.log_summary()
+            self.queries.log_summary()
+        if self._document_pool is not None:
+            self._document_pool.shutdown(wait=False, cancel_futures=True)
+            self._document_pool = None
         if self.db_pool:
             await self.db_pool.close()
             logger.info("Database connection pool closed")
     
     async def get_companies_to_process(self, limit: Optional[int] = None, offset: int = 0, 
-                                     force_reanalysis: bool = False) -> List[Dict[str, Any]]:
-        """Get companies from smm_companies table that need ESG analysis with pagination and version awareness"""
+                                     force_reanalysis: bool = False, after_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get companies from smm_companies table that need ESG analysis with pagination and version awareness
         
-        if force_reanalysis:
-            # Re-analyze all companies with valid websites (for new versions)
-            query = """
-            SELECT smm_company_id, name, primary_domain as website, esg_info
-            FROM smm_companies 
-            WHERE primary_domain IS NOT NULL 
-            AND primary_domain != ''
-            ORDER BY smm_company_id
-            """
-        else:
-            # Version-aware selection: companies without this specific version analysis
-            query = f"""
-            SELECT smm_company_id, name, primary_domain as website, esg_info
-            FROM smm_companies 
-            WHERE primary_domain IS NOT NULL 
-            AND primary_domain != ''
-            AND (
-                esg_info IS NULL 
-                OR NOT EXISTS (
-                    SELECT 1 FROM jsonb_array_elements(
-                        CASE 
-                            WHEN jsonb_typeof(esg_info) = 'array' THEN esg_info
-                            WHEN esg_info IS NOT NULL THEN jsonb_build_array(esg_info)
-                            ELSE '[]'::jsonb
-                        END
-                    ) AS elem
-                    WHERE elem->>'crawler_version' = '{self.version}'
-                )
+        Without force_reanalysis only companies lacking an analysis for any requested
+        version are selected. after_id pages by smm_company_id instead of offset, which
+        stays correct while analyzed companies drop out of the selection.
+        """
+        async with self.db_pool.acquire() as conn:
+            rows = await self.queries.fetch(
+                conn, "select_companies", *self._shard_args(), self.versions, force_reanalysis,
+                after_id if after_id is not None else -2**63, limit or None, offset
             )
-            ORDER BY smm_company_id
-            """
+            return [dict(row) for row in rows]
+    
+    async def get_company(self, company_id: int) -> Optional[Dict[str, Any]]:
+        """Get one company row in the get_companies_to_process format, or None if it does not exist"""
+        async with self.db_pool.acquire() as conn:
+            row = await self.queries.fetchrow(conn, "select_company", company_id)
+        return dict(row) if row else None
+    
+    async def get_companies_by_ids(self, company_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get the given companies with a website in this crawler's shard, in the get_companies_to_process format"""
+        async with self.db_pool.acquire() as conn:
+            rows = await self.queries.fetch(conn, "select_companies_by_ids", *self._shard_args(), company_ids)
+            return [dict(row) for row in rows]
+    
+    def _shard_args(self) -> Tuple[int, int]:
+        """(shard count, shard index) parameters of self.queries; (1, 0) selects every company"""
+        if not self.shard:
+            return 1, 0
+        shard_index, shard_count = self.shard
+        return shard_count, shard_index
+    
+    def _shard_label(self) -> str:
+        """Human-readable shard suffix for logs and statistics"""
+        if not self.shard:
+            return ""
+        return f" (shard {self.shard[0] + 1}/{self.shard[1]})"
+    
+    async def version_stats_installed(self) -> bool:
+        """Whether esg_version_stats and its maintenance trigger exist"""
+        async with self.db_pool.acquire() as conn:
+            return await conn.fetchval("""
+            SELECT EXISTS (SELECT 1 FROM pg_trigger
+                           WHERE tgname = 'esg_version_stats_maintain' AND tgrelid = 'smm_companies'::regclass)
+            AND to_regclass('esg_version_stats') IS NOT NULL
+            """)
+    
+    async def install_version_stats(self):
+        """
+        Create (or rebuild) esg_version_stats and the smm_companies trigger that keeps it current
         
-        # Add pagination
-        if offset > 0:
-            query += f" OFFSET {offset}"
-        if limit:
-            query += f" LIMIT {limit}"
+        The table counts companies with a website per set of analyzed versions, so totals,
+        per-version counts and "needs analysis" counts are sums over a few hundred rows at
+        most. The trigger only writes when a row's version set or website presence changes,
+        and it adds its +1/-1 deltas to one of 16 slot rows per set chosen by backend pid,
+        so concurrent writers rarely wait on the same counter row. Slot -1 holds the
+        baseline written here.
         
+        smm_companies is never locked for the rebuild. The trigger is installed first (a
+        brief DDL lock, only when it is missing); then one statement scans smm_companies and
+        sets the baseline to the scanned counts minus the deltas visible in the same
+        snapshot. Deltas of writes committed after that snapshot are neither in the scan
+        nor cancelled, so no change is missed or counted twice. Only --refresh-stats calls
+        this; counting never installs the trigger.
+        """
         async with self.db_pool.acquire() as conn:
-            rows = await conn.fetch(query)
-            return [dict(row) for row in rows]
+            # Concurrent installs would both rewrite the baseline rows
+            await conn.execute("SELECT pg_advisory_lock(hashtext('esg_version_stats'))")
+            try:
+                async with conn.transaction():
+                    await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS esg_version_stats (
+                        analyzed_versions TEXT[] NOT NULL,
+                        slot SMALLINT NOT NULL,
+                        company_count BIGINT NOT NULL DEFAULT 0,
+                        PRIMARY KEY (analyzed_versions, slot)
+                    );
+                    
+                    CREATE OR REPLACE FUNCTION esg_analyzed_versions(info JSONB) RETURNS TEXT[] AS $$
+                        SELECT COALESCE(array_agg(DISTINCT elem->>'crawler_version' ORDER BY elem->>'crawler_version'), '{}')
+                        FROM jsonb_array_elements(
+                            CASE 
+                                WHEN jsonb_typeof(info) = 'array' THEN info
+                                WHEN info IS NOT NULL THEN jsonb_build_array(info)
+                                ELSE '[]'::jsonb
+                            END
+                        ) AS elem
+                        WHERE elem->>'crawler_version' IS NOT NULL
+                    $$ LANGUAGE sql IMMUTABLE;
+                    
+                    CREATE OR REPLACE FUNCTION esg_maintain_version_stats() RETURNS trigger AS $$
+                    DECLARE
+                        old_key TEXT[];
+                        new_key TEXT[];
+                        writer_slot SMALLINT := pg_backend_pid() % 16;
+                    BEGIN
+                        IF TG_OP <> 'INSERT' THEN
+                            IF OLD.primary_domain IS NOT NULL AND OLD.primary_domain != '' THEN
+                                old_key := esg_analyzed_versions(OLD.esg_info);
+                            END IF;
+                        END IF;
+                        IF TG_OP <> 'DELETE' THEN
+                            IF NEW.primary_domain IS NOT NULL AND NEW.primary_domain != '' THEN
+                                new_key := esg_analyzed_versions(NEW.esg_info);
+                            END IF;
+                        END IF;
+                        
+                        IF old_key IS NOT DISTINCT FROM new_key THEN
+                            RETURN NULL;
+                        END IF;
+                        IF old_key IS NOT NULL THEN
+                            INSERT INTO esg_version_stats (analyzed_versions, slot, company_count)
+                            VALUES (old_key, writer_slot, -1)
+                            ON CONFLICT (analyzed_versions, slot) DO UPDATE
+                            SET company_count = esg_version_stats.company_count - 1;
+                        END IF;
+                        IF new_key IS NOT NULL THEN
+                            INSERT INTO esg_version_stats (analyzed_versions, slot, company_count)
+                            VALUES (new_key, writer_slot, 1)
+                            ON CONFLICT (analyzed_versions, slot) DO UPDATE
+                            SET company_count = esg_version_stats.company_count + 1;
+                        END IF;
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql;
+                    
+                    DO $$
+                    BEGIN
+                        IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                                       WHERE tgname = 'esg_version_stats_maintain'
+                                       AND tgrelid = 'smm_companies'::regclass) THEN
+                            CREATE TRIGGER esg_version_stats_maintain
+                                AFTER INSERT OR DELETE OR UPDATE OF esg_info, primary_domain ON smm_companies
+                                FOR EACH ROW
+                                EXECUTE FUNCTION esg_maintain_version_stats();
+                        END IF;
+                    END
+                    $$;
+                    """)
+                
+                # One statement, so the scan and the deltas it cancels come from the same snapshot
+                await conn.execute("""
+                WITH live AS (
+                    SELECT esg_analyzed_versions(esg_info) AS analyzed_versions, COUNT(*) AS company_count
+                    FROM smm_companies
+                    WHERE primary_domain IS NOT NULL
+                    AND primary_domain != ''
+                    GROUP BY 1
+                ), deltas AS (
+                    SELECT analyzed_versions, SUM(company_count) AS company_count
+                    FROM esg_version_stats
+                    WHERE slot >= 0
+                    GROUP BY 1
+                ), version_sets AS (
+                    SELECT analyzed_versions FROM live
+                    UNION
+                    SELECT analyzed_versions FROM esg_version_stats
+                )
+                INSERT INTO esg_version_stats (analyzed_versions, slot, company_count)
+                SELECT version_sets.analyzed_versions, -1,
+                       COALESCE(live.company_count, 0) - COALESCE(deltas.company_count, 0)
+                FROM version_sets
+                LEFT JOIN live USING (analyzed_versions)
+                LEFT JOIN deltas USING (analyzed_versions)
+                ON CONFLICT (analyzed_versions, slot) DO UPDATE
+                SET company_count = EXCLUDED.company_count
+                """)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock(hashtext('esg_version_stats'))")
+            logger.info("Built esg_version_stats summary table")
+    
+    async def _use_version_stats(self) -> bool:
+        """Whether counts can come from esg_version_stats: enabled, unsharded and installed"""
+        if not self.config.summary_stats or self.shard:
+            return False
+        if self._version_stats_ready is None:
+            try:
+                self._version_stats_ready = await self.version_stats_installed()
+            except Exception as e:
+                logger.warning(f"Could not check for esg_version_stats: {e}")
+                self._version_stats_ready = False
+            if not self._version_stats_ready:
+                logger.warning("esg_version_stats is not installed (run --refresh-stats); counting from smm_companies")
+        return self._version_stats_ready
+    
+    async def refresh_version_stats(self):
+        """Install or rebuild esg_version_stats (also after TRUNCATE or bulk loads with triggers disabled)"""
+        try:
+            await self.init_database()
+            await self.install_version_stats()
+        finally:
+            await self.close_database()
     
     async def get_total_companies_count(self, force_reanalysis: bool = False) -> int:
         """Get total count of companies that need ESG analysis"""
         
-        if force_reanalysis:
-            query = """
-            SELECT COUNT(*) as total
-            FROM smm_companies 
-            WHERE primary_domain IS NOT NULL 
-            AND primary_domain != ''
-            """
-        else:
-            query = f"""
-            SELECT COUNT(*) as total
-            FROM smm_companies 
-            WHERE primary_domain IS NOT NULL 
-            AND primary_domain != ''
-            AND (
-                esg_info IS NULL 
-                OR NOT EXISTS (
-                    SELECT 1 FROM jsonb_array_elements(
-                        CASE 
-                            WHEN jsonb_typeof(esg_info) = 'array' THEN esg_info
-                            WHEN esg_info IS NOT NULL THEN jsonb_build_array(esg_info)
-                            ELSE '[]'::jsonb
-                        END
-                    ) AS elem
-                    WHERE elem->>'crawler_version' = '{self.version}'
-                )
-            )
-            """
-        
         async with self.db_pool.acquire() as conn:
-            result = await conn.fetchval(query)
+            if await self._use_version_stats():
+                result = await self.queries.fetchval(conn, "summary_count_companies", force_reanalysis, self.versions)
+            else:
+                result = await self.queries.fetchval(conn, "count_companies", *self._shard_args(),
+                                                     self.versions, force_reanalysis)
             return result or 0
     
     async def update_company_esg_info(self, company_id: int, esg_result: ESGReportAnalysisResult, replace_existing: bool = False):
         """Update company ESG info in database by appending to existing results or replacing them"""
+        await self.update_company_esg_info_versions(company_id, {self.version: esg_result}, replace_existing=replace_existing)
+    
+    async def update_company_esg_info_versions(self, company_id: int, esg_results: Dict[str, ESGReportAnalysisResult],
+                                               replace_existing: bool = False):
+        """Append (or replace with) one analysis entry per crawler version in a single transaction"""
         try:
-            # Create new analysis entry
-            new_analysis = {
-                'has_esg_reports': esg_result.has_esg_reports,
-                'analysis_timestamp': esg_result.collection_timestamp,
-                'website_analysis': esg_result.website_analysis,
-                'crawling_evidence': esg_result.crawling_evidence,
-                'crawler_config': esg_result.crawler_config,
-                'crawler_version': self.version
-            }
+            new_analyses = self._analysis_entries(esg_results)
             
-            if replace_existing:
-                # Replace mode: overwrite all existing data with new analysis
-                updated_analysis = [new_analysis]
-                operation_type = "Replaced"
-            else:
-                # Append mode: add to existing data (default behavior)
-                # First, get existing ESG analysis data
-                select_query = """
-                SELECT esg_info FROM smm_companies 
-                WHERE smm_company_id = $1
-                """
-                
-                async with self.db_pool.acquire() as conn:
-                    existing_data = await conn.fetchval(select_query, company_id)
-                    
-                    # Prepare the updated analysis array
-                    if existing_data is None:
-                        # No existing data, create new array
-                        updated_analysis = [new_analysis]
+            store_features = self.config.store_features and await self._ensure_feature_store()
+            store_fingerprint = self.config.dedupe_store and await self._ensure_fingerprint_store()
+            
+            async with self.db_pool.acquire() as conn:
+                async with conn.transaction():
+                    if replace_existing:
+                        # Replace mode: overwrite all existing data with new analysis
+                        updated_analysis = new_analyses
+                        operation_type = "Replaced"
                     else:
-                        # Parse existing data
-                        if isinstance(existing_data, str):
-                            existing_analysis = json.loads(existing_data)
-                        else:
-                            existing_analysis = existing_data
+                        # Append mode: add to existing data (default behavior).
+                        # Lock the row so concurrent workers cannot lose each other's appends.
+                        existing_data = await self.queries.fetchval(conn, "lock_esg_info", company_id)
                         
-                        # Ensure it's a list
-                        if not isinstance(existing_analysis, list):
-                            existing_analysis = [existing_analysis]
+                        # Prepare the updated analysis array
+                        if existing_data is None:
+                            # No existing data, create new array
+                            updated_analysis = new_analyses
+                        else:
+                            # Parse existing data
+                            if isinstance(existing_data, str):
+                                existing_analysis = json.loads(existing_data)
+                            else:
+                                existing_analysis = existing_data
+                            
+                            # Ensure it's a list
+                            if not isinstance(existing_analysis, list):
+                                existing_analysis = [existing_analysis]
+                            
+                            # Append new analyses to existing array and apply the retention policy
+                            existing_analysis.extend(new_analyses)
+                            updated_analysis = self._apply_retention(existing_analysis)
                         
-                        # Append new analysis to existing array
-                        existing_analysis.append(new_analysis)
-                        updated_analysis = existing_analysis
+                        operation_type = "Appended"
                     
-                operation_type = "Appended"
-            
-            # Update the database with the analysis array
-            update_query = """
-            UPDATE smm_companies 
-            SET esg_info = $1, updated_at = NOW()
-            WHERE smm_company_id = $2
-            """
+                    # Update the database with the analysis array
+                    with self._loop_section("serialize", company_id):
+                        encoded_analysis = json.dumps(updated_analysis)
+                    status = await self.queries.execute(conn, "update_esg_info", encoded_analysis, company_id)
+                    # asyncpg returns the command tag, "UPDATE 0" when the company row is gone
+                    if status == "UPDATE 0":
+                        raise ValueError(f"Company {company_id} not found in smm_companies")
+                    
+                    if store_features:
+                        await self._store_page_features(conn, company_id, esg_results)
+                    if store_fingerprint:
+                        await self._store_page_fingerprint(conn, company_id, esg_results)
             
-            async with self.db_pool.acquire() as conn:
-                await conn.execute(update_query, json.dumps(updated_analysis), company_id)
-                logger.info(f"{operation_type} ESG analysis for company {company_id} (total analyses: {len(updated_analysis)})")
+            versions_label = ", ".join(esg_results)
+            logger.info(f"{operation_type} ESG analysis (v{versions_label}) for company {company_id} (total analyses: {len(updated_analysis)})")
                 
         except Exception as e:
             logger.error(f"Failed to update company {company_id}: {e}")
             raise
     
-    async def analyze_company_website(self, company_website: str) -> ESGReportAnalysisResult:
-        """
-        Analyze company website for ESG/sustainability report presence
+    def _analysis_entries(self, esg_results: Dict[str, ESGReportAnalysisResult]) -> List[Dict[str, Any]]:
+        """The esg_info entries stored for one analysis per crawler version"""
+        return [
+            {
+                'has_esg_reports': esg_result.has_esg_reports,
+                'analysis_timestamp': esg_result.collection_timestamp,
+                'website_analysis': esg_result.website_analysis,
+                'crawling_evidence': (self._compact_evidence(esg_result.crawling_evidence)
+                                      if self.config.compact_evidence else esg_result.crawling_evidence),
+                'crawler_config': esg_result.crawler_config,
+                'crawler_version': version
+            }
+            for version, esg_result in esg_results.items()
+        ]
+    
+    def _merged_esg_info(self, company: Dict[str, Any], esg_results: Dict[str, ESGReportAnalysisResult],
+                         replace_existing: bool = False) -> List[Dict[str, Any]]:
+        """esg_info a file sink writes for a company: its stored esg_info with the new analyses appended (or replacing it)"""
+        new_analyses = self._analysis_entries(esg_results)
+        existing = company.get('esg_info')
+        # Rows read from smm_companies carry esg_info as JSON text
+        if isinstance(existing, str):
+            try:
+                existing = json.loads(existing)
+            except json.JSONDecodeError:
+                existing = None
+        if replace_existing or not existing:
+            return new_analyses
+        existing = list(existing) if isinstance(existing, list) else [existing]
+        return self._apply_retention(existing + new_analyses)
+    
+    def _compact_evidence(self, evidence: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Encode crawling evidence compactly: dedupe navigation text and cap unbounded lists"""
+        if not evidence or evidence.get("evidence_format") == EVIDENCE_FORMAT:
+            return evidence
         
-        Args:
-            company_website: Company website URL to analyze
-            
-        Returns:
-            ESGReportAnalysisResult: Analysis result with boolean ESG report detection
-        """
-        collection_timestamp = datetime.now().isoformat()
+        compact = dict(evidence)
         
-        try:
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=self.config.timeout),
-                headers={'User-Agent': self.config.user_agent}
-            ) as session:
-                
-                # Analyze website structure and get soup
-                website_analysis, soup = await self._analyze_website_structure(session, company_website)
-                
-                # Detect ESG content and get evidence
-                has_esg_reports, crawling_evidence = self._detect_esg_content(soup)
-                
-                # Add URL pattern detection to evidence
-                crawling_evidence["url_patterns_found"] = self._detect_esg_url_patterns(company_website)
-                
-                # Log the result with evidence summary
-                evidence_summary = {
-                    "keywords_count": len(crawling_evidence["keywords_found"]),
-                    "nav_matches_count": len(crawling_evidence["navigation_matches"]),
-                    "title_matches_count": len(crawling_evidence["title_matches"]),
-                    "url_patterns_count": len(crawling_evidence["url_patterns_found"])
-                }
-                logger.info(f"ESG analysis complete for {company_website}: ESG reports found = {has_esg_reports}, Evidence: {evidence_summary}")
+        # Navigation matches repeat the same container text for every keyword and nested
+        # element, so store each distinct text once and reference it by index
+        navigation_texts = []
+        text_ids = {}
+        navigation_matches = []
+        for match in evidence.get("navigation_matches", []):
+            match = dict(match)
+            nav_text = " ".join(str(match.pop("nav_text", "")).split())[:200]
+            if nav_text not in text_ids:
+                text_ids[nav_text] = len(navigation_texts)
+                navigation_texts.append(nav_text)
+            match["nav_text_id"] = text_ids[nav_text]
+            navigation_matches.append(match)
+        compact["navigation_matches"] = navigation_matches
+        compact["navigation_texts"] = navigation_texts
+        
+        # Cap lists whose size grows with the page, keeping the original totals
+        limit = self.config.evidence_list_limit
+        list_totals = {}
+        for section, keys in CAPPED_EVIDENCE_LISTS.items():
+            if not isinstance(evidence.get(section), dict):
+                continue
+            section_data = dict(evidence[section])
+            for key in keys:
+                values = section_data.get(key)
+                if not isinstance(values, list):
+                    continue
+                unique_values = []
+                for value in values:
+                    if value not in unique_values:
+                        unique_values.append(value)
+                if len(values) > limit or len(unique_values) < len(values):
+                    list_totals[f"{section}.{key}"] = len(values)
+                section_data[key] = unique_values[:limit]
+            compact[section] = section_data
+        
+        if list_totals:
+            compact["list_totals"] = list_totals
+        compact["evidence_format"] = EVIDENCE_FORMAT
+        return compact
+    
+    def _apply_retention(self, analyses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep only the latest analyses per crawler version (entries are stored oldest first)"""
+        keep = self.config.keep_analyses_per_version
+        if not keep:
+            return analyses
+        
+        kept_per_version = Counter()
+        retained = []
+        for analysis in reversed(analyses):
+            version = analysis.get('crawler_version') if isinstance(analysis, dict) else None
+            kept_per_version[version] += 1
+            if version is None or kept_per_version[version] <= keep:
+                retained.append(analysis)
+        
+        retained.reverse()
+        return retained
+    
+    async def compact_esg_history(self, batch_size: int = 500):
+        """Rewrite existing esg_info arrays in the compact evidence format and apply the retention policy"""
+        try:
+            await self.init_database()
+            
+            last_company_id = -1
+            scanned_count = 0
+            rewritten_count = 0
+            bytes_before = 0
+            bytes_after = 0
+            
+            while True:
+                async with self.db_pool.acquire() as conn:
+                    rows = await self.queries.fetch(conn, "select_history_batch", *self._shard_args(),
+                                                    last_company_id, batch_size)
                 
-                return ESGReportAnalysisResult(
-                    company_website=company_website,
-                    collection_timestamp=collection_timestamp,
-                    website_analysis=website_analysis.to_dict(),
-                    has_esg_reports=has_esg_reports,
-                    crawling_evidence=crawling_evidence,
-                    crawler_config=self._get_crawler_config_dict()
-                )
+                if not rows:
+                    break
                 
-        except Exception as e:
-            logger.error(f"ESG analysis failed for {company_website}: {e}")
+                updates = []
+                for row in rows:
+                    original = row['esg_info']
+                    existing = json.loads(original)
+                    analyses = existing if isinstance(existing, list) else [existing]
+                    
+                    compacted = []
+                    for analysis in analyses:
+                        if isinstance(analysis, dict) and analysis.get('crawling_evidence'):
+                            analysis = dict(analysis, crawling_evidence=self._compact_evidence(analysis['crawling_evidence']))
+                        compacted.append(analysis)
+                    compacted = self._apply_retention(compacted)
+                    
+                    encoded = json.dumps(compacted)
+                    bytes_before += len(original)
+                    if compacted != existing:
+                        updates.append((encoded, row['smm_company_id'], original))
+                        bytes_after += len(encoded)
+                    else:
+                        bytes_after += len(original)
+                
+                if updates:
+                    async with self.db_pool.acquire() as conn:
+                        async with conn.transaction():
+                            await self.queries.executemany(conn, "rewrite_history", updates)
+                
+                scanned_count += len(rows)
+                rewritten_count += len(updates)
+                last_company_id = rows[-1]['smm_company_id']
+                logger.info(f"Compacted esg_info up to company {last_company_id}: {rewritten_count}/{scanned_count} rows rewritten")
             
-            # Return error result
-            error_analysis = WebsiteAnalysis(
-                base_url=company_website,
-                is_accessible=False,
-                error_message=str(e)
+            logger.info(f"Compaction complete: {rewritten_count}/{scanned_count} rows rewritten, "
+                        f"esg_info text size {bytes_before} -> {bytes_after} bytes")
+            
+        finally:
+            await self.close_database()
+    
+    async def _ensure_feature_store(self) -> bool:
+        """Create esg_page_features on first write; disables the store if the table cannot be created"""
+        if self._feature_store_ready is None:
+            try:
+                await self.ensure_feature_store()
+                self._feature_store_ready = True
+            except Exception as e:
+                logger.warning(f"Feature store unavailable, page features will not be stored: {e}")
+                self._feature_store_ready = False
+        return self._feature_store_ready
+    
+    async def ensure_feature_store(self):
+        """Create the esg_page_features table holding the latest scoring feature vector per company and version"""
+        async with self.db_pool.acquire() as conn:
+            await conn.execute("""
+            CREATE TABLE IF NOT EXISTS esg_page_features (
+                smm_company_id BIGINT NOT NULL,
+                crawler_version TEXT NOT NULL,
+                page_url TEXT,
+                feature_schema SMALLINT NOT NULL,
+                features DOUBLE PRECISION[] NOT NULL,
+                sustainability_score REAL,
+                confidence_level REAL,
+                sustainability_links INTEGER NOT NULL DEFAULT 0,
+                has_esg_reports BOOLEAN NOT NULL,
+                analyzed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (crawler_version, smm_company_id)
+            );
+            """)
+    
+    async def _ensure_fingerprint_store(self) -> bool:
+        """Create esg_page_fingerprints on first use; disables the persistent index if it cannot be created"""
+        if self._fingerprint_store_ready is None:
+            try:
+                await self.ensure_fingerprint_store()
+                self._fingerprint_store_ready = True
+            except Exception as e:
+                logger.warning(f"Fingerprint store unavailable, near-duplicates are only detected within this run: {e}")
+                self._fingerprint_store_ready = False
+        return self._fingerprint_store_ready
+    
+    async def ensure_fingerprint_store(self):
+        """Create the esg_page_fingerprints table, the persistent near-duplicate index"""
+        band_columns = "".join(f"band{band} INTEGER NOT NULL,\n                " for band in range(SIMHASH_BANDS))
+        band_indexes = "".join(
+            f"CREATE INDEX IF NOT EXISTS esg_page_fingerprints_band{band}_idx ON esg_page_fingerprints (band{band});\n            "
+            for band in range(SIMHASH_BANDS)
+        )
+        async with self.db_pool.acquire() as conn:
+            await conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS esg_page_fingerprints (
+                smm_company_id BIGINT PRIMARY KEY,
+                page_url TEXT,
+                simhash BIGINT NOT NULL,
+                {band_columns}updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            );
+            {band_indexes}""")
+    
+    async def _store_page_fingerprint(self, conn, company_id: int, esg_results: Dict[str, ESGReportAnalysisResult]):
+        """Record the company's page fingerprint inside the caller's transaction"""
+        for esg_result in esg_results.values():
+            fingerprint_hex = (esg_result.website_analysis or {}).get('content_fingerprint')
+            if not fingerprint_hex or esg_result.crawling_evidence is None:
+                continue
+            
+            fingerprint = int(fingerprint_hex, 16)
+            # BIGINT is signed; store the fingerprint's two's complement
+            signed = fingerprint - (1 << SIMHASH_BITS) if fingerprint >= 1 << (SIMHASH_BITS - 1) else fingerprint
+            await self.queries.execute(conn, "upsert_page_fingerprint", company_id, esg_result.company_website,
+                                       signed, *simhash_bands(fingerprint))
+            return
+    
+    async def _store_page_features(self, conn, company_id: int, esg_results: Dict[str, ESGReportAnalysisResult]):
+        """Upsert the feature vector of every scored (v2+) result inside the caller's transaction"""
+        rows = []
+        for version, esg_result in esg_results.items():
+            evidence = esg_result.crawling_evidence or {}
+            if not evidence.get("scoring_features"):
+                continue
+            # Pages the cascade decided early have no NLP features, so --rescore could not score them as v4
+            if (evidence.get("cascade") or {}).get("tier", "nlp") != "nlp":
+                continue
+            rows.append((
+                company_id, version, esg_result.company_website, FEATURE_SCHEMA_VERSION,
+                scoring_feature_vector(evidence), evidence.get("sustainability_score"),
+                evidence.get("confidence_level"),
+                (esg_result.website_analysis or {}).get("sustainability_links_found", 0),
+                esg_result.has_esg_reports
+            ))
+        
+        if rows:
+            await self.queries.executemany(conn, "upsert_page_features", rows)
+    
+    async def rescore_stored_features(self, scoring_path: Optional[str] = None,
+                                      output_path: Optional[str] = None) -> Dict[str, int]:
+        """
+        Re-score every stored feature vector of self.version under a scoring definition
+        
+        The definition is a JSON object of per-version overrides of DEFAULT_SCORING,
+        e.g. {"4.0": {"score_threshold": 3.5}}. Nothing is fetched or parsed: the
+        stored vectors are scored in one vectorized pass, a summary of decision
+        changes is printed and, with output_path, per-company results are written as CSV.
+        """
+        if self.version == "1.0":
+            raise ValueError("Version 1.0 has no scoring features to re-score")
+        if not _load_numpy():
+            raise RuntimeError("numpy is required for --rescore")
+        
+        overrides = {}
+        if scoring_path:
+            with open(scoring_path) as f:
+                overrides = json.load(f)
+        scoring = merge_scoring(overrides)
+        
+        try:
+            await self.init_database()
+            await self.ensure_feature_store()
+            
+            async with self.db_pool.acquire() as conn:
+                rows = await self.queries.fetch(conn, "select_page_features", *self._shard_args(),
+                                                self.version, FEATURE_SCHEMA_VERSION)
+        finally:
+            await self.close_database()
+        
+        summary = {"pages": len(rows), "stored_positive": 0, "rescored_positive": 0,
+                   "new_positive": 0, "new_negative": 0}
+        if rows:
+            started = time.perf_counter()
+            company_ids = [row['smm_company_id'] for row in rows]
+            stored = np.array([row['has_esg_reports'] for row in rows], dtype=bool)
+            features = np.array([row['features'] for row in rows], dtype=float)
+            scores, confidences, has_esg = score_feature_matrix(features, self.version, scoring)
+            # Same rule as _determine_esg_report_presence: ESG links on the page also count
+            has_esg |= np.array([row['sustainability_links'] > 0 for row in rows], dtype=bool)
+            elapsed = time.perf_counter() - started
+            
+            summary.update(
+                stored_positive=int(stored.sum()),
+                rescored_positive=int(has_esg.sum()),
+                new_positive=int((has_esg & ~stored).sum()),
+                new_negative=int((stored & ~has_esg).sum())
+            )
+            
+            if output_path:
+                with open(output_path, 'w') as f:
+                    f.write("smm_company_id,stored_has_esg,has_esg,sustainability_score,confidence_level\n")
+                    for i, company_id in enumerate(company_ids):
+                        f.write(f"{company_id},{bool(stored[i])},{bool(has_esg[i])},"
+                                f"{float(scores[i]):.3f},{float(confidences[i]):.3f}\n")
+            
+            logger.info(f"Re-scored {len(rows)} stored v{self.version} feature vectors in {elapsed * 1000:.1f}ms")
+        
+        print(f"\n=== Re-scoring Version {self.version}{self._shard_label()} ===")
+        print(f"Scoring definition: {scoring_path or 'defaults'}")
+        print(f"Stored feature vectors: {summary['pages']}")
+        print(f"ESG positive (stored): {summary['stored_positive']}")
+        print(f"ESG positive (re-scored): {summary['rescored_positive']}")
+        print(f"Changed to positive: {summary['new_positive']}")
+        print(f"Changed to negative: {summary['new_negative']}")
+        if output_path and rows:
+            print(f"Per-company results written to {output_path}")
+        
+        return summary
+    
+    async def analyze_company_website(self, company_website: str) -> ESGReportAnalysisResult:
+        """
+        Analyze company website for ESG/sustainability report presence
+        
+        Args:
+            company_website: Company website URL to analyze
+            
+        Returns:
+            ESGReportAnalysisResult: Analysis result with boolean ESG report detection
+        """
+        results = await self.analyze_company_website_versions(company_website, [self.version])
+        return results[self.version]
+    
+    async def analyze_company_website_versions(self, company_website: str, versions: List[str],
+                                               company_id: Optional[int] = None,
+                                               reuse_stored: bool = True,
+                                               url_results: Optional[URLResults] = None) -> Dict[str, ESGReportAnalysisResult]:
+        """
+        Fetch and parse a company website once and run every requested detector version over it
+        
+        Companies whose websites normalize to the same URL share one analysis: concurrent
+        calls wait for the fetch already in flight, and later calls passing the same
+        url_results reuse its result, so a host shared by several companies of a batch is
+        only requested once. A forced analysis (reuse_stored=False) skips completed results
+        and only joins another forced analysis already in flight, so it always sees a fresh fetch.
+        
+        Args:
+            company_website: Company website URL to analyze
+            versions: Crawler versions to evaluate on the shared parsed page
+            company_id: Owning smm_company_id, excluded from stored near-duplicate matches
+            reuse_stored: Whether analyses stored by earlier runs may be reused
+            url_results: Completed analyses of the caller's batch (an OrderedDict); None to keep none
+            
+        Returns:
+            Dict[str, ESGReportAnalysisResult]: Analysis result per version
+        """
+        key = (self._normalize_url(company_website), tuple(versions))
+        
+        results = url_results.get(key) if reuse_stored and url_results is not None else None
+        if results is not None:
+            url_results.move_to_end(key)
+            logger.info(f"Reusing this batch's analysis of {key[0]} for {company_website}")
+            return self._results_for_website(results, company_website)
+        
+        flight_key = key + (reuse_stored,)
+        flight = self._url_flights.get(flight_key)
+        if flight is None:
+            flight = asyncio.ensure_future(
+                self._analyze_website_versions(company_website, versions, company_id, reuse_stored)
+            )
+            self._url_flights[flight_key] = flight
+            flight.add_done_callback(lambda done: self._finish_url_flight(flight_key, done))
+        else:
+            logger.info(f"Waiting for in-flight analysis of {key[0]} for {company_website}")
+        
+        # Shielded so a cancelled caller does not cancel the analysis other callers are waiting for;
+        # the analysis itself is cancelled once no caller is left
+        self._url_flight_waiters[flight] += 1
+        try:
+            results = await asyncio.shield(flight)
+        finally:
+            self._url_flight_waiters[flight] -= 1
+            if not self._url_flight_waiters[flight]:
+                del self._url_flight_waiters[flight]
+                if not flight.done():
+                    flight.cancel()
+                    await asyncio.gather(flight, return_exceptions=True)
+        if url_results is not None:
+            self._cache_url_results(url_results, key, results)
+        return self._results_for_website(results, company_website)
+    
+    def _finish_url_flight(self, flight_key: Tuple[str, Tuple[str, ...], bool], flight: asyncio.Future,
+                           url_results: Optional[URLResults] = None):
+        """Drop a finished analysis from the in-flight table, keeping its result in url_results if given"""
+        self._url_flights.pop(flight_key, None)
+        if url_results is None or flight.cancelled() or flight.exception() is not None:
+            return
+        self._cache_url_results(url_results, flight_key[:2], flight.result())
+    
+    def _cache_url_results(self, url_results: URLResults, key: Tuple[str, Tuple[str, ...]],
+                           results: Dict[str, ESGReportAnalysisResult]):
+        """Keep a completed analysis in a batch's URLResults, bounded by url_result_cache_size"""
+        url_results[key] = results
+        while len(url_results) > self.config.url_result_cache_size:
+            url_results.popitem(last=False)
+    
+    def _results_for_website(self, results: Dict[str, ESGReportAnalysisResult],
+                             company_website: str) -> Dict[str, ESGReportAnalysisResult]:
+        """Copy shared analysis results for one owning company so callers can modify them independently"""
+        return {
+            version: replace(
+                result,
+                company_website=company_website,
+                website_analysis=copy.deepcopy(result.website_analysis),
+                crawling_evidence=copy.deepcopy(result.crawling_evidence)
             )
+            for version, result in results.items()
+        }
+    
+    async def _analyze_website_versions(self, company_website: str, versions: List[str], company_id: Optional[int],
+                                        reuse_stored: bool) -> Dict[str, ESGReportAnalysisResult]:
+        """Analyze one website for the given versions (the body of analyze_company_website_versions)"""
+        collection_timestamp = datetime.now().isoformat()
+        
+        try:
+            fetched = await self._fetch_website(company_website)
+        except Exception as e:
+            logger.error(f"ESG analysis failed for {company_website}: {e}")
+            return {version: self._error_result(company_website, collection_timestamp, e) for version in versions}
+        
+        return await self._analyze_fetched_website(company_website, versions, company_id, reuse_stored,
+                                                   collection_timestamp, *fetched)
+    
+    async def _fetch_website(self, company_website: str) -> Tuple[WebsiteAnalysis, Optional[str], Optional[Dict[str, Any]]]:
+        """Fetch the homepage (and run sitemap discovery alongside it); returns (analysis, content, url_discovery)"""
+        async with self._client_session() as session:
+            if self.config.sitemap_discovery:
+                (website_analysis, content), url_discovery = await asyncio.gather(
+                    self._fetch_homepage(session, company_website, self._fingerprint_pages),
+                    self._discover_esg_urls(session, company_website)
+                )
+            else:
+                website_analysis, content = await self._fetch_homepage(session, company_website,
+                                                                       self._fingerprint_pages)
+                url_discovery = None
+        return website_analysis, content, url_discovery
+    
+    @contextlib.asynccontextmanager
+    async def _client_session(self):
+        """The warm session shared in service mode, otherwise a session for this analysis"""
+        if self._http_session is not None:
+            yield self._http_session
+            return
+        async with aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout),
+            headers={'User-Agent': self.config.user_agent}
+        ) as session:
+            yield session
+    
+    async def _analyze_fetched_website(self, company_website: str, versions: List[str], company_id: Optional[int],
+                                       reuse_stored: bool, collection_timestamp: str, website_analysis: WebsiteAnalysis,
+                                       content: Optional[str],
+                                       url_discovery: Optional[Dict[str, Any]]) -> Dict[str, ESGReportAnalysisResult]:
+        """
+        Parse a fetched homepage and run detection for each version
+        
+        With dedupe_pages, when the page is a near-duplicate of another company's page
+        already analyzed for these versions (earlier in this run, or in esg_page_fingerprints
+        with dedupe_store), that analysis is reused without parsing or detection. Forced
+        reanalysis (reuse_stored=False) never reuses.
+        """
+        fingerprint = None
+        
+        try:
+            if self.config.dedupe_pages and website_analysis.content_fingerprint:
+                fingerprint = int(website_analysis.content_fingerprint, 16)
+            if fingerprint is not None and reuse_stored:
+                reusable = await self._find_reusable_analysis(fingerprint, versions, company_id)
+                if reusable:
+                    results = self._reuse_results(company_website, collection_timestamp, website_analysis,
+                                                  versions, *reusable, url_discovery=url_discovery)
+                    if self.config.analyze_documents:
+                        await self._analyze_documents(website_analysis.base_url, results)
+                    return results
             
-            return ESGReportAnalysisResult(
+            if content is None:
+                soup = BeautifulSoup("", 'html.parser')
+            else:
+                with self._loop_section("parse", company_website):
+                    website_analysis, soup = self._parse_homepage(website_analysis, content)
+                
+        except Exception as e:
+            logger.error(f"ESG analysis failed for {company_website}: {e}")
+            return {version: self._error_result(company_website, collection_timestamp, e) for version in versions}
+        
+        url_patterns_found = self._detect_esg_url_patterns(
+            company_website, url_discovery["esg_urls"] if url_discovery else None
+        )
+        results = {}
+        
+        # Detection is synchronous, so the per-page memo cannot leak between companies
+        self._detection_memo = {}
+        try:
+            for version in versions:
+                try:
+                    # Detect ESG content and get evidence
+                    with self._loop_section(f"detect v{version}", company_website):
+                        has_esg_reports, crawling_evidence = self._detect_with_memo(soup, version)
+                    results[version] = self._build_result(
+                        company_website, collection_timestamp, website_analysis,
+                        has_esg_reports, crawling_evidence, url_patterns_found, version,
+                        url_discovery=url_discovery
+                    )
+                    
+                except Exception as e:
+                    logger.error(f"ESG v{version} analysis failed for {company_website}: {e}")
+                    results[version] = self._error_result(company_website, collection_timestamp, e)
+        finally:
+            self._detection_memo = None
+        
+        # Indexed before document analysis: another company reusing the page must not inherit this one's PDFs
+        if fingerprint is not None and all(result.crawling_evidence is not None for result in results.values()):
+            analyses = {version: result.to_dict() for version, result in results.items()}
+            self._page_index.add(fingerprint, (company_id, company_website, analyses))
+        
+        if self.config.analyze_documents and website_analysis.is_accessible:
+            await self._analyze_documents(website_analysis.base_url, results)
+        
+        return results
+    
+    async def _find_reusable_analysis(self, fingerprint: int, versions: List[str],
+                                      company_id: Optional[int]) -> Optional[Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]]:
+        """Return (reused_from, {version: analysis}) of another company's near-duplicate page analyzed for all versions"""
+        match = self._page_index.find(fingerprint, accept=lambda value: (
+            (company_id is None or value[0] != company_id) and all(version in value[2] for version in versions)
+        ))
+        if match:
+            (source_company_id, source_website, analyses), distance = match
+            return {"smm_company_id": source_company_id, "company_website": source_website,
+                    "hamming_distance": distance}, analyses
+        
+        if (company_id is not None and self.config.dedupe_store and self.db_pool
+                and await self._ensure_fingerprint_store()):
+            return await self._find_stored_duplicate(fingerprint, versions, company_id)
+        return None
+    
+    async def _find_stored_duplicate(self, fingerprint: int, versions: List[str],
+                                     company_id: int) -> Optional[Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]]:
+        """Look up esg_page_fingerprints for another company whose page is a near-duplicate"""
+        async with self.db_pool.acquire() as conn:
+            rows = await self.queries.fetch(conn, "select_fingerprint_candidates", *simhash_bands(fingerprint), company_id)
+        
+        best = None
+        for row in rows:
+            distance = simhash_distance(fingerprint, row['simhash'] % (1 << SIMHASH_BITS))
+            if distance > NEAR_DUPLICATE_DISTANCE or (best and best[0]["hamming_distance"] <= distance):
+                continue
+            analyses = self._latest_fingerprinted_analyses(row['esg_info'], versions, fingerprint)
+            if analyses:
+                best = ({"smm_company_id": row['smm_company_id'], "company_website": row['page_url'],
+                         "hamming_distance": distance}, analyses)
+        return best
+    
+    def _latest_fingerprinted_analyses(self, esg_info: Any, versions: List[str],
+                                       fingerprint: int) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Latest stored analysis per version made from a near-duplicate of the page, or None if any is missing"""
+        if isinstance(esg_info, str):
+            esg_info = json.loads(esg_info)
+        if not isinstance(esg_info, list):
+            esg_info = [esg_info] if esg_info else []
+        
+        analyses = {}
+        for analysis in esg_info:
+            stored_fingerprint = (analysis.get('website_analysis') or {}).get('content_fingerprint')
+            # A stored verdict may rest on the source company's PDFs, which say nothing about this company
+            evidence = analysis.get('crawling_evidence') or {}
+            if any(document.get('report_keywords') for document in evidence.get('document_analysis') or []):
+                continue
+            if (analysis.get('crawler_version') in versions and stored_fingerprint
+                    and simhash_distance(fingerprint, int(stored_fingerprint, 16)) <= NEAR_DUPLICATE_DISTANCE):
+                analyses[analysis['crawler_version']] = analysis
+        
+        return analyses if len(analyses) == len(versions) else None
+    
+    def _reuse_results(self, company_website: str, collection_timestamp: str, website_analysis: WebsiteAnalysis,
+                       versions: List[str], reused_from: Dict[str, Any], analyses: Dict[str, Dict[str, Any]],
+                       url_discovery: Optional[Dict[str, Any]] = None) -> Dict[str, ESGReportAnalysisResult]:
+        """Build this company's results from a near-duplicate page's analyses, keeping its own fetch details"""
+        url_patterns_found = self._detect_esg_url_patterns(
+            company_website, url_discovery["esg_urls"] if url_discovery else None
+        )
+        fetch_details = {
+            key: value for key, value in website_analysis.to_dict().items()
+            if key in ('base_url', 'status_code', 'content_type', 'page_size', 'response_time', 'content_fingerprint')
+        }
+        
+        results = {}
+        for version in versions:
+            source = analyses[version]
+            crawling_evidence = copy.deepcopy(source.get('crawling_evidence')) or {}
+            crawling_evidence["url_patterns_found"] = list(url_patterns_found)
+            crawling_evidence.pop("url_discovery", None)
+            crawling_evidence.pop("document_analysis", None)
+            if url_discovery is not None:
+                crawling_evidence["url_discovery"] = copy.deepcopy(url_discovery)
+            crawling_evidence["reused_from"] = reused_from
+            results[version] = ESGReportAnalysisResult(
                 company_website=company_website,
                 collection_timestamp=collection_timestamp,
-                website_analysis=error_analysis.to_dict(),
-                has_esg_reports=False
+                website_analysis=dict(source['website_analysis'], **fetch_details),
+                has_esg_reports=source['has_esg_reports'],
+                crawling_evidence=crawling_evidence,
+                crawler_config=self._get_crawler_config_dict()
+            )
+        
+        logger.info(f"Reused ESG v{', '.join(versions)} analysis of near-duplicate {reused_from['company_website']} "
+                    f"for {company_website} (simhash distance {reused_from['hamming_distance']})")
+        return results
+    
+    def _build_result(self, company_website: str, collection_timestamp: str, website_analysis: WebsiteAnalysis,
+                      has_esg_reports: bool, crawling_evidence: Dict[str, Any], url_patterns_found: List[str],
+                      version: str, url_discovery: Optional[Dict[str, Any]] = None) -> ESGReportAnalysisResult:
+        """Assemble and log the analysis result of one detector version for a fetched page"""
+        # Add URL pattern detection to evidence
+        crawling_evidence["url_patterns_found"] = list(url_patterns_found)
+        if url_discovery is not None:
+            crawling_evidence["url_discovery"] = copy.deepcopy(url_discovery)
+        
+        # Homepage ESG signal for this version's detector
+        version_analysis = website_analysis
+        if website_analysis.is_accessible:
+            version_analysis = replace(
+                website_analysis,
+                sustainability_section_found=has_esg_reports or website_analysis.sustainability_links_found > 0
+            )
+        
+        # Log the result with evidence summary
+        evidence_summary = {
+            "keywords_count": len(crawling_evidence["keywords_found"]),
+            "nav_matches_count": len(crawling_evidence["navigation_matches"]),
+            "title_matches_count": len(crawling_evidence["title_matches"]),
+            "url_patterns_count": len(crawling_evidence["url_patterns_found"])
+        }
+        logger.info(f"ESG v{version} analysis complete for {company_website}: ESG reports found = {has_esg_reports}, Evidence: {evidence_summary}")
+        
+        return ESGReportAnalysisResult(
+            company_website=company_website,
+            collection_timestamp=collection_timestamp,
+            website_analysis=version_analysis.to_dict(),
+            has_esg_reports=has_esg_reports,
+            crawling_evidence=crawling_evidence,
+            crawler_config=self._get_crawler_config_dict()
+        )
+    
+    def _analyze_pages_batch(self, pages: List[Tuple[str, WebsiteAnalysis, BeautifulSoup]],
+                             collection_timestamp: str) -> List[ESGReportAnalysisResult]:
+        """Run batched detection over fetched or replayed pages and build their results"""
+        detections = self.detect_esg_content_batch([soup for _, _, soup in pages], self.version)
+        
+        return [
+            self._build_result(
+                company_website, collection_timestamp, website_analysis, has_esg_reports,
+                crawling_evidence, self._detect_esg_url_patterns(company_website), self.version
+            )
+            for (company_website, website_analysis, _), (has_esg_reports, crawling_evidence) in zip(pages, detections)
+        ]
+    
+    def analyze_html_batch(self, pages: List[Tuple[str, str]]) -> List[ESGReportAnalysisResult]:
+        """
+        Analyze already downloaded pages, e.g. for replay and re-scoring runs
+        
+        Args:
+            pages: (company_website, html) pairs
+            
+        Returns:
+            List[ESGReportAnalysisResult]: Analysis results in input order
+        """
+        collection_timestamp = datetime.now().isoformat()
+        parsed_pages = []
+        
+        for company_website, html in pages:
+            soup = BeautifulSoup(html, 'html.parser')
+            base_url = self._normalize_url(company_website)
+            all_links = self._extract_links(soup, base_url)
+            esg_links = self._filter_esg_links(all_links)
+            website_analysis = WebsiteAnalysis(
+                base_url=base_url,
+                is_accessible=True,
+                page_size=len(html),
+                has_navigation=self._detect_navigation(soup),
+                language=self._detect_language(soup),
+                sustainability_section_found=len(esg_links) > 0,
+                sustainability_links_found=len(esg_links),
+                total_links_found=len(all_links)
             )
+            parsed_pages.append((company_website, website_analysis, soup))
+        
+        return self._analyze_pages_batch(parsed_pages, collection_timestamp)
+    
+    def _error_result(self, company_website: str, collection_timestamp: str, error: Exception) -> ESGReportAnalysisResult:
+        """Build the result stored when a website could not be analyzed"""
+        error_analysis = WebsiteAnalysis(
+            base_url=company_website,
+            is_accessible=False,
+            error_message=str(error)
+        )
+        
+        return ESGReportAnalysisResult(
+            company_website=company_website,
+            collection_timestamp=collection_timestamp,
+            website_analysis=error_analysis.to_dict(),
+            has_esg_reports=False
+        )
     
-    async def batch_analyze_companies(self, company_websites: List[str]) -> List[ESGReportAnalysisResult]:
+    async def batch_analyze_companies(self, company_websites: List[str],
+                                      vectorized: bool = False) -> List[ESGReportAnalysisResult]:
         """
-        Analyze multiple company websites in batch
+        Analyze multiple company websites in batch, at most config.max_concurrency at once
         
         Args:
             company_websites: List of company website URLs to analyze
+            vectorized: Fetch all pages first, then detect with batched sentiment
+                and vectorized scoring (detect_esg_content_batch)
             
         Returns:
             List[ESGReportAnalysisResult]: Analysis results for all companies
         """
-        tasks = [self.analyze_company_website(website) for website in company_websites]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Handle exceptions in results
-        valid_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Failed to analyze {company_websites[i]}: {result}")
-                # Create error result
-                error_result = ESGReportAnalysisResult(
-                    company_website=company_websites[i],
-                    collection_timestamp=datetime.now().isoformat(),
-                    website_analysis=WebsiteAnalysis(
-                        base_url=company_websites[i],
-                        is_accessible=False,
-                        error_message=str(result)
-                    ).to_dict(),
-                    has_esg_reports=False
-                )
-                valid_results.append(error_result)
-            else:
-                valid_results.append(result)
+        if vectorized:
+            return await self._batch_analyze_companies_vectorized(company_websites)
+        
+        results: List[Optional[ESGReportAnalysisResult]] = [None] * len(company_websites)
+        async for i, result in self.stream_analyze_companies(company_websites, self.config.max_concurrency):
+            results[i] = result
+        return results
+    
+    async def stream_analyze_companies(self, company_websites: Union[Iterable[str], AsyncIterable[str]],
+                                       concurrency: int = 10) -> AsyncIterator[Tuple[int, ESGReportAnalysisResult]]:
+        """
+        Analyze websites with at most `concurrency` in flight, yielding results as they complete
+        
+        The input is consumed lazily, one website per free slot, so arbitrarily long
+        iterables are analyzed in constant memory. Results arrive in completion order,
+        tagged with the website's position in the input. Closing the generator early
+        cancels the analyses still in flight. Websites repeated in the input share one analysis,
+        kept for this stream only (other streams and batches running meanwhile keep their own).
+        
+        Args:
+            company_websites: Iterable or async iterable of website URLs
+            concurrency: Maximum number of websites analyzed at once
+            
+        Yields:
+            Tuple[int, ESGReportAnalysisResult]: (input index, analysis result)
+        """
+        if isinstance(company_websites, AsyncIterable):
+            websites = company_websites.__aiter__()
+        else:
+            websites = iter(company_websites)
+        
+        exhausted_marker = object()
+        url_results: URLResults = OrderedDict()
+        
+        async def next_website() -> Any:
+            try:
+                if isinstance(websites, AsyncIterator):
+                    return await websites.__anext__()
+                return next(websites)
+            except (StopIteration, StopAsyncIteration):
+                return exhausted_marker
+        
+        pending: Dict[asyncio.Task, Tuple[int, str]] = {}
+        next_index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < max(1, concurrency):
+                    website = await next_website()
+                    if website is exhausted_marker:
+                        exhausted = True
+                        break
+                    analysis = self.analyze_company_website_versions(website, [self.version], url_results=url_results)
+                    pending[asyncio.ensure_future(analysis)] = (next_index, website)
+                    next_index += 1
+                
+                if not pending:
+                    return
+                
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    i, website = pending.pop(task)
+                    try:
+                        result = task.result()[self.version]
+                    except Exception as e:
+                        logger.error(f"Failed to analyze {website}: {e}")
+                        result = self._error_result(website, datetime.now().isoformat(), e)
+                    yield i, result
+        finally:
+            for task in pending:
+                task.cancel()
+            # Let the cancelled analyses unwind (closing their sessions) before the caller moves on
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def _batch_analyze_companies_vectorized(self, company_websites: List[str]) -> List[ESGReportAnalysisResult]:
+        """Fetch every distinct website over one session, then analyze the reachable pages as one batch"""
+        collection_timestamp = datetime.now().isoformat()
+        
+        # Websites normalizing to the same URL are fetched and analyzed once
+        positions_by_url: Dict[str, List[int]] = {}
+        for i, website in enumerate(company_websites):
+            positions_by_url.setdefault(self._normalize_url(website), []).append(i)
+        first_positions = [positions[0] for positions in positions_by_url.values()]
+        
+        async with aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout),
+            headers={'User-Agent': self.config.user_agent}
+        ) as session:
+            fetched = await asyncio.gather(
+                *(self._analyze_website_structure(session, company_websites[i]) for i in first_positions),
+                return_exceptions=True
+            )
+        
+        results: List[Optional[ESGReportAnalysisResult]] = [None] * len(company_websites)
+        pages = []
+        page_positions = []
+        for i, outcome in zip(first_positions, fetched):
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to analyze {company_websites[i]}: {outcome}")
+                results[i] = self._error_result(company_websites[i], collection_timestamp, outcome)
+                continue
+            website_analysis, soup = outcome
+            pages.append((company_websites[i], website_analysis, soup))
+            page_positions.append(i)
+        
+        for position, result in zip(page_positions, self._analyze_pages_batch(pages, collection_timestamp)):
+            results[position] = result
+        
+        # Fan the shared results out to the remaining websites of each URL
+        for first, *others in positions_by_url.values():
+            for i in others:
+                results[i] = self._results_for_website({self.version: results[first]}, company_websites[i])[self.version]
         
-        return valid_results
+        return results
     
     async def _analyze_website_structure(self, session: aiohttp.ClientSession, base_url: str) -> tuple[WebsiteAnalysis, BeautifulSoup]:
         """Analyze website structure and look for ESG/sustainability indicators"""
+        website_analysis, content = await self._fetch_homepage(session, base_url, self._fingerprint_pages)
+        if content is None:
+            return website_analysis, BeautifulSoup("", 'html.parser')
+        
+        try:
+            return self._parse_homepage(website_analysis, content)
+        except Exception as e:
+            return replace(website_analysis, is_accessible=False, error_message=str(e)), BeautifulSoup("", 'html.parser')
+    
+    async def _fetch_homepage(self, session: aiohttp.ClientSession, base_url: str,
+                              fingerprint: bool = False) -> Tuple[WebsiteAnalysis, Optional[str]]:
+        """Fetch the homepage; returns its fetch-level analysis and HTML (None when not accessible)"""
+        # Add delay for respectful crawling
+        await asyncio.sleep(self.config.request_delay)
+        
+        limiter = self._fetch_limiter
+        if limiter is None:
+            return await self._fetch_homepage_once(session, base_url, fingerprint)
+        
+        started = await limiter.acquire()
+        failed = True
+        try:
+            hedge_delay = limiter.hedge_delay() if self.config.hedge_requests else None
+            if hedge_delay is None:
+                website_analysis, content = await self._fetch_homepage_once(session, base_url, fingerprint)
+            else:
+                website_analysis, content = await self._hedged_fetch_homepage(session, base_url, hedge_delay,
+                                                                              fingerprint)
+            failed = self._is_overload_signal(website_analysis)
+            return website_analysis, content
+        finally:
+            await limiter.release(started, failed)
+    
+    async def _hedged_fetch_homepage(self, session: aiohttp.ClientSession, base_url: str, hedge_delay: float,
+                                     fingerprint: bool = False) -> Tuple[WebsiteAnalysis, Optional[str]]:
+        """Fetch, re-issuing the request if it is still running after hedge_delay; the first success wins"""
+        pending = {asyncio.ensure_future(self._fetch_homepage_once(session, base_url, fingerprint))}
+        done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+        if not done:
+            self._fetch_limiter.hedged += 1
+            logger.debug(f"Hedging fetch of {base_url} after {hedge_delay:.2f}s")
+            pending.add(asyncio.ensure_future(self._fetch_homepage_once(session, base_url, fingerprint)))
+        
+        outcome = None
+        try:
+            while done or pending:
+                for task in done:
+                    outcome = task.result()
+                    if outcome[0].is_accessible:
+                        return outcome
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            return outcome
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    def _is_overload_signal(self, website_analysis: WebsiteAnalysis) -> bool:
+        """Whether a fetch outcome indicates overload (timeouts, connection errors, 429, 5xx) rather than a dead page"""
+        if website_analysis.is_accessible:
+            return False
+        status = website_analysis.status_code
+        return status is None or status == 429 or status >= 500
+    
+    async def _fetch_homepage_once(self, session: aiohttp.ClientSession, base_url: str,
+                                   fingerprint: bool = False) -> Tuple[WebsiteAnalysis, Optional[str]]:
+        """Single homepage request (no delay or concurrency control); fingerprint: also simhash the page"""
         start_time = time.time()
         
         try:
             # Normalize URL
             normalized_url = self._normalize_url(base_url)
             
-            # Add delay for respectful crawling
-            await asyncio.sleep(self.config.request_delay)
-            
             # Fetch the homepage
             async with session.get(normalized_url) as response:
                 response_time = time.time() - start_time
@@ -440,36 +3014,25 @@ class ESGReportCrawler:
                         status_code=response.status,
                         response_time=response_time,
                         error_message=f"HTTP {response.status}"
-                    ), BeautifulSoup("", 'html.parser')
+                    ), None
                 
                 content = await response.text()
-                content_type = response.headers.get('content-type', '')
-                
-                # Parse content with BeautifulSoup
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # Extract all links from homepage
-                all_links = self._extract_links(soup, normalized_url)
-                
-                # Filter ESG/sustainability-related links
-                esg_links = self._filter_esg_links(all_links)
-                
-                # Detect ESG content on homepage
-                homepage_has_esg = self._detect_esg_content(soup)
+                simhash = None
+                if fingerprint:
+                    with self._loop_section("fingerprint", normalized_url):
+                        simhash = page_simhash(content)
                 
                 return WebsiteAnalysis(
                     base_url=normalized_url,
                     is_accessible=True,
                     status_code=response.status,
-                    content_type=content_type,
+                    content_type=response.headers.get('content-type', ''),
                     page_size=len(content),
-                    has_navigation=self._detect_navigation(soup),
-                    language=self._detect_language(soup),
-                    sustainability_section_found=homepage_has_esg or len(esg_links) > 0,
-                    sustainability_links_found=len(esg_links),
-                    total_links_found=len(all_links),
-                    response_time=response_time
-                ), soup
+                    response_time=response_time,
+                    content_fingerprint=format(simhash, '016x') if simhash is not None else None,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                ), content
                 
         except asyncio.TimeoutError:
             return WebsiteAnalysis(
@@ -477,45 +3040,343 @@ class ESGReportCrawler:
                 is_accessible=False,
                 error_message="Request timeout",
                 response_time=time.time() - start_time
-            ), BeautifulSoup("", 'html.parser')
+            ), None
         except Exception as e:
             return WebsiteAnalysis(
                 base_url=base_url,
                 is_accessible=False,
                 error_message=str(e),
                 response_time=time.time() - start_time
-            ), BeautifulSoup("", 'html.parser')
+            ), None
     
-    def _normalize_url(self, url: str) -> str:
-        """Normalize URL to standard format"""
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
+    def _parse_homepage(self, website_analysis: WebsiteAnalysis, content: str) -> tuple[WebsiteAnalysis, BeautifulSoup]:
+        """Parse fetched homepage HTML and complete the structural part of its analysis"""
+        # Parse content with BeautifulSoup
+        soup = BeautifulSoup(content, 'html.parser')
         
-        parsed = urlparse(url)
-        normalized = urlunparse((
-            parsed.scheme,
-            parsed.netloc.lower(),
-            parsed.path.rstrip('/') or '/',
-            parsed.params,
-            parsed.query,
-            ''  # Remove fragment
-        ))
+        # Extract all links from homepage
+        all_links = self._extract_links(soup, website_analysis.base_url)
         
-        return normalized
+        # Filter ESG/sustainability-related links
+        esg_links = self._filter_esg_links(all_links)
+        
+        # sustainability_section_found is completed by the caller once the
+        # version detectors have run, so the page is only analyzed once
+        return replace(
+            website_analysis,
+            has_navigation=self._detect_navigation(soup),
+            language=self._detect_language(soup),
+            sustainability_section_found=len(esg_links) > 0,
+            sustainability_links_found=len(esg_links),
+            total_links_found=len(all_links)
+        ), soup
     
-    def _extract_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
-        """Extract all valid links from the page"""
-        links = []
+    async def _discover_esg_urls(self, session: aiohttp.ClientSession, base_url: str) -> Dict[str, Any]:
+        """Discover ESG page URLs of a site from robots.txt and its sitemaps, cached per domain with a TTL"""
+        parsed = urlparse(self._normalize_url(base_url))
+        domain = f"{parsed.scheme}://{parsed.netloc}"
+        now = time.monotonic()
         
-        for link_tag in soup.find_all('a', href=True):
-            href = link_tag['href'].strip()
+        cached = self._discovery_cache.get(domain)
+        if cached and cached[0] > now:
+            return dict(await asyncio.shield(cached[1]), from_cache=True)
+        
+        if len(self._discovery_cache) >= DISCOVERY_CACHE_MAX_DOMAINS:
+            self._discovery_cache = {key: entry for key, entry in self._discovery_cache.items() if entry[0] > now}
+        
+        # The task is cached before it completes, so concurrent lookups for a domain share one discovery
+        discovery = asyncio.ensure_future(self._run_url_discovery(session, domain))
+        self._discovery_cache[domain] = (now + self.config.discovery_cache_ttl, discovery)
+        return dict(await asyncio.shield(discovery), from_cache=False)
+    
+    async def _run_url_discovery(self, session: aiohttp.ClientSession, domain: str) -> Dict[str, Any]:
+        """Read robots.txt Sitemap entries (or /sitemap.xml) and scan the sitemaps for ESG URLs within budget"""
+        discovery = {"sitemap_source": "robots.txt", "sitemaps_read": 0, "urls_scanned": 0, "esg_urls": []}
+        
+        try:
+            sitemaps = await self._fetch_robots_sitemaps(session, domain)
+        except Exception as e:
+            logger.debug(f"robots.txt unavailable for {domain}: {e}")
+            sitemaps = []
+        if not sitemaps:
+            discovery["sitemap_source"] = "default"
+            sitemaps = [f"{domain}/sitemap.xml"]
+        
+        pending = deque(sitemaps)
+        seen = set()
+        while (pending and discovery["sitemaps_read"] < self.config.sitemap_max_files
+               and discovery["urls_scanned"] < self.config.sitemap_max_urls):
+            sitemap_url = pending.popleft()
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
             
-            # Skip empty hrefs, javascript, mailto, etc.
-            if not href or href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+            child_sitemaps = []
+            locs = self._iter_sitemap_locs(session, sitemap_url)
+            try:
+                await asyncio.sleep(self.config.request_delay)
+                async for kind, loc in locs:
+                    if kind == "sitemap":
+                        child_sitemaps.append(loc)
+                        continue
+                    discovery["urls_scanned"] += 1
+                    if len(discovery["esg_urls"]) < DISCOVERY_MAX_ESG_URLS and self._esg_url_regex.search(loc.lower()):
+                        discovery["esg_urls"].append(loc)
+                    if discovery["urls_scanned"] >= self.config.sitemap_max_urls:
+                        break
+            except Exception as e:
+                logger.debug(f"Failed to read sitemap {sitemap_url}: {e}")
                 continue
+            finally:
+                await locs.aclose()
             
-            # Convert relative URLs to absolute
-            absolute_url = urljoin(base_url, href)
+            discovery["sitemaps_read"] += 1
+            # Read ESG-looking child sitemaps (e.g. sitemap-sustainability.xml) first
+            esg_children = [loc for loc in child_sitemaps if self._esg_sitemap_regex.search(loc.lower())]
+            pending.extendleft(reversed(esg_children))
+            pending.extend(loc for loc in child_sitemaps if loc not in esg_children)
+        
+        if discovery["esg_urls"]:
+            logger.info(f"Discovered {len(discovery['esg_urls'])} ESG URLs for {domain} "
+                        f"from {discovery['sitemaps_read']} sitemaps ({discovery['urls_scanned']} URLs scanned)")
+        return discovery
+    
+    async def _fetch_robots_sitemaps(self, session: aiohttp.ClientSession, domain: str) -> List[str]:
+        """Return the Sitemap: entries of a domain's robots.txt"""
+        async with session.get(f"{domain}/robots.txt") as response:
+            if response.status != 200:
+                return []
+            robots = (await response.content.read(ROBOTS_MAX_BYTES)).decode('utf-8', errors='replace')
+        
+        return [urljoin(f"{domain}/", line.split(':', 1)[1].strip()) for line in robots.splitlines()
+                if line.strip().lower().startswith('sitemap:') and line.split(':', 1)[1].strip()]
+    
+    async def _iter_sitemap_locs(self, session: aiohttp.ClientSession, sitemap_url: str):
+        """
+        Stream a sitemap or sitemap index, yielding ("sitemap" | "url", loc) as entries complete
+        
+        The response is parsed chunk by chunk (gunzipped for .gz sitemaps) and completed
+        entries are dropped from the tree, so memory stays flat; reading stops after
+        sitemap_max_bytes of XML.
+        """
+        parser = ElementTree.XMLPullParser(events=('start', 'end'))
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if urlparse(sitemap_url).path.endswith('.gz') else None
+        max_bytes = self.config.sitemap_max_bytes
+        bytes_read = 0
+        root = None
+        
+        async with session.get(sitemap_url) as response:
+            if response.status != 200:
+                return
+            
+            async for chunk in response.content.iter_chunked(SITEMAP_CHUNK_SIZE):
+                if decompressor:
+                    chunk = decompressor.decompress(chunk, max_bytes - bytes_read)
+                chunk = chunk[:max_bytes - bytes_read]
+                bytes_read += len(chunk)
+                parser.feed(chunk)
+                
+                for event, element in parser.read_events():
+                    tag = element.tag.rsplit('}', 1)[-1]
+                    if event == 'start':
+                        if root is None:
+                            root = element
+                        continue
+                    if tag == 'loc' and element.text:
+                        yield ("sitemap" if root.tag.endswith('sitemapindex') else "url"), element.text.strip()
+                    elif tag in ('url', 'sitemap'):
+                        root.clear()
+                
+                if bytes_read >= max_bytes:
+                    logger.debug(f"Sitemap {sitemap_url} truncated at {max_bytes} bytes")
+                    return
+    
+    async def _analyze_documents(self, base_url: str, results: Dict[str, ESGReportAnalysisResult]):
+        """
+        Open the top-ranked sustainability PDFs found by v3+ document discovery and scan their text
+        
+        Each candidate gets a HEAD request for type and size; PDFs above document_max_bytes
+        are skipped, others are streamed with that cap and their first pages are extracted
+        in a worker process. A PDF titled as an ESG report whose text cites a reporting
+        framework confirms has_esg_reports for the versions that discovered it.
+        """
+        documents = {}
+        for result in results.values():
+            discovery = (result.crawling_evidence or {}).get("document_discovery") or {}
+            for document in discovery.get("sustainability_documents", []):
+                if document.get("type") == "pdf":
+                    url = urljoin(base_url, document["url"])
+                    documents.setdefault(url, document)
+        if not documents or not _pdf_support_available():
+            return
+        
+        candidates = sorted(documents.items(), key=lambda item: self._rank_document(*item), reverse=True)
+        document_analyses = []
+        async with aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.config.document_timeout),
+            headers={'User-Agent': self.config.user_agent}
+        ) as session:
+            for url, _ in candidates[:self.config.document_max_count * 3]:
+                if sum(analysis["status"] == "analyzed" for analysis in document_analyses) >= self.config.document_max_count:
+                    break
+                document_analyses.append(await self._analyze_document(session, url))
+        
+        confirmed = any(analysis.get("confirms_report") for analysis in document_analyses)
+        for result in results.values():
+            if not result.crawling_evidence or "document_discovery" not in result.crawling_evidence:
+                continue
+            result.crawling_evidence["document_analysis"] = copy.deepcopy(document_analyses)
+            if confirmed and not result.has_esg_reports:
+                result.has_esg_reports = True
+                result.website_analysis["sustainability_section_found"] = True
+        
+        if confirmed:
+            logger.info(f"ESG report confirmed from document text for {base_url}")
+    
+    def _rank_document(self, url: str, document: Dict[str, Any]) -> Tuple[int, int]:
+        """Rank a discovered PDF by report terms in its link text/URL, then by the latest year it names"""
+        label = f"{document.get('link_text', '')} {url}".lower()
+        relevance = sum(weight for term, weight in REPORT_RANKING_TERMS.items() if term in label)
+        years = [int(year) for year in re.findall(r'\b(20\d{2})\b', label)]
+        return relevance, max(years, default=0)
+    
+    async def _analyze_document(self, session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+        """HEAD, stream (within the byte budget) and scan one PDF; returns its document_analysis entry"""
+        analysis = {"url": url, "status": "skipped"}
+        max_bytes = self.config.document_max_bytes
+        
+        try:
+            async with session.head(url, allow_redirects=True) as response:
+                if response.status < 400:
+                    content_type = response.headers.get('content-type', '').lower()
+                    analysis["content_length"] = response.content_length
+                    if content_type and 'pdf' not in content_type and 'octet-stream' not in content_type:
+                        analysis["reason"] = f"content type {content_type}"
+                        return analysis
+                    if response.content_length and response.content_length > max_bytes:
+                        analysis["reason"] = "over byte budget"
+                        return analysis
+            
+            # Servers without (correct) HEAD support are still held to the byte budget while streaming
+            data = bytearray()
+            async with session.get(url) as response:
+                if response.status != 200:
+                    analysis["reason"] = f"HTTP {response.status}"
+                    return analysis
+                async for chunk in response.content.iter_chunked(DOCUMENT_CHUNK_SIZE):
+                    data.extend(chunk[:max_bytes - len(data)])
+                    if len(data) >= max_bytes:
+                        analysis["truncated"] = True
+                        break
+        except Exception as e:
+            analysis["reason"] = f"download failed: {e}"
+            return analysis
+        
+        analysis["bytes_read"] = len(data)
+        if b'%PDF' not in data[:1024]:
+            analysis["reason"] = "not a PDF"
+            return analysis
+        
+        loop = asyncio.get_running_loop()
+        try:
+            extracted = await asyncio.wait_for(
+                loop.run_in_executor(self._get_document_pool(), extract_pdf_text, bytes(data),
+                                     self.config.document_max_pages, self.config.document_max_chars),
+                timeout=self.config.document_timeout
+            )
+        except asyncio.TimeoutError:
+            self._reset_document_pool()
+            analysis["reason"] = "text extraction timed out"
+            return analysis
+        except BrokenProcessPool as e:
+            self._reset_document_pool()
+            analysis["reason"] = f"document worker failed: {e}"
+            return analysis
+        except Exception as e:
+            analysis["reason"] = f"unreadable: {e}"
+            return analysis
+        finally:
+            del data
+        
+        text = extracted["text"].lower()
+        quantitative = self._extract_quantitative_data_from_text(text)
+        report_frameworks = sorted(set(REPORT_TYPE_PATTERN.findall(text)))
+        analysis.update({
+            "status": "analyzed",
+            "pages_read": extracted["pages_read"],
+            "page_count": extracted["page_count"],
+            "characters_scanned": len(text),
+            "report_keywords": [keyword for keyword in self.esg_keywords if keyword in text],
+            "report_frameworks": report_frameworks,
+            "confirms_report": self._is_titled_esg_report(extracted.get("title", "")) and bool(report_frameworks),
+            "keywords_found": [
+                {"keyword": keyword, "impact": tier.replace('_impact', '')}
+                for tier, keywords in SUSTAINABILITY_KEYWORD_TIERS.items()
+                for keyword in keywords if keyword.lower() in text
+            ],
+            "quantitative_summary": {key: len(values) for key, values in quantitative.items()},
+            "numerical_goals": quantitative["numerical_goals"],
+            "years_found": sorted(quantitative["years_found"])
+        })
+        return analysis
+    
+    def _is_titled_esg_report(self, title: str) -> bool:
+        """Whether a PDF's title or opening text names an ESG report"""
+        title = title.lower()
+        return any(keyword in title for keyword in self.esg_keywords)
+    
+    def _get_document_pool(self) -> ProcessPoolExecutor:
+        """Worker process for PDF text extraction, started on first use"""
+        if self._document_pool is None:
+            context = multiprocessing.get_context('spawn')
+            # The worker reports its pid so a hung extraction can be killed without executor internals
+            self._document_worker_pid = context.Value('i', 0)
+            self._document_pool = ProcessPoolExecutor(max_workers=1, mp_context=context,
+                                                      initializer=_record_document_worker_pid,
+                                                      initargs=(self._document_worker_pid,))
+        return self._document_pool
+    
+    def _reset_document_pool(self):
+        """Discard the document worker after a timeout or crash, killing an extraction still running in it"""
+        pool, self._document_pool = self._document_pool, None
+        if pool is None:
+            return
+        worker_pid = self._document_worker_pid.value
+        if worker_pid:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(worker_pid, signal.SIGTERM)
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _normalize_url(self, url: str) -> str:
+        """Normalize URL to standard format"""
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        
+        parsed = urlparse(url)
+        normalized = urlunparse((
+            parsed.scheme,
+            parsed.netloc.lower(),
+            parsed.path.rstrip('/') or '/',
+            parsed.params,
+            parsed.query,
+            ''  # Remove fragment
+        ))
+        
+        return normalized
+    
+    def _extract_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
+        """Extract all valid links from the page"""
+        links = []
+        
+        for link_tag in soup.find_all('a', href=True):
+            href = link_tag['href'].strip()
+            
+            # Skip empty hrefs, javascript, mailto, etc.
+            if not href or href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+                continue
+            
+            # Convert relative URLs to absolute
+            absolute_url = urljoin(base_url, href)
             
             # Only include HTTP/HTTPS links from same domain
             if (absolute_url.startswith(('http://', 'https://')) and 
@@ -548,17 +3409,29 @@ class ESGReportCrawler:
         
         return esg_links
     
-    def _detect_esg_content(self, soup: BeautifulSoup) -> tuple[bool, Dict[str, Any]]:
+    def _detect_esg_content(self, soup: BeautifulSoup, version: Optional[str] = None) -> tuple[bool, Dict[str, Any]]:
         """Detect ESG content using version-specific logic"""
-        if self.version == "4.0":
+        version = version or self.version
+        if version == "4.0":
             return self._detect_esg_content_v4(soup)
-        elif self.version == "3.0":
+        elif version == "3.0":
             return self._detect_esg_content_v3(soup)
-        elif self.version == "2.0":
+        elif version == "2.0":
             return self._detect_esg_content_v2(soup)
         else:
             return self._detect_esg_content_v1(soup)
     
+    def _detect_with_memo(self, soup: BeautifulSoup, version: str) -> tuple[bool, Dict[str, Any]]:
+        """Run a detector version, reusing its result when several versions analyze the same page"""
+        if self._detection_memo is None:
+            return self._detect_esg_content(soup, version)
+        
+        if version not in self._detection_memo:
+            self._detection_memo[version] = self._detect_esg_content(soup, version)
+        
+        has_esg, evidence = self._detection_memo[version]
+        return has_esg, copy.deepcopy(evidence)
+    
     def _detect_esg_content_v1(self, soup: BeautifulSoup) -> tuple[bool, Dict[str, Any]]:
         """Version 1: Basic keyword detection with evidence"""
         evidence = {
@@ -592,19 +3465,18 @@ class ESGReportCrawler:
                     "position": start_idx
                 })
         
-        # Check for ESG-related navigation items
-        nav_elements = soup.find_all(['nav', 'ul', 'div'], class_=re.compile(r'nav|menu', re.I))
-        for nav in nav_elements:
-            nav_text = nav.get_text().lower()
-            esg_nav_keywords = ['sustainability', 'esg', 'csr', 'responsibility', 'environmental', 'governance']
+        # Check for ESG-related navigation items (outermost nav/menu containers)
+        esg_nav_keywords = ['sustainability', 'esg', 'csr', 'responsibility', 'environmental', 'governance']
+        for nav in self._extract_navigation_features(soup)["containers"]:
+            nav_text = nav["text"]
             for keyword in esg_nav_keywords:
                 if keyword in nav_text:
                     has_esg = True
                     evidence["navigation_matches"].append({
                         "keyword": keyword,
                         "nav_text": nav_text.strip()[:200],  # First 200 chars
-                        "element_type": nav.name,
-                        "element_class": nav.get('class', [])
+                        "element_type": nav["element_type"],
+                        "element_class": nav["element_class"]
                     })
         
         # Check page title and meta description
@@ -640,19 +3512,7 @@ class ESGReportCrawler:
         }
         
         # Enhanced keyword categories with different weights
-        sustainability_keywords = {
-            'high_impact': [
-                'sustainability report', 'carbon footprint', 'net zero', 
-                'science-based targets', 'ESG strategy', 'climate action'
-            ],
-            'medium_impact': [
-                'green initiatives', 'renewable energy', 'energy efficiency',
-                'waste reduction', 'circular economy'
-            ],
-            'low_impact': [
-                'eco-friendly', 'sustainable practices', 'environmental awareness'
-            ]
-        }
+        sustainability_keywords = SUSTAINABILITY_KEYWORD_TIERS
         
         page_text = soup.get_text().lower()
         content_quality_score = 0.0
@@ -713,21 +3573,20 @@ class ESGReportCrawler:
             content_quality_score += 0.05
             evidence["targets_or_goals_found"] = True
         
-        # Enhanced navigation analysis
-        nav_elements = soup.find_all(['nav', 'ul', 'div'], class_=re.compile(r'nav|menu', re.I))
+        # Enhanced navigation analysis (outermost nav/menu containers)
         nav_score = 0.0
+        esg_nav_keywords = ['sustainability', 'esg', 'csr', 'responsibility', 'environmental', 'governance']
         
-        for nav in nav_elements:
-            nav_text = nav.get_text().lower()
-            esg_nav_keywords = ['sustainability', 'esg', 'csr', 'responsibility', 'environmental', 'governance']
+        for nav in self._extract_navigation_features(soup)["containers"]:
+            nav_text = nav["text"]
             for keyword in esg_nav_keywords:
                 if keyword in nav_text:
                     nav_score += 0.1
                     evidence["navigation_matches"].append({
                         "keyword": keyword,
                         "nav_text": nav_text.strip()[:200],
-                        "element_type": nav.name,
-                        "element_class": nav.get('class', []),
+                        "element_type": nav["element_type"],
+                        "element_class": nav["element_class"],
                         "confidence": 0.8
                     })
         
@@ -766,6 +3625,16 @@ class ESGReportCrawler:
             "title_score": round(title_score, 3)
         }
         
+        evidence["scoring_features"] = {
+            "high_impact_keywords": high_impact_matches,
+            "medium_impact_keywords": medium_impact_matches,
+            "low_impact_keywords": low_impact_matches,
+            "quantitative_pattern": int(quantitative_pattern is not None),
+            "targets_pattern": int(targets_pattern is not None),
+            "navigation_matches": len(evidence["navigation_matches"]),
+            "title_matches": len(evidence["title_matches"])
+        }
+        
         # Determine if ESG content is present (more sophisticated threshold)
         has_esg = overall_score >= 2.0 or confidence >= 0.6
         
@@ -799,11 +3668,12 @@ class ESGReportCrawler:
                 "metrics_found": [],
                 "years_found": [],
                 "numerical_goals": []
-            }
+            },
+            "scoring_features": {}
         }
         
         # Start with Version 2 scoring as base
-        has_esg_v2, evidence_v2 = self._detect_esg_content_v2(soup)
+        has_esg_v2, evidence_v2 = self._detect_with_memo(soup, "2.0")
         
         # Merge Version 2 evidence
         for key in evidence_v2:
@@ -859,6 +3729,15 @@ class ESGReportCrawler:
         quant_confidence = min(len(quantitative_data["targets_found"]) * 0.05, 0.1)
         evidence["confidence_level"] = min(base_confidence + doc_confidence + quant_confidence, 1.0)
         
+        evidence["scoring_features"] = dict(
+            evidence["scoring_features"],
+            total_documents=documents_found["total_documents_found"],
+            sustainability_documents=len(documents_found["sustainability_documents"]),
+            percentages=len(quantitative_data["percentages_found"]),
+            targets=len(quantitative_data["targets_found"]),
+            numerical_goals=len(quantitative_data["numerical_goals"])
+        )
+        
         # Determine ESG presence with enhanced threshold
         has_esg = evidence["sustainability_score"] >= 2.5 or evidence["confidence_level"] >= 0.7 or has_esg_v2
         
@@ -889,13 +3768,15 @@ class ESGReportCrawler:
         ]
         
         for link in links:
-            href = link.get('href', '').lower()
+            # Matching is case-insensitive, but the stored URL keeps its case so it can be fetched
+            url = link.get('href', '')
+            href = url.lower()
             link_text = link.get_text().strip().lower()
             
             # Check for PDF documents
             if any(ext in href for ext in pdf_extensions):
                 doc_info = {
-                    "url": href,
+                    "url": url,
                     "link_text": link_text,
                     "type": "pdf",
                     "is_sustainability_related": any(keyword in href or keyword in link_text 
@@ -909,7 +3790,7 @@ class ESGReportCrawler:
             # Check for DOC/Office documents
             elif any(ext in href for ext in doc_extensions):
                 doc_info = {
-                    "url": href,
+                    "url": url,
                     "link_text": link_text,
                     "type": "office_document",
                     "is_sustainability_related": any(keyword in href or keyword in link_text 
@@ -941,6 +3822,10 @@ class ESGReportCrawler:
     
     def _extract_quantitative_data(self, soup: BeautifulSoup) -> Dict[str, Any]:
         """Extract quantitative data patterns from page content"""
+        return self._extract_quantitative_data_from_text(soup.get_text())
+    
+    def _extract_quantitative_data_from_text(self, page_text: str) -> Dict[str, Any]:
+        """Extract quantitative data patterns from plain text (page or document)"""
         quantitative_patterns = {
             "percentages_found": [],
             "targets_found": [],
@@ -949,8 +3834,6 @@ class ESGReportCrawler:
             "numerical_goals": []
         }
         
-        page_text = soup.get_text()
-        
         # Regex patterns for quantitative data
         percentage_pattern = r'(\d+(?:\.\d+)?)\s*%'
         target_pattern = r'(?:target|goal|aim|reduce|increase|achieve)\s+(?:by\s+)?(\d{4}|\d+(?:\.\d+)?%|\d+(?:\.\d+)?\s*(?:million|billion|thousand|tons?|kg|mt))'
@@ -987,10 +3870,68 @@ class ESGReportCrawler:
     
     def _detect_esg_content_v4(self, soup: BeautifulSoup) -> tuple[bool, Dict[str, Any]]:
         """Version 4: Advanced NLP Processing with Sentiment Analysis and Named Entity Recognition"""
+        evidence = self._new_v4_evidence()
+        
+        # Cascade mode: settle clear positives and negatives before any NLP work
+        if self.config.cascade:
+            early_decision = self._cascade_early_decision(soup, evidence)
+            if early_decision is not None:
+                return early_decision, evidence
+        
+        # Check if NLP libraries are available (imported lazily on first use)
+        if not _load_nlp_libraries():
+            logger.warning("NLP libraries not available. Falling back to Version 3.0")
+            return self._detect_with_memo(soup, "3.0")
+        
         # Download required NLTK data if not available
         self._ensure_nltk_data()
         
-        evidence = {
+        # Start with Version 3 as base
+        has_esg_v3, evidence_v3 = self._detect_with_memo(soup, "3.0")
+        
+        # Merge Version 3 evidence
+        for key in evidence_v3:
+            if key in evidence and key != "detection_method":
+                evidence[key] = evidence_v3[key]
+        
+        if self.config.cascade:
+            evidence["cascade"] = {"tier": "nlp", "decision": "nlp_analysis"}
+        
+        # Advanced NLP Processing on boilerplate-free, ESG-relevant regions only
+        prepared_text = self._prepare_nlp_text(soup)
+        nlp_results = self._perform_nlp_analysis(prepared_text["text"])
+        if nlp_results:
+            nlp_results["text_preparation"] = prepared_text["stats"]
+        evidence["nlp_analysis"] = nlp_results
+        
+        # Calculate enhanced sustainability score with NLP insights
+        base_score = evidence.get("sustainability_score", 0.0)
+        nlp_score = self._calculate_nlp_score(nlp_results)
+        
+        # Enhanced scoring with NLP factors
+        enhanced_score = base_score + nlp_score
+        evidence["sustainability_score"] = min(enhanced_score, 10.0)
+        
+        # Enhanced confidence with NLP factors
+        base_confidence = evidence.get("confidence_level", 0.0)
+        nlp_confidence = self._calculate_nlp_confidence(nlp_results)
+        evidence["confidence_level"] = min(base_confidence + nlp_confidence, 1.0)
+        
+        evidence["scoring_features"] = dict(evidence["scoring_features"], **self._nlp_scoring_features(nlp_results))
+        
+        # Determine ESG presence with NLP enhancement
+        has_esg = (
+            evidence["sustainability_score"] >= 3.0 or 
+            evidence["confidence_level"] >= 0.75 or 
+            nlp_results.get("commitment_strength", 0.0) >= 0.7 or
+            has_esg_v3
+        )
+        
+        return has_esg, evidence
+    
+    def _new_v4_evidence(self) -> Dict[str, Any]:
+        """Empty evidence in the v4 layout, filled by the cascade tiers or the full v4 pass"""
+        return {
             "keywords_found": [],
             "navigation_matches": [],
             "title_matches": [],
@@ -1005,6 +3946,7 @@ class ESGReportCrawler:
             "targets_or_goals_found": False,
             "document_discovery": {},
             "quantitative_patterns": {},
+            "scoring_features": {},
             "nlp_analysis": {
                 "sentiment_analysis": {},
                 "named_entities": [],
@@ -1016,91 +3958,180 @@ class ESGReportCrawler:
                 "credibility_indicators": {}
             }
         }
+    
+    def _cascade_early_decision(self, soup: BeautifulSoup, evidence: Dict[str, Any]) -> Optional[bool]:
+        """
+        Run the cheap v4 tiers and return a decision when the page is clearly outside the decision band
         
-        # Check if NLP libraries are available
-        if not NLP_AVAILABLE:
-            logger.warning("NLP libraries not available. Falling back to Version 3.0")
-            return self._detect_esg_content_v3(soup)
+        Tier 1 is the v2 keyword/navigation/title scoring and tier 2 adds v3 document
+        discovery and quantitative extraction. A positive at either tier is final because
+        v4 accepts every v3 positive. Negatives are only decided at tier 2, where the
+        score is the v4 base score, and only when full v4 provably cannot turn positive:
+        the score and confidence stay below their thresholds even with the largest NLP
+        boosts, and the commitment strength of the NLP text stays below its threshold.
+        Returns None when NLP has to decide.
+        """
+        v4 = DEFAULT_SCORING["4.0"]
         
-        # Start with Version 3 as base
-        has_esg_v3, evidence_v3 = self._detect_esg_content_v3(soup)
+        for tier, version in (("keyword_signals", "2.0"), ("document_signals", "3.0")):
+            has_esg, tier_evidence = self._detect_with_memo(soup, version)
+            
+            # Merge tier evidence into the v4 evidence layout
+            for key in tier_evidence:
+                if key in evidence and key != "detection_method":
+                    evidence[key] = tier_evidence[key]
+            
+            score = evidence["sustainability_score"]
+            confidence = evidence["confidence_level"]
+            if has_esg:
+                decision = True
+            elif (tier == "document_signals"
+                  and score < self.config.cascade_negative_score
+                  and confidence < self.config.cascade_negative_confidence
+                  and score + v4["nlp_score_cap"] < v4["score_threshold"]
+                  and confidence + v4["nlp_confidence_cap"] < v4["confidence_threshold"]
+                  and self._analyze_commitment_strength(self._prepare_nlp_text(soup)["text"]) < v4["commitment_threshold"]):
+                decision = False
+            else:
+                decision = None
+            
+            if decision is not None:
+                # No NLP ran: the evidence and its scoring features are those of the deciding tier
+                evidence["detection_method"] = f"cascade_{tier}"
+                evidence["cascade"] = {"tier": tier, "decision": "positive" if decision else "negative"}
+                return decision
         
-        # Merge Version 3 evidence
-        for key in evidence_v3:
-            if key in evidence and key != "detection_method":
-                evidence[key] = evidence_v3[key]
+        return None
+    
+    def _extract_content_blocks(self, soup: BeautifulSoup) -> List[str]:
+        """Collect page text per block element, skipping boilerplate subtrees (the soup is not modified)"""
+        blocks = []
+        current = []
+        flush = object()  # Marker closing a block element
         
-        # Advanced NLP Processing
-        page_text = soup.get_text()
-        nlp_results = self._perform_nlp_analysis(page_text)
-        evidence["nlp_analysis"] = nlp_results
+        stack = list(reversed(soup.contents))
+        while stack:
+            node = stack.pop()
+            
+            if node is flush:
+                if current:
+                    blocks.append(" ".join(" ".join(current).split()))
+                    current = []
+                continue
+            
+            if isinstance(node, NavigableString):
+                if not isinstance(node, PreformattedString):
+                    current.append(str(node))
+                continue
+            
+            if not isinstance(node, Tag) or node.name in BOILERPLATE_TAGS:
+                continue
+            
+            classes = node.get('class') or []
+            attributes = " ".join(classes if isinstance(classes, list) else [classes]) + " " + (node.get('id') or '')
+            if BOILERPLATE_ATTR_PATTERN.search(attributes):
+                continue
+            
+            if node.name in BLOCK_TAGS:
+                # Close the text collected so far, then the block itself after its children
+                stack.append(flush)
+                stack.extend(reversed(node.contents))
+                stack.append(flush)
+            else:
+                stack.extend(reversed(node.contents))
         
-        # Calculate enhanced sustainability score with NLP insights
-        base_score = evidence.get("sustainability_score", 0.0)
-        nlp_score = self._calculate_nlp_score(nlp_results)
+        if current:
+            blocks.append(" ".join(" ".join(current).split()))
         
-        # Enhanced scoring with NLP factors
-        enhanced_score = base_score + nlp_score
-        evidence["sustainability_score"] = min(enhanced_score, 10.0)
+        return [block for block in blocks if block]
+    
+    def _prepare_nlp_text(self, soup: BeautifulSoup) -> Dict[str, Any]:
+        """
+        Prepare the text passed to the NLP stage
         
-        # Enhanced confidence with NLP factors
-        base_confidence = evidence.get("confidence_level", 0.0)
-        nlp_confidence = self._calculate_nlp_confidence(nlp_results)
-        evidence["confidence_level"] = min(base_confidence + nlp_confidence, 1.0)
+        Drops non-content elements (scripts, styles, menus, headers/footers, cookie
+        banners), dedupes repeated blocks and keeps only sentences near ESG keyword
+        hits, up to the configured token budget.
+        """
+        blocks = self._extract_content_blocks(soup)
         
-        # Determine ESG presence with NLP enhancement
-        has_esg = (
-            evidence["sustainability_score"] >= 3.0 or 
-            evidence["confidence_level"] >= 0.75 or 
-            nlp_results["commitment_strength"] >= 0.7 or
-            has_esg_v3
-        )
+        # Dedupe repeated blocks (menus, teasers and footers repeated across the page)
+        seen_blocks = set()
+        unique_blocks = []
+        for block in blocks:
+            block_key = block.lower()
+            if block_key not in seen_blocks:
+                seen_blocks.add(block_key)
+                unique_blocks.append(block)
         
-        return has_esg, evidence
+        # Keep sentences with ESG keywords plus their neighbours within each block
+        context = self.config.nlp_context_sentences
+        token_budget = self.config.nlp_token_budget
+        selected_sentences = []
+        tokens_used = 0
+        budget_exhausted = False
+        
+        for block in unique_blocks:
+            sentences = SENTENCE_SPLIT_PATTERN.split(block)
+            hits = [i for i, sentence in enumerate(sentences) if self._contains_esg_keywords(sentence)]
+            if not hits:
+                continue
+            
+            keep = sorted({j for i in hits for j in range(max(0, i - context), min(len(sentences), i + context + 1))})
+            for i in keep:
+                sentence_tokens = len(sentences[i].split())
+                if tokens_used + sentence_tokens > token_budget:
+                    budget_exhausted = True
+                    break
+                selected_sentences.append(sentences[i])
+                tokens_used += sentence_tokens
+            
+            if budget_exhausted:
+                break
+        
+        text = " ".join(selected_sentences)
+        return {
+            "text": text,
+            "stats": {
+                "content_blocks": len(blocks),
+                "unique_blocks": len(unique_blocks),
+                "selected_sentences": len(selected_sentences),
+                "selected_tokens": tokens_used,
+                "token_budget_exhausted": budget_exhausted
+            }
+        }
     
-    def _perform_nlp_analysis(self, text: str) -> Dict[str, Any]:
-        """Perform comprehensive NLP analysis on the text content"""
-        if not NLP_AVAILABLE:
+    def _perform_nlp_analysis(self, text: str, sentences: Optional[List[str]] = None,
+                              esg_sentiment: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Perform comprehensive NLP analysis on the text content
+        
+        The batch path passes the sentences it already tokenized and the ESG sentiment
+        it scored across all pages; otherwise both are computed here.
+        """
+        if not _load_nlp_libraries():
             return {}
         
         try:
-            # Initialize NLP tools
-            sia = SentimentIntensityAnalyzer()
-            lemmatizer = WordNetLemmatizer()
-            
-            # Download required NLTK data if not present
-            try:
-                nltk.data.find('tokenizers/punkt')
-            except LookupError:
-                nltk.download('punkt', quiet=True)
-            
-            try:
-                nltk.data.find('corpora/stopwords')
-            except LookupError:
-                nltk.download('stopwords', quiet=True)
-            
-            try:
-                nltk.data.find('corpora/wordnet')
-            except LookupError:
-                nltk.download('wordnet', quiet=True)
-            
-            try:
-                nltk.data.find('vader_lexicon')
-            except LookupError:
-                nltk.download('vader_lexicon', quiet=True)
+            # Reuse NLP tools loaded once per process
+            nlp_tools = self._get_nlp_tools()
+            sia = nlp_tools["sia"]
+            lemmatizer = nlp_tools["lemmatizer"]
+            stop_words = nlp_tools["stop_words"]
             
             # Sentiment Analysis
             sentiment_scores = sia.polarity_scores(text)
             
             # Tokenization and preprocessing
-            sentences = sent_tokenize(text)
+            if sentences is None:
+                sentences = sent_tokenize(text)
             words = word_tokenize(text.lower())
-            stop_words = set(stopwords.words('english'))
             filtered_words = [lemmatizer.lemmatize(word) for word in words if word.isalpha() and word not in stop_words]
             
             # ESG-specific sentiment analysis
             esg_sentences = [sent for sent in sentences if self._contains_esg_keywords(sent)]
-            esg_sentiment = np.mean([sia.polarity_scores(sent)['compound'] for sent in esg_sentences]) if esg_sentences else 0.0
+            if esg_sentiment is None:
+                esg_sentiment = np.mean([sia.polarity_scores(sent)['compound'] for sent in esg_sentences]) if esg_sentences else 0.0
             
             # Named Entity Recognition (simplified)
             esg_entities = self._extract_esg_entities(text)
@@ -1144,6 +4175,111 @@ class ESGReportCrawler:
             logger.error(f"NLP analysis failed: {e}")
             return {}
     
+    def _nlp_scoring_features(self, nlp_results: Dict[str, Any]) -> Dict[str, float]:
+        """Numeric NLP inputs of the v4 score and confidence formulas"""
+        credibility = nlp_results.get("credibility_indicators", {})
+        return {
+            "nlp_available": int(bool(nlp_results)),
+            "esg_sentiment": float(nlp_results.get("sentiment_analysis", {}).get("esg_specific_sentiment", 0.0)),
+            "esg_topics": len(nlp_results.get("esg_topics_identified", [])),
+            "commitment_strength": float(nlp_results.get("commitment_strength", 0.0)),
+            "credibility": float(credibility.get("overall_credibility", 0.0)),
+            "forward_statements": len(nlp_results.get("forward_looking_statements", [])),
+            "named_entities": len(nlp_results.get("named_entities", [])),
+            "has_verification": int(bool(credibility.get("has_verification", False))),
+            "has_specific_metrics": int(bool(credibility.get("has_specific_metrics", False)))
+        }
+    
+    def detect_esg_content_batch(self, soups: List[BeautifulSoup],
+                                 version: Optional[str] = None) -> List[Tuple[bool, Dict[str, Any]]]:
+        """
+        Detect ESG content for many parsed pages at once
+        
+        Per-page DOM and regex work is unchanged, but for v4 all pages are tokenized
+        first and the ESG sentences of every page are scored together (each distinct
+        sentence once, averaged per page with numpy). Scores and confidences for
+        v2-v4 are then computed as array operations over the feature matrix. With
+        config.cascade, v4 pages the cheap tiers decide keep that decision and skip
+        the NLP stage, exactly as in per-page detection.
+        """
+        version = version or self.version
+        # Vectorized v2/v3 scoring only needs numpy; nltk is imported for v4 alone
+        vectorized = _load_nlp_libraries() if version == "4.0" else version != "1.0" and _load_numpy()
+        if not vectorized:
+            return [self._detect_esg_content(soup, version) for soup in soups]
+        
+        decided: Dict[int, Tuple[bool, Dict[str, Any]]] = {}  # page -> cascade decision
+        cascade_v3: Dict[int, Tuple[bool, Dict[str, Any]]] = {}  # page -> v3 detection the cascade already ran
+        if version == "4.0":
+            if self.config.cascade:
+                previous_memo = self._detection_memo
+                try:
+                    for i, soup in enumerate(soups):
+                        self._detection_memo = {}
+                        evidence = self._new_v4_evidence()
+                        early_decision = self._cascade_early_decision(soup, evidence)
+                        if early_decision is not None:
+                            decided[i] = (early_decision, evidence)
+                        elif "3.0" in self._detection_memo:
+                            cascade_v3[i] = self._detection_memo["3.0"]
+                finally:
+                    self._detection_memo = previous_memo
+            undecided = [i for i in range(len(soups)) if i not in decided]
+            self._ensure_nltk_data()
+            detections = [cascade_v3.get(i) or self._detect_esg_content(soups[i], "3.0") for i in undecided]
+            self._add_batch_nlp_analysis([soups[i] for i in undecided], detections)
+            if self.config.cascade:
+                for _, evidence in detections:
+                    evidence["cascade"] = {"tier": "nlp", "decision": "nlp_analysis"}
+        else:
+            undecided = list(range(len(soups)))
+            detections = [self._detect_esg_content(soup, version) for soup in soups]
+        
+        results: List[Optional[Tuple[bool, Dict[str, Any]]]] = [decided.get(i) for i in range(len(soups))]
+        if detections:
+            feature_matrix = np.array([scoring_feature_vector(evidence) for _, evidence in detections])
+            scores, confidences, has_esg = score_feature_matrix(feature_matrix, version)
+            for row, (i, (_, evidence)) in enumerate(zip(undecided, detections)):
+                evidence["sustainability_score"] = float(scores[row])
+                evidence["confidence_level"] = float(confidences[row])
+                results[i] = (bool(has_esg[row]), evidence)
+        return results
+    
+    def _add_batch_nlp_analysis(self, soups: List[BeautifulSoup], detections: List[Tuple[bool, Dict[str, Any]]]):
+        """Run the v4 NLP stage for a batch of pages on top of their v3 detections"""
+        sia = self._get_nlp_tools()["sia"]
+        prepared = [self._prepare_nlp_text(soup) for soup in soups]
+        page_sentences = [sent_tokenize(page["text"]) for page in prepared]
+        
+        # Score every distinct ESG sentence of the batch once
+        sentence_ids: Dict[str, int] = {}
+        page_index = []
+        sentence_index = []
+        for page, sentences in enumerate(page_sentences):
+            for sentence in sentences:
+                if self._contains_esg_keywords(sentence):
+                    page_index.append(page)
+                    sentence_index.append(sentence_ids.setdefault(sentence, len(sentence_ids)))
+        
+        compounds = np.array([sia.polarity_scores(sentence)['compound'] for sentence in sentence_ids], dtype=float)
+        page_index = np.array(page_index, dtype=int)
+        counts = np.bincount(page_index, minlength=len(soups)).astype(float)
+        totals = np.bincount(page_index, weights=compounds[np.array(sentence_index, dtype=int)], minlength=len(soups))
+        esg_sentiments = np.divide(totals, counts, out=np.zeros(len(soups)), where=counts > 0)
+        
+        for i, (has_esg_v3, evidence_v3) in enumerate(detections):
+            evidence = dict(evidence_v3, detection_method="advanced_nlp_processing")
+            nlp_results = self._perform_nlp_analysis(
+                prepared[i]["text"],
+                sentences=page_sentences[i],
+                esg_sentiment=float(esg_sentiments[i])
+            )
+            if nlp_results:
+                nlp_results["text_preparation"] = prepared[i]["stats"]
+            evidence["nlp_analysis"] = nlp_results
+            evidence["scoring_features"] = dict(evidence["scoring_features"], **self._nlp_scoring_features(nlp_results))
+            detections[i] = (has_esg_v3, evidence)
+    
     def _contains_esg_keywords(self, text: str) -> bool:
         """Check if text contains ESG-related keywords"""
         esg_keywords = [
@@ -1369,14 +4505,64 @@ class ESGReportCrawler:
     
     def _detect_navigation(self, soup: BeautifulSoup) -> bool:
         """Detect if page has navigation structure"""
-        nav_indicators = [
-            soup.find('nav'),
-            soup.find(class_=re.compile(r'nav', re.I)),
-            soup.find(id=re.compile(r'nav', re.I)),
-            soup.find('ul', class_=re.compile(r'menu', re.I))
-        ]
+        return self._extract_navigation_features(soup)["has_navigation"]
+    
+    def _extract_navigation_features(self, soup: BeautifulSoup) -> Dict[str, Any]:
+        """
+        Walk the DOM once and collect navigation features for every consumer
+        
+        Nav/menu containers are usually nested (a menu div holding ul's holding more
+        div's), so text is extracted once per outermost container only. The result is
+        cached for the most recently analyzed page.
+        """
+        if self._navigation_cache is not None and self._navigation_cache[0] is soup:
+            return self._navigation_cache[1]
+        
+        containers = []
+        has_navigation = False
+        
+        # Iterative depth-first walk; the flag marks elements inside an outer container
+        stack = [(child, False) for child in reversed(soup.contents) if isinstance(child, Tag)]
+        while stack:
+            element, inside_container = stack.pop()
+            classes = element.get('class') or []
+            if isinstance(classes, str):
+                classes = classes.split()
+            
+            if not has_navigation:
+                has_navigation = (
+                    element.name == 'nav'
+                    or any(NAV_PATTERN.search(css_class) for css_class in classes)
+                    or bool(NAV_PATTERN.search(element.get('id') or ''))
+                    or (element.name == 'ul' and any(MENU_PATTERN.search(css_class) for css_class in classes))
+                )
+            
+            is_container = (
+                element.name in NAV_CONTAINER_TAGS
+                and any(NAV_CONTAINER_CLASS_PATTERN.search(css_class) for css_class in classes)
+            )
+            
+            if is_container and not inside_container:
+                containers.append({
+                    "text": element.get_text().lower(),
+                    "element_type": element.name,
+                    "element_class": classes
+                })
+            
+            # Nothing left to learn below an outer container once navigation is known
+            if inside_container or is_container:
+                if has_navigation:
+                    continue
+                inside_container = True
+            
+            stack.extend((child, inside_container) for child in reversed(element.contents) if isinstance(child, Tag))
         
-        return any(indicator is not None for indicator in nav_indicators)
+        features = {
+            "containers": containers,
+            "has_navigation": has_navigation
+        }
+        self._navigation_cache = (soup, features)
+        return features
     
     def _detect_language(self, soup: BeautifulSoup) -> str:
         """Detect page language"""
@@ -1405,238 +4591,1098 @@ class ESGReportCrawler:
         if not website_analysis.is_accessible:
             return False
         
-        # Check if sustainability section was found on homepage
-        if website_analysis.sustainability_section_found:
-            return True
+        # Check if sustainability section was found on homepage
+        if website_analysis.sustainability_section_found:
+            return True
+        
+        # Check if ESG-specific links were found
+        if website_analysis.sustainability_links_found > 0:
+            return True
+        
+        return False
+    
+    def _detect_esg_url_patterns(self, base_url: str, site_urls: Optional[List[str]] = None) -> List[str]:
+        """Detect ESG-related URL patterns from the base website and URLs discovered on the site"""
+        esg_patterns = [
+            '/sustainability', '/esg', '/csr', '/corporate-responsibility',
+            '/environmental', '/social-responsibility', '/governance',
+            '/annual-report', '/impact-report', '/climate', '/carbon'
+        ]
+        
+        urls = [url.lower() for url in [base_url, *(site_urls or [])]]
+        found_patterns = []
+        for pattern in esg_patterns:
+            if any(pattern in url for url in urls):
+                found_patterns.append(pattern)
+        
+        return found_patterns
+    
+    def _get_crawler_config_dict(self) -> Dict[str, Any]:
+        """Get crawler configuration as dictionary for storage"""
+        return {
+            "max_depth": self.config.max_depth,
+            "cascade": self.config.cascade,
+            "sitemap_discovery": self.config.sitemap_discovery,
+            "analyze_documents": self.config.analyze_documents,
+            "config_timestamp": datetime.now().isoformat()
+        }
+    
+    def _ensure_nltk_data(self):
+        """Download required NLTK data if not available (checked once per process)"""
+        global _nltk_data_checked
+        if _nltk_data_checked:
+            return
+        
+        try:
+            required_data = ['vader_lexicon', 'punkt', 'stopwords', 'wordnet']
+            
+            for data_name in required_data:
+                try:
+                    nltk.data.find(f'tokenizers/{data_name}' if data_name == 'punkt' else 
+                                 f'corpora/{data_name}' if data_name in ['stopwords', 'wordnet'] else 
+                                 f'sentiment/{data_name}')
+                except LookupError:
+                    logger.info(f"Downloading NLTK data: {data_name}")
+                    nltk.download(data_name, quiet=True)
+            
+            _nltk_data_checked = True
+                    
+        except Exception as e:
+            logger.warning(f"Failed to download NLTK data: {e}. NLP features may not work properly.")
+    
+    def _get_nlp_tools(self) -> Dict[str, Any]:
+        """Get the sentiment analyzer, lemmatizer and stopwords, building them once per process"""
+        global _nlp_tools
+        if _nlp_tools is None:
+            self._ensure_nltk_data()
+            _nlp_tools = {
+                "sia": SentimentIntensityAnalyzer(),
+                "lemmatizer": WordNetLemmatizer(),
+                "stop_words": set(stopwords.words('english'))
+            }
+        return _nlp_tools
+    
+    async def process_companies_batch(self, batch_size: int = 10, offset: int = 0, 
+                                    force_reanalysis: bool = False, replace_existing: bool = False):
+        """Process companies in batches with pagination and version awareness"""
+        try:
+            await self.init_database(open_sink=True)
+            
+            # Get total count for progress tracking
+            total_companies = await self.get_total_companies_count(force_reanalysis)
+            logger.info(f"Total companies needing analysis for version {self.version_key}{self._shard_label()}: {total_companies}")
+            
+            companies = await self.get_companies_to_process(
+                limit=batch_size, 
+                offset=offset, 
+                force_reanalysis=force_reanalysis
+            )
+            
+            if not companies:
+                logger.info(f"No companies need ESG analysis for version {self.version_key} at offset {offset}")
+                return
+            
+            logger.info(f"Processing batch: {len(companies)} companies (offset: {offset}, total: {total_companies})")
+            
+            # Create progress bar for this batch
+            progress_bar = tqdm(
+                total=len(companies),
+                desc=f"ESG v{self.version_key} Analysis",
+                unit="companies",
+                position=0,
+                leave=True,
+                bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]"
+            )
+            
+            async def process_company(i: int, company: Dict[str, Any], url_results: URLResults):
+                try:
+                    current_position = offset + i + 1
+                    
+                    # Update progress bar description with current company
+                    progress_bar.set_description(f"ESG v{self.version_key} [{current_position}/{total_companies}] {company['name'][:30]}")
+                    
+                    logger.info(f"[{current_position}/{total_companies}] Processing company {company['smm_company_id']}: {company['name']} - {company['website']}")
+                    
+                    results = await self._analyze_and_store_company(company, force_reanalysis, replace_existing, url_results)
+                    
+                    # Update progress bar postfix with result
+                    esg_status = "✅ ESG Found" if any(r.has_esg_reports for r in results.values()) else "❌ No ESG"
+                    progress_bar.set_postfix_str(esg_status)
+                    
+                    # Add delay between companies
+                    await asyncio.sleep(self.config.request_delay)
+                    
+                except Exception as e:
+                    progress_bar.set_postfix_str("❌ Error")
+                    logger.error(f"Failed to process company {company['smm_company_id']}: {e}")
+                finally:
+                    progress_bar.update(1)
+            
+            await self._run_company_tasks(companies, process_company)
+            
+            # Close progress bar
+            progress_bar.close()
+            
+            # Log batch completion
+            processed_so_far = min(offset + batch_size, total_companies)
+            logger.info(f"Batch completed. Processed {processed_so_far}/{total_companies} companies for version {self.version_key}")
+            
+        finally:
+            await self.close_database()
+    
+    async def process_all_companies(self, batch_size: int = 10, 
+                                  force_reanalysis: bool = False, replace_existing: bool = False):
+        """Process ALL companies continuously until complete"""
+        try:
+            await self.init_database(open_sink=True)
+            
+            # Get initial total count
+            total_companies = await self.get_total_companies_count(force_reanalysis)
+            logger.info(f"Starting continuous processing of {total_companies} companies for version {self.version_key}{self._shard_label()}")
+            
+            if total_companies == 0:
+                logger.info(f"No companies need analysis for version {self.version_key}")
+                return
+            
+            # Create overall progress bar
+            overall_progress = tqdm(
+                total=total_companies,
+                desc=f"ESG v{self.version_key} Complete Analysis",
+                unit="companies",
+                position=1,
+                leave=True,
+                bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
+            )
+            
+            processed_count = 0
+            batch_number = 0
+            # Keyset paging: analyzed companies leave the selection, which would shift OFFSET pages
+            after_id = None
+            
+            while processed_count < total_companies:
+                # Get companies for this batch
+                companies = await self.get_companies_to_process(
+                    limit=batch_size, 
+                    after_id=after_id, 
+                    force_reanalysis=force_reanalysis
+                )
+                
+                if not companies:
+                    logger.info(f"No more companies to process after company {after_id}")
+                    break
+                
+                batch_number += 1
+                logger.info(f"Processing batch: {len(companies)} companies (after company: {after_id}, remaining: {total_companies - processed_count})")
+                
+                # Process this batch
+                batch_progress = tqdm(
+                    total=len(companies),
+                    desc=f"Batch {batch_number}",
+                    unit="companies",
+                    position=0,
+                    leave=False,
+                    bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
+                )
+                
+                async def process_company(i: int, company: Dict[str, Any], url_results: URLResults):
+                    try:
+                        current_position = processed_count + i + 1
+                        
+                        # Update progress bars
+                        batch_progress.set_description(f"Batch {batch_number} - {company['name'][:25]}")
+                        overall_progress.set_description(f"ESG v{self.version_key} [{current_position}/{total_companies}] {company['name'][:30]}")
+                        
+                        logger.info(f"[{current_position}/{total_companies}] Processing company {company['smm_company_id']}: {company['name']} - {company['website']}")
+                        
+                        results = await self._analyze_and_store_company(company, force_reanalysis, replace_existing, url_results)
+                        
+                        # Update progress bars with result
+                        esg_status = "✅ ESG Found" if any(r.has_esg_reports for r in results.values()) else "❌ No ESG"
+                        batch_progress.set_postfix_str(esg_status)
+                        overall_progress.set_postfix_str(esg_status)
+                        overall_progress.update(1)
+                        
+                        # Add delay between companies
+                        await asyncio.sleep(self.config.request_delay)
+                        
+                    except Exception as e:
+                        batch_progress.set_postfix_str("❌ Error")
+                        overall_progress.set_postfix_str("❌ Error")
+                        overall_progress.update(1)
+                        logger.error(f"Failed to process company {company['smm_company_id']}: {e}")
+                    finally:
+                        batch_progress.update(1)
+                
+                await self._run_company_tasks(companies, process_company)
+                
+                # Close batch progress bar
+                batch_progress.close()
+                
+                # Update counters
+                processed_count += len(companies)
+                after_id = companies[-1]['smm_company_id']
+                
+                # Log batch completion
+                logger.info(f"Batch completed. Processed {processed_count}/{total_companies} companies for version {self.version_key}")
+                
+                # Check if we need to continue
+                remaining_companies = await self.get_total_companies_count(force_reanalysis)
+                if remaining_companies == 0:
+                    logger.info(f"All companies have been analyzed for version {self.version_key}")
+                    break
+            
+            # Close overall progress bar
+            overall_progress.close()
+            
+            logger.info(f"🎉 Complete! Processed {processed_count} companies for version {self.version_key}")
+            
+        finally:
+            await self.close_database()
+    
+    async def process_companies_pipeline(self, batch_size: int = 100, force_reanalysis: bool = False,
+                                         replace_existing: bool = False):
+        """
+        Process ALL companies as a staged pipeline
+        
+        A source pages through smm_companies by id into the prefilter stage (analysis
+        already stored, cached result for the same URL, DNS resolution), which feeds
+        fetch, analyze (parse and detection) and sink (database write). A URL already
+        being fetched or analyzed for another company is not fetched again: the fetch
+        stage waits for that analysis, which the analyze stage resolves. Each stage has
+        its own workers and a bounded inbox, so a slow stage blocks the stages feeding
+        it instead of piling up pages or results. Queue depths are shown on the progress
+        bar and logged periodically; per-stage totals are logged at the end.
+        """
+        try:
+            await self.init_database(open_sink=True)
+            
+            total_companies = await self.get_total_companies_count(force_reanalysis)
+            logger.info(f"Starting pipeline processing of {total_companies} companies for version {self.version_key}{self._shard_label()}")
+            
+            if total_companies == 0:
+                logger.info(f"No companies need analysis for version {self.version_key}")
+                return
+            
+            progress_bar = tqdm(
+                total=total_companies,
+                desc=f"ESG v{self.version_key} Pipeline",
+                unit="companies",
+                position=0,
+                leave=True,
+                bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}] {postfix}"
+            )
+            loop = asyncio.get_running_loop()
+            resolved_hosts: Dict[str, Optional[Exception]] = {}  # host -> lookup error, None when it resolved
+            url_results: URLResults = OrderedDict()
+            
+            async def prefilter(item: PipelineItem) -> Optional[PipelineItem]:
+                website = item.company['website']
+                item.versions = self._versions_to_run(item.company, force_reanalysis)
+                if not item.versions:
+                    progress_bar.update(1)
+                    return None
+                
+                normalized_url = self._normalize_url(website)
+                cached = None if force_reanalysis else url_results.get((normalized_url, tuple(item.versions)))
+                if cached is not None:
+                    logger.info(f"Reusing this run's analysis of {normalized_url} for {website}")
+                    item.results = self._results_for_website(cached, website)
+                    return item
+                
+                host = urlparse(normalized_url).hostname or ""
+                if host not in resolved_hosts:
+                    try:
+                        await asyncio.wait_for(loop.getaddrinfo(host, None), timeout=self.config.timeout)
+                        resolved_hosts[host] = None
+                    except asyncio.TimeoutError:
+                        resolved_hosts[host] = OSError(f"DNS lookup for {host} timed out")
+                    except (OSError, UnicodeError) as e:
+                        resolved_hosts[host] = OSError(f"DNS lookup for {host} failed: {e}")
+                
+                error = resolved_hosts[host]
+                if error is not None:
+                    logger.info(f"Skipping fetch of {website}: {error}")
+                    item.results = {version: self._error_result(website, item.collection_timestamp, error)
+                                    for version in item.versions}
+                return item
+            
+            async def fetch(item: PipelineItem) -> PipelineItem:
+                if item.results is not None:
+                    return item
+                website = item.company['website']
+                
+                # Same singleflight table as analyze_company_website_versions. Waiting happens here,
+                # never downstream: the analysis waited for only needs the analyze and sink stages
+                # to make progress, so it cannot deadlock behind a full inbox.
+                flight_key = (self._normalize_url(website), tuple(item.versions), not force_reanalysis)
+                flight = self._url_flights.get(flight_key)
+                if flight is None and not force_reanalysis:
+                    # Finished after this item passed the prefilter
+                    cached = url_results.get(flight_key[:2])
+                    if cached is not None:
+                        item.results = self._results_for_website(cached, website)
+                        return item
+                if flight is not None:
+                    logger.info(f"Waiting for in-flight analysis of {flight_key[0]} for {website}")
+                    try:
+                        item.results = self._results_for_website(await asyncio.shield(flight), website)
+                    except Exception as e:
+                        item.results = {version: self._error_result(website, item.collection_timestamp, e)
+                                        for version in item.versions}
+                    return item
+                
+                item.flight = loop.create_future()
+                self._url_flights[flight_key] = item.flight
+                item.flight.add_done_callback(lambda done: self._finish_url_flight(flight_key, done, url_results))
+                try:
+                    item.fetched = await self._fetch_website(website)
+                except Exception as e:
+                    logger.error(f"ESG analysis failed for {website}: {e}")
+                    item.results = {version: self._error_result(website, item.collection_timestamp, e)
+                                    for version in item.versions}
+                    item.flight.set_result(item.results)
+                return item
+            
+            async def analyze(item: PipelineItem) -> PipelineItem:
+                if item.results is not None:
+                    return item
+                website = item.company['website']
+                try:
+                    results = await self._analyze_fetched_website(
+                        website, item.versions, item.company['smm_company_id'], not force_reanalysis,
+                        item.collection_timestamp, *item.fetched
+                    )
+                except Exception as e:
+                    item.flight.set_exception(e)
+                    raise
+                item.fetched = None  # Release the page before the item waits for the sink
+                item.flight.set_result(results)
+                item.results = self._results_for_website(results, website)
+                return item
+            
+            async def sink(item: PipelineItem) -> None:
+                company_id = item.company['smm_company_id']
+                try:
+                    await self.sink.write(self, item.company, item.results, replace_existing=replace_existing)
+                    for version, result in item.results.items():
+                        logger.info(f"Company {company_id} - ESG v{version} reports found: {result.has_esg_reports}")
+                finally:
+                    progress_bar.update(1)
+            
+            queue_size = self.config.pipeline_queue_size
+            stages = [
+                PipelineStage("prefilter", self.config.pipeline_prefilter_workers, queue_size, prefilter),
+                PipelineStage("fetch", self.config.pipeline_fetch_workers, queue_size, fetch),
+                PipelineStage("analyze", self.config.pipeline_analyze_workers, queue_size, analyze),
+                PipelineStage("sink", self.config.pipeline_sink_workers, queue_size, sink),
+            ]
+            
+            async def source():
+                # Keyset paging: rows analyzed meanwhile drop out of the selection without shifting pages
+                after_id = None
+                try:
+                    while True:
+                        companies = await self.get_companies_to_process(
+                            limit=batch_size, force_reanalysis=force_reanalysis, after_id=after_id
+                        )
+                        if not companies:
+                            break
+                        for company in companies:
+                            await stages[0].put(PipelineItem(company, list(self.versions), datetime.now().isoformat()))
+                        after_id = companies[-1]['smm_company_id']
+                finally:
+                    await stages[0].close()
+            
+            reporter = asyncio.create_task(self._report_pipeline_depths(stages, progress_bar))
+            try:
+                await asyncio.gather(
+                    source(),
+                    *(stage.run(downstream) for stage, downstream in zip(stages, stages[1:] + [None]))
+                )
+            finally:
+                reporter.cancel()
+                progress_bar.close()
+            
+            for stage in stages:
+                logger.info(f"Pipeline stage {stage.summary()}")
+            logger.info(f"🎉 Complete! Pipeline stored {stages[-1].processed - stages[-1].failed} analyses for version {self.version_key}")
+            
+        finally:
+            await self.close_database()
+    
+    async def _report_pipeline_depths(self, stages: List[PipelineStage], progress_bar: tqdm):
+        """Show stage queue depths on the progress bar every second and log them periodically"""
+        last_logged = time.monotonic()
+        while True:
+            await asyncio.sleep(1)
+            depths = ", ".join(stage.depth() for stage in stages)
+            progress_bar.set_postfix_str(depths)
+            if time.monotonic() - last_logged >= self.config.pipeline_report_interval:
+                logger.info(f"Pipeline queues: {depths}")
+                last_logged = time.monotonic()
+    
+    async def process_source(self, batch_size: int = 10, force_reanalysis: bool = False,
+                             replace_existing: bool = False):
+        """
+        Process every company of self.source that needs analysis and write the results to self.sink
+        
+        The database pool is only opened when the source or the sink is the database, so
+        runs from a file source into a file sink need no Postgres at all.
+        """
+        try:
+            await self._open_source_and_sink()
+            
+            total_companies = await self.source.count(self, force_reanalysis)
+            logger.info(f"Processing companies from {type(self.source).__name__} into {type(self.sink).__name__} "
+                        f"for version {self.version_key}{self._shard_label()}")
+            
+            progress_bar = tqdm(
+                total=total_companies,
+                desc=f"ESG v{self.version_key} Analysis",
+                unit="companies",
+                position=0,
+                leave=True
+            )
+            processed_count = 0
+            failed_count = 0
+            
+            async def process_company(i: int, company: Dict[str, Any], url_results: URLResults):
+                nonlocal failed_count
+                try:
+                    progress_bar.set_description(f"ESG v{self.version_key} {company['name'][:30]}")
+                    results = await self._analyze_and_store_company(company, force_reanalysis, replace_existing, url_results)
+                    
+                    esg_status = "✅ ESG Found" if any(r.has_esg_reports for r in results.values()) else "❌ No ESG"
+                    progress_bar.set_postfix_str(esg_status)
+                    
+                    if self.config.request_delay:
+                        await asyncio.sleep(self.config.request_delay)
+                    
+                except Exception as e:
+                    failed_count += 1
+                    progress_bar.set_postfix_str("❌ Error")
+                    logger.error(f"Failed to process company {company['smm_company_id']}: {e}")
+                finally:
+                    progress_bar.update(1)
+            
+            async for companies in self.source.batches(self, batch_size, force_reanalysis):
+                await self._run_company_tasks(companies, process_company)
+                processed_count += len(companies)
+            
+            progress_bar.close()
+            logger.info(f"Processed {processed_count} companies ({failed_count} failed) for version {self.version_key}")
+            
+        finally:
+            await self.source.close()
+            await self.close_database()
+    
+    async def _open_source_and_sink(self):
+        """Open self.source and self.sink, and the database pool only when one of them is the database"""
+        if self.source.uses_database or self.sink.uses_database:
+            await self.init_database(open_sink=True)
+        else:
+            if self._loop_monitor:
+                self._loop_monitor.start()
+            await self.sink.open()
+        await self.source.open()
+    
+    async def export_analyses(self, output_dir: str, export_format: str = "parquet", chunk_rows: int = 50000,
+                              latest_only: bool = False) -> int:
+        """
+        Export every stored analysis as typed rows (EXPORT_COLUMNS) partitioned by crawler version
+        
+        Companies are streamed through a server-side cursor in one read-only snapshot and
+        rows are buffered per version up to chunk_rows before being written, so memory
+        stays bounded. Parquet goes to <output_dir>/crawler_version=<v>/analyses.parquet
+        (one row group per chunk); JSONL to .../analyses.jsonl.gz. Returns the row count.
+        """
+        if export_format == "parquet":
+            pa, pq, schema = _arrow_export_schema()
+        elif export_format != "jsonl":
+            raise ValueError(f"Unknown export format '{export_format}', use parquet or jsonl")
+        
+        buffers: Dict[str, List[Dict[str, Any]]] = {}
+        writers: Dict[str, Any] = {}
+        exported = 0
+        
+        def flush(version: str):
+            rows = buffers.pop(version, [])
+            if not rows:
+                return
+            writer = writers.get(version)
+            if writer is None:
+                partition = os.path.join(output_dir, f"crawler_version={version}")
+                os.makedirs(partition, exist_ok=True)
+                if export_format == "parquet":
+                    writer = pq.ParquetWriter(os.path.join(partition, "analyses.parquet"), schema, compression="zstd")
+                else:
+                    writer = gzip.open(os.path.join(partition, "analyses.jsonl.gz"), "wt", encoding="utf-8")
+                writers[version] = writer
+            if export_format == "parquet":
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            else:
+                for row in rows:
+                    writer.write(json.dumps(row, default=str) + "\n")
+        
+        try:
+            async with self.db_pool.acquire() as conn:
+                async with conn.transaction(isolation='repeatable_read', readonly=True):
+                    async for company in self.queries.cursor(conn, "select_export_companies", *self._shard_args(),
+                                                             prefetch=500):
+                        esg_info = company['esg_info']
+                        if isinstance(esg_info, str):
+                            try:
+                                esg_info = json.loads(esg_info)
+                            except json.JSONDecodeError:
+                                continue
+                        analyses = [analysis for analysis in (esg_info if isinstance(esg_info, list) else [esg_info])
+                                    if isinstance(analysis, dict)]
+                        
+                        # Entries are appended in time order, so the last one per version is the latest
+                        latest_index = {analysis.get('crawler_version', '1.0'): i for i, analysis in enumerate(analyses)}
+                        for i, analysis in enumerate(analyses):
+                            version = analysis.get('crawler_version', '1.0')
+                            is_latest = latest_index[version] == i
+                            if latest_only and not is_latest:
+                                continue
+                            buffer = buffers.setdefault(version, [])
+                            buffer.append(flatten_analysis(company, analysis, is_latest))
+                            exported += 1
+                            if len(buffer) >= chunk_rows:
+                                flush(version)
+            
+            for version in list(buffers):
+                flush(version)
+        finally:
+            for writer in writers.values():
+                writer.close()
+        
+        logger.info(f"Exported {exported} analyses ({', '.join(sorted(writers)) or 'no versions'}) "
+                    f"as {export_format} to {output_dir}")
+        return exported
+    
+    async def export_company_analyses(self, output_dir: str, export_format: str = "parquet",
+                                      chunk_rows: int = 50000, latest_only: bool = False):
+        """Export stored analyses to files and exit"""
+        try:
+            await self.init_database()
+            await self.export_analyses(output_dir, export_format, chunk_rows, latest_only)
+        finally:
+            await self.close_database()
+    
+    async def ensure_company_notify_trigger(self):
+        """Create the smm_companies triggers that NOTIFY on inserts and primary_domain changes"""
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(f"""
+                CREATE OR REPLACE FUNCTION esg_notify_company_changed() RETURNS trigger AS $$
+                BEGIN
+                    PERFORM pg_notify('{COMPANY_NOTIFY_CHANNEL}', NEW.smm_company_id::text);
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql;
+                
+                DROP TRIGGER IF EXISTS esg_company_inserted ON smm_companies;
+                CREATE TRIGGER esg_company_inserted
+                    AFTER INSERT ON smm_companies
+                    FOR EACH ROW
+                    WHEN (NEW.primary_domain IS NOT NULL AND NEW.primary_domain != '')
+                    EXECUTE FUNCTION esg_notify_company_changed();
+                
+                DROP TRIGGER IF EXISTS esg_company_domain_changed ON smm_companies;
+                CREATE TRIGGER esg_company_domain_changed
+                    AFTER UPDATE OF primary_domain ON smm_companies
+                    FOR EACH ROW
+                    WHEN (NEW.primary_domain IS DISTINCT FROM OLD.primary_domain
+                          AND NEW.primary_domain IS NOT NULL AND NEW.primary_domain != '')
+                    EXECUTE FUNCTION esg_notify_company_changed();
+                """)
+    
+    async def watch_companies(self, batch_size: int = 50, batch_window: float = 2.0, catch_up: bool = False,
+                              replace_existing: bool = False):
+        """
+        Watch mode: analyze companies as soon as they are inserted or their primary_domain changes
+        
+        A trigger on smm_companies NOTIFYs COMPANY_NOTIFY_CHANNEL and the crawler LISTENs on
+        a connection held from the pool. Notified ids are collected for up to batch_window
+        seconds (or batch_size ids) and analyzed as one micro-batch; a changed domain makes
+        earlier analyses stale, so notified companies are always re-analyzed from a fresh
+        fetch, and no per-URL result or near-duplicate page outlives its micro-batch.
+        Notifications sent while no watcher is listening are lost; catch_up processes the
+        companies still needing analysis each time listening starts.
+        """
+        loop = asyncio.get_running_loop()
+        notified: asyncio.Queue = asyncio.Queue()
+        stop_requested = asyncio.Event()
+        connection_lost = asyncio.Event()
+        listener = None
+        processed_count = 0
+        
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, stop_requested.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        
+        def on_notification(connection, pid, channel, payload):
+            try:
+                notified.put_nowait(int(payload))
+            except ValueError:
+                logger.warning(f"Ignoring {channel} notification with payload {payload!r}")
+        
+        async def process_company(i: int, company: Dict[str, Any], url_results: URLResults):
+            nonlocal processed_count
+            try:
+                logger.info(f"[watch] Processing company {company['smm_company_id']}: {company['name']} - {company['website']}")
+                await self._analyze_and_store_company(company, force_reanalysis=True, replace_existing=replace_existing,
+                                                      url_results=url_results)
+                processed_count += 1
+            except Exception as e:
+                logger.error(f"Failed to process company {company['smm_company_id']}: {e}")
+        
+        try:
+            await self.init_database(open_sink=True)
+            await self.ensure_company_notify_trigger()
+            
+            while not stop_requested.is_set():
+                if listener is None:
+                    listener = await self.db_pool.acquire()
+                    connection_lost.clear()
+                    listener.add_termination_listener(lambda connection: connection_lost.set())
+                    await listener.add_listener(COMPANY_NOTIFY_CHANNEL, on_notification)
+                    logger.info(f"Watching {COMPANY_NOTIFY_CHANNEL} for version {self.version_key}{self._shard_label()} "
+                                f"(micro-batches of up to {batch_size} over {batch_window}s)")
+                    if catch_up:
+                        # Already listening, so companies added during the catch-up are notified too
+                        processed_count += await self._catch_up_companies(batch_size, replace_existing)
+                        self._page_index.clear()
+                
+                # Wake up once a second to notice shutdown or a lost listener connection
+                try:
+                    first_id = await asyncio.wait_for(notified.get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    if connection_lost.is_set():
+                        logger.warning("Lost the LISTEN connection; reconnecting (notifications in between are missed)")
+                        try:
+                            await self.db_pool.release(listener)
+                        except Exception:
+                            pass
+                        listener = None
+                    continue
+                
+                company_ids = {first_id}
+                deadline = loop.time() + batch_window
+                while len(company_ids) < batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        company_ids.add(await asyncio.wait_for(notified.get(), timeout=remaining))
+                    except asyncio.TimeoutError:
+                        break
+                
+                companies = await self.get_companies_by_ids(sorted(company_ids))
+                logger.info(f"[watch] {len(company_ids)} notified, {len(companies)} to analyze")
+                try:
+                    await self._run_company_tasks(companies, process_company)
+                finally:
+                    # A notified company's page has changed; nothing from this batch may answer a later one
+                    self._page_index.clear()
+            
+            logger.info(f"Watch stopped. Processed {processed_count} companies for version {self.version_key}")
+            
+        finally:
+            try:
+                if listener is not None and not listener.is_closed():
+                    await listener.remove_listener(COMPANY_NOTIFY_CHANNEL, on_notification)
+                    await self.db_pool.release(listener)
+            finally:
+                await self.close_database()
+    
+    async def _catch_up_companies(self, batch_size: int, replace_existing: bool) -> int:
+        """Analyze every company that still needs analysis (keyset-paged); returns the number processed"""
+        processed_count = 0
+        after_id = None
+        
+        async def process_company(i: int, company: Dict[str, Any], url_results: URLResults):
+            nonlocal processed_count
+            try:
+                await self._analyze_and_store_company(company, replace_existing=replace_existing, url_results=url_results)
+                processed_count += 1
+            except Exception as e:
+                logger.error(f"Failed to process company {company['smm_company_id']}: {e}")
+        
+        while True:
+            companies = await self.get_companies_to_process(limit=batch_size, after_id=after_id)
+            if not companies:
+                break
+            await self._run_company_tasks(companies, process_company)
+            after_id = companies[-1]['smm_company_id']
+        
+        logger.info(f"[watch] Catch-up processed {processed_count} companies")
+        return processed_count
+    
+    def _recrawl_priority(self, esg_info: Any, now: datetime, min_age_days: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """
+        Re-crawl priority of a company from its analysis history, or None if analyzed too recently
+        
+        Companies missing one of the requested versions get priority 1 (the maximum).
+        Otherwise the priority is the probability that the site changed since its last
+        analysis, estimated from how often consecutive analyses differed in answer,
+        content fingerprint or ETag, times the weight of the last answer.
+        """
+        if isinstance(esg_info, str):
+            try:
+                esg_info = json.loads(esg_info)
+            except json.JSONDecodeError:
+                esg_info = None
+        analyses = esg_info if isinstance(esg_info, list) else [esg_info] if isinstance(esg_info, dict) else []
+        
+        history = []
+        for analysis in analyses:
+            if not isinstance(analysis, dict) or analysis.get('crawler_version', '1.0') not in self.versions:
+                continue
+            try:
+                timestamp = datetime.fromisoformat(analysis['analysis_timestamp'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone().replace(tzinfo=None)
+            history.append((timestamp, analysis))
         
-        # Check if ESG-specific links were found
-        if website_analysis.sustainability_links_found > 0:
-            return True
+        analyzed_versions = {analysis.get('crawler_version', '1.0') for _, analysis in history}
+        if any(version not in analyzed_versions for version in self.versions):
+            return 1.0, {"reason": "missing version", "age_days": None}
         
-        return False
-    
-    def _detect_esg_url_patterns(self, base_url: str) -> List[str]:
-        """Detect ESG-related URL patterns from the base website"""
-        esg_patterns = [
-            '/sustainability', '/esg', '/csr', '/corporate-responsibility',
-            '/environmental', '/social-responsibility', '/governance',
-            '/annual-report', '/impact-report', '/climate', '/carbon'
-        ]
+        history.sort(key=lambda entry: entry[0])
+        age_days = (now - history[-1][0]).total_seconds() / 86400
+        if age_days < min_age_days:
+            return None
         
-        found_patterns = []
-        for pattern in esg_patterns:
-            if pattern in base_url.lower():
-                found_patterns.append(pattern)
+        # Count changes between consecutive analyses of the same version
+        changes = 0
+        previous_by_version: Dict[str, Dict[str, Any]] = {}
+        for _, analysis in history:
+            version = analysis.get('crawler_version', '1.0')
+            previous = previous_by_version.get(version)
+            if previous is not None:
+                page, previous_page = analysis.get('website_analysis') or {}, previous.get('website_analysis') or {}
+                if (analysis.get('has_esg_reports') != previous.get('has_esg_reports')
+                        or any(page.get(key) and previous_page.get(key) and page.get(key) != previous_page.get(key)
+                               for key in ('content_fingerprint', 'etag'))):
+                    changes += 1
+            previous_by_version[version] = analysis
         
-        return found_patterns
-    
-    def _get_crawler_config_dict(self) -> Dict[str, Any]:
-        """Get crawler configuration as dictionary for storage"""
-        return {
-            "max_depth": self.config.max_depth,
-            "config_timestamp": datetime.now().isoformat()
+        observed_days = (history[-1][0] - history[0][0]).total_seconds() / 86400
+        change_rate = (changes + RECRAWL_PRIOR_CHANGES) / (observed_days + RECRAWL_PRIOR_DAYS)
+        change_probability = 1 - math.exp(-change_rate * age_days)
+        
+        last = history[-1][1]
+        if not (last.get('website_analysis') or {}).get('is_accessible', True):
+            status = "error"
+        else:
+            status = "positive" if last.get('has_esg_reports') else "negative"
+        
+        return change_probability * RECRAWL_STATUS_WEIGHTS[status], {
+            "reason": status,
+            "age_days": round(age_days, 1),
+            "changes": changes,
+            "change_probability": round(change_probability, 3)
         }
     
-    def _ensure_nltk_data(self):
-        """Download required NLTK data if not available"""
-        try:
-            import nltk
-            required_data = ['vader_lexicon', 'punkt', 'stopwords', 'wordnet']
-            
-            for data_name in required_data:
-                try:
-                    nltk.data.find(f'tokenizers/{data_name}' if data_name == 'punkt' else 
-                                 f'corpora/{data_name}' if data_name in ['stopwords', 'wordnet'] else 
-                                 f'sentiment/{data_name}')
-                except LookupError:
-                    logger.info(f"Downloading NLTK data: {data_name}")
-                    nltk.download(data_name, quiet=True)
-                    
-        except Exception as e:
-            logger.warning(f"Failed to download NLTK data: {e}. NLP features may not work properly.")
+    async def plan_recrawl(self, budget: int, min_age_days: float = 7.0) -> List[Tuple[float, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Pick the `budget` companies whose re-analysis is most likely to change the answer
+        
+        Streams every company with a website through a server-side cursor and keeps the
+        top entries in a heap; returns (priority, company, details) by descending priority.
+        """
+        now = datetime.now()
+        heap: List[Tuple[float, int, Dict[str, Any], Dict[str, Any]]] = []
+        scanned = 0
+        
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                async for row in self.queries.cursor(conn, "select_recrawl_candidates", *self._shard_args(),
+                                                     prefetch=1000):
+                    scanned += 1
+                    ranked = self._recrawl_priority(row['esg_info'], now, min_age_days)
+                    if ranked is None:
+                        continue
+                    priority, details = ranked
+                    entry = (priority, -row['smm_company_id'], dict(row), details)
+                    if len(heap) < budget:
+                        heapq.heappush(heap, entry)
+                    elif entry[:2] > heap[0][:2]:
+                        heapq.heapreplace(heap, entry)
+        
+        plan = [(priority, company, details) for priority, _, company, details in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+        logger.info(f"Re-crawl plan for version {self.version_key}{self._shard_label()}: {len(plan)} of {scanned} companies "
+                    f"(budget {budget}, minimum age {min_age_days} days)")
+        return plan
     
-    async def process_companies_batch(self, batch_size: int = 10, offset: int = 0, 
-                                    force_reanalysis: bool = False, replace_existing: bool = False):
-        """Process companies in batches with pagination and version awareness"""
+    async def process_recrawl(self, budget: int, min_age_days: float = 7.0, plan_only: bool = False,
+                              replace_existing: bool = False):
+        """Re-analyze the companies chosen by plan_recrawl (or only print the plan)"""
         try:
-            await self.init_database()
-            
-            # Get total count for progress tracking
-            total_companies = await self.get_total_companies_count(force_reanalysis)
-            logger.info(f"Total companies needing analysis for version {self.version}: {total_companies}")
-            
-            companies = await self.get_companies_to_process(
-                limit=batch_size, 
-                offset=offset, 
-                force_reanalysis=force_reanalysis
-            )
+            await self.init_database(open_sink=not plan_only)
+            plan = await self.plan_recrawl(budget, min_age_days)
             
-            if not companies:
-                logger.info(f"No companies need ESG analysis for version {self.version} at offset {offset}")
+            print(f"\n=== Re-crawl plan (version {self.version_key}, budget {budget}) ===")
+            for priority, company, details in plan:
+                age = f"{details['age_days']}d" if details['age_days'] is not None else "-"
+                print(f"{priority:.3f}  {company['smm_company_id']:>10}  {details['reason']:<15} age {age:>7}  "
+                      f"changes {details.get('changes', '-')}  {company['website']}")
+            if plan_only or not plan:
                 return
             
-            logger.info(f"Processing batch: {len(companies)} companies (offset: {offset}, total: {total_companies})")
-            
-            # Create progress bar for this batch
-            progress_bar = tqdm(
-                companies, 
-                desc=f"ESG v{self.version} Analysis",
-                unit="companies",
-                position=0,
-                leave=True,
-                bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]"
-            )
+            progress_bar = tqdm(total=len(plan), desc=f"ESG v{self.version_key} Re-crawl", unit="companies")
             
-            for i, company in enumerate(progress_bar):
+            async def process_company(i: int, company: Dict[str, Any], url_results: URLResults):
                 try:
-                    current_position = offset + i + 1
-                    
-                    # Update progress bar description with current company
-                    progress_bar.set_description(f"ESG v{self.version} [{current_position}/{total_companies}] {company['name'][:30]}")
-                    
-                    logger.info(f"[{current_position}/{total_companies}] Processing company {company['smm_company_id']}: {company['name']} - {company['website']}")
-                    
-                    # Check if this version already exists (for force_reanalysis mode)
-                    if force_reanalysis and self._has_version_analysis(company.get('esg_info'), self.version):
-                        logger.info(f"Company {company['smm_company_id']} already has version {self.version} analysis, re-analyzing...")
-                    
-                    result = await self.analyze_company_website(company['website'])
-                    await self.update_company_esg_info(company['smm_company_id'], result, replace_existing=replace_existing)
-                    
-                    # Update progress bar postfix with result
-                    esg_status = "✅ ESG Found" if result.has_esg_reports else "❌ No ESG"
-                    progress_bar.set_postfix_str(esg_status)
-                    
-                    logger.info(f"Company {company['smm_company_id']} - ESG reports found: {result.has_esg_reports}")
-                    
-                    # Add delay between companies
-                    await asyncio.sleep(self.config.request_delay)
-                    
+                    logger.info(f"[recrawl {i + 1}/{len(plan)}] Processing company {company['smm_company_id']}: {company['name']} - {company['website']}")
+                    # Planned companies already have these versions, so they are re-analyzed
+                    await self._analyze_and_store_company(company, force_reanalysis=True, replace_existing=replace_existing,
+                                                          url_results=url_results)
                 except Exception as e:
-                    progress_bar.set_postfix_str("❌ Error")
                     logger.error(f"Failed to process company {company['smm_company_id']}: {e}")
-                    continue
+                finally:
+                    progress_bar.update(1)
             
-            # Close progress bar
+            await self._run_company_tasks([company for _, company, _ in plan], process_company)
             progress_bar.close()
-            
-            # Log batch completion
-            processed_so_far = min(offset + batch_size, total_companies)
-            logger.info(f"Batch completed. Processed {processed_so_far}/{total_companies} companies for version {self.version}")
+            logger.info(f"Re-crawl complete. Processed {len(plan)} companies for version {self.version_key}")
             
         finally:
             await self.close_database()
     
-    async def process_all_companies(self, batch_size: int = 10, 
-                                  force_reanalysis: bool = False, replace_existing: bool = False):
-        """Process ALL companies continuously until complete"""
+    async def ensure_job_queue(self):
+        """Create the esg_crawl_jobs lease table used by work-queue mode if it does not exist"""
+        async with self.db_pool.acquire() as conn:
+            await conn.execute("""
+            CREATE TABLE IF NOT EXISTS esg_crawl_jobs (
+                crawler_version TEXT NOT NULL,
+                smm_company_id BIGINT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                leased_by TEXT,
+                lease_expires_at TIMESTAMPTZ,
+                last_error TEXT,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (crawler_version, smm_company_id)
+            );
+            CREATE INDEX IF NOT EXISTS esg_crawl_jobs_claim_idx
+                ON esg_crawl_jobs (crawler_version, status, lease_expires_at);
+            """)
+    
+    async def enqueue_jobs(self, force_reanalysis: bool = False) -> int:
+        """Queue every company that needs analysis for this version; returns the number of jobs queued"""
+        async with self.db_pool.acquire() as conn:
+            status = await self.queries.execute(conn, "enqueue_jobs", *self._shard_args(), self.versions,
+                                                force_reanalysis, self.version_key)
+        
+        # asyncpg returns the command tag, e.g. "INSERT 0 42"
+        queued = int(status.split()[-1])
+        logger.info(f"Queued {queued} companies for version {self.version_key}{self._shard_label()}")
+        return queued
+    
+    async def claim_jobs(self, worker_id: str, limit: int, lease_seconds: int,
+                         max_attempts: int) -> List[Dict[str, Any]]:
+        """Lease up to `limit` pending or expired jobs with FOR UPDATE SKIP LOCKED"""
+        async with self.db_pool.acquire() as conn:
+            await self.queries.execute(conn, "reap_expired_jobs", self.version_key, max_attempts)
+            rows = await self.queries.fetch(conn, "claim_jobs", self.version_key, limit, worker_id, max_attempts,
+                                            float(lease_seconds))
+            return sorted((dict(row) for row in rows), key=lambda row: row['smm_company_id'])
+    
+    async def renew_leases(self, worker_id: str, company_ids: List[int], lease_seconds: int):
+        """Extend the leases this worker still holds"""
+        if not company_ids:
+            return
+        
+        async with self.db_pool.acquire() as conn:
+            await self.queries.execute(conn, "renew_leases", self.version_key, worker_id, company_ids,
+                                       float(lease_seconds))
+    
+    async def complete_job(self, worker_id: str, company_id: int):
+        """Mark a leased job as done"""
+        async with self.db_pool.acquire() as conn:
+            await self.queries.execute(conn, "complete_job", self.version_key, company_id, worker_id)
+    
+    async def release_jobs(self, worker_id: str, company_ids: List[int], max_attempts: int,
+                           error: Optional[str] = None):
+        """Give leased jobs back to the queue, or mark them failed once attempts are used up"""
+        if not company_ids:
+            return
+        
+        async with self.db_pool.acquire() as conn:
+            await self.queries.execute(conn, "release_jobs", self.version_key, worker_id, company_ids,
+                                       max_attempts, error)
+    
+    async def get_active_job_count(self) -> int:
+        """Count jobs that are still pending or held by a live lease"""
+        async with self.db_pool.acquire() as conn:
+            return await self.queries.fetchval(conn, "count_active_jobs", self.version_key) or 0
+    
+    async def _keep_leases_alive(self, worker_id: str, held_ids: set, lease_seconds: int):
+        """Background task renewing held leases every third of the lease duration"""
+        while True:
+            await asyncio.sleep(max(lease_seconds / 3, 1))
+            try:
+                await self.renew_leases(worker_id, sorted(held_ids), lease_seconds)
+            except Exception as e:
+                logger.warning(f"Failed to renew leases for {worker_id}: {e}")
+    
+    async def process_job_queue(self, batch_size: int = 10, lease_seconds: int = 300,
+                                max_attempts: int = 3, idle_poll_interval: float = 10.0,
+                                force_reanalysis: bool = False, replace_existing: bool = False):
+        """Work-queue mode: claim batches from esg_crawl_jobs until the queue is drained"""
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        stop_requested = asyncio.Event()
+        
+        # Finish the current company and hand back the rest of the batch on SIGTERM (container scale-in)
+        loop = asyncio.get_running_loop()
         try:
-            await self.init_database()
-            
-            # Get initial total count
-            total_companies = await self.get_total_companies_count(force_reanalysis)
-            logger.info(f"Starting continuous processing of {total_companies} companies for version {self.version}")
-            
-            if total_companies == 0:
-                logger.info(f"No companies need analysis for version {self.version}")
-                return
-            
-            # Create overall progress bar
-            overall_progress = tqdm(
-                total=total_companies,
-                desc=f"ESG v{self.version} Complete Analysis",
-                unit="companies",
-                position=1,
-                leave=True,
-                bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
-            )
+            loop.add_signal_handler(signal.SIGTERM, stop_requested.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+        
+        processed_count = 0
+        held_ids: set = set()
+        renewer = None
+        
+        try:
+            await self.init_database(open_sink=True)
+            await self.ensure_job_queue()
+            renewer = asyncio.create_task(self._keep_leases_alive(worker_id, held_ids, lease_seconds))
             
-            processed_count = 0
-            current_offset = 0
+            logger.info(f"Worker {worker_id} started for version {self.version_key} (lease {lease_seconds}s, max attempts {max_attempts})")
             
-            while processed_count < total_companies:
-                # Get companies for this batch
-                companies = await self.get_companies_to_process(
-                    limit=batch_size, 
-                    offset=current_offset, 
-                    force_reanalysis=force_reanalysis
-                )
+            while not stop_requested.is_set():
+                companies = await self.claim_jobs(worker_id, batch_size, lease_seconds, max_attempts)
                 
                 if not companies:
-                    logger.info(f"No more companies to process at offset {current_offset}")
-                    break
-                
-                logger.info(f"Processing batch: {len(companies)} companies (offset: {current_offset}, remaining: {total_companies - processed_count})")
+                    active_jobs = await self.get_active_job_count()
+                    if active_jobs == 0:
+                        logger.info(f"Job queue for version {self.version_key} is drained")
+                        break
+                    # Other workers still hold leases that may expire and come back to the queue
+                    logger.info(f"No claimable jobs, {active_jobs} still leased by other workers; waiting {idle_poll_interval}s")
+                    try:
+                        await asyncio.wait_for(stop_requested.wait(), timeout=idle_poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
                 
-                # Process this batch
-                batch_progress = tqdm(
-                    companies, 
-                    desc=f"Batch {current_offset//batch_size + 1}",
-                    unit="companies",
-                    position=0,
-                    leave=False,
-                    bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
-                )
+                held_ids.update(company['smm_company_id'] for company in companies)
+                logger.info(f"Worker {worker_id} leased {len(companies)} companies")
                 
-                for i, company in enumerate(batch_progress):
+                async def process_company(i: int, company: Dict[str, Any], url_results: URLResults):
+                    nonlocal processed_count
+                    if stop_requested.is_set():
+                        return
+                    
+                    company_id = company['smm_company_id']
                     try:
-                        current_position = processed_count + i + 1
-                        
-                        # Update progress bars
-                        batch_progress.set_description(f"Batch {current_offset//batch_size + 1} - {company['name'][:25]}")
-                        overall_progress.set_description(f"ESG v{self.version} [{current_position}/{total_companies}] {company['name'][:30]}")
+                        logger.info(f"[job] Processing company {company_id}: {company['name']} - {company['website']}")
                         
-                        logger.info(f"[{current_position}/{total_companies}] Processing company {company['smm_company_id']}: {company['name']} - {company['website']}")
-                        
-                        # Check if this version already exists (for force_reanalysis mode)
-                        if force_reanalysis and self._has_version_analysis(company.get('esg_info'), self.version):
-                            logger.info(f"Company {company['smm_company_id']} already has version {self.version} analysis, re-analyzing...")
-                        
-                        result = await self.analyze_company_website(company['website'])
-                        await self.update_company_esg_info(company['smm_company_id'], result, replace_existing=replace_existing)
-                        
-                        # Update progress bars with result
-                        esg_status = "✅ ESG Found" if result.has_esg_reports else "❌ No ESG"
-                        batch_progress.set_postfix_str(esg_status)
-                        overall_progress.set_postfix_str(esg_status)
-                        overall_progress.update(1)
-                        
-                        logger.info(f"Company {company['smm_company_id']} - ESG reports found: {result.has_esg_reports}")
+                        await self._analyze_and_store_company(company, force_reanalysis, replace_existing, url_results)
+                        await self.complete_job(worker_id, company_id)
+                        held_ids.discard(company_id)
+                        processed_count += 1
                         
                         # Add delay between companies
                         await asyncio.sleep(self.config.request_delay)
                         
                     except Exception as e:
-                        batch_progress.set_postfix_str("❌ Error")
-                        overall_progress.set_postfix_str("❌ Error")
-                        overall_progress.update(1)
-                        logger.error(f"Failed to process company {company['smm_company_id']}: {e}")
-                        continue
-                
-                # Close batch progress bar
-                batch_progress.close()
-                
-                # Update counters
-                processed_count += len(companies)
-                current_offset += batch_size
+                        logger.error(f"Failed to process company {company_id}: {e}")
+                        await self.release_jobs(worker_id, [company_id], max_attempts, error=str(e))
+                        held_ids.discard(company_id)
                 
-                # Log batch completion
-                logger.info(f"Batch completed. Processed {processed_count}/{total_companies} companies for version {self.version}")
-                
-                # Check if we need to continue
-                remaining_companies = await self.get_total_companies_count(force_reanalysis)
-                if remaining_companies == 0:
-                    logger.info(f"All companies have been analyzed for version {self.version}")
-                    break
-            
-            # Close overall progress bar
-            overall_progress.close()
+                await self._run_company_tasks(companies, process_company)
             
-            logger.info(f"🎉 Complete! Processed {processed_count} companies for version {self.version}")
+            logger.info(f"Worker {worker_id} finished. Processed {processed_count} companies for version {self.version_key}")
             
+        finally:
+            if renewer:
+                renewer.cancel()
+            try:
+                if held_ids and self.db_pool:
+                    # Hand unfinished leases back immediately instead of waiting for them to expire
+                    await self.release_jobs(worker_id, sorted(held_ids), max_attempts)
+                    logger.info(f"Released {len(held_ids)} unfinished jobs back to the queue")
+            finally:
+                await self.close_database()
+    
+    async def _run_company_tasks(self, companies: List[Dict[str, Any]],
+                                 handle: Callable[[int, Dict[str, Any], URLResults], Any]):
+        """
+        Run handle(i, company, url_results) for a batch: one by one, or concurrently when adaptive concurrency limits fetches
+        
+        Per-URL results are shared within the batch only, through the url_results passed
+        to every handle call, so a long-running crawler never answers from an analysis
+        older than its current batch.
+        """
+        url_results: URLResults = OrderedDict()
+        if self._fetch_limiter is None:
+            for i, company in enumerate(companies):
+                await handle(i, company, url_results)
+        else:
+            await asyncio.gather(*(handle(i, company, url_results) for i, company in enumerate(companies)))
+    
+    async def enqueue_companies(self, force_reanalysis: bool = False):
+        """Populate the job queue for this version and exit"""
+        try:
+            await self.init_database()
+            await self.ensure_job_queue()
+            await self.enqueue_jobs(force_reanalysis)
         finally:
             await self.close_database()
     
+    async def _analyze_and_store_company(self, company: Dict[str, Any], force_reanalysis: bool = False,
+                                         replace_existing: bool = False,
+                                         url_results: Optional[URLResults] = None) -> Dict[str, ESGReportAnalysisResult]:
+        """Fetch a company website once, run the requested versions and store their analyses together"""
+        company_id = company['smm_company_id']
+        versions_to_run = self._versions_to_run(company, force_reanalysis)
+        if not versions_to_run:
+            return {}
+        
+        # Forced re-analysis must not reuse analyses stored by earlier runs
+        results = await self.analyze_company_website_versions(company['website'], versions_to_run, company_id=company_id,
+                                                              reuse_stored=not force_reanalysis, url_results=url_results)
+        await self.sink.write(self, company, results, replace_existing=replace_existing)
+        
+        for version, result in results.items():
+            logger.info(f"Company {company_id} - ESG v{version} reports found: {result.has_esg_reports}")
+        
+        return results
+    
+    def _versions_to_run(self, company: Dict[str, Any], force_reanalysis: bool = False) -> List[str]:
+        """Requested versions a company still needs (all of them when forced); empty when it can be skipped"""
+        company_id = company['smm_company_id']
+        existing_versions = [version for version in self.versions
+                             if self._has_version_analysis(company.get('esg_info'), version)]
+        
+        if force_reanalysis:
+            # Check if these versions already exist (for force_reanalysis mode)
+            if existing_versions:
+                logger.info(f"Company {company_id} already has version {', '.join(existing_versions)} analysis, re-analyzing...")
+            return list(self.versions)
+        
+        versions_to_run = [version for version in self.versions if version not in existing_versions]
+        if not versions_to_run:
+            logger.info(f"Company {company_id} already has version {self.version_key} analysis, skipping")
+        return versions_to_run
+    
+    def _selects_company(self, company: Dict[str, Any], force_reanalysis: bool = False) -> bool:
+        """Python form of the select_companies filter for file sources: in this shard and missing a version"""
+        if self.shard and company_shard(company['smm_company_id'], self.shard[1]) != self.shard[0]:
+            return False
+        return force_reanalysis or any(not self._has_version_analysis(company.get('esg_info'), version)
+                                       for version in self.versions)
+    
     def _has_version_analysis(self, esg_info: Any, version: str) -> bool:
         """Check if a company already has analysis for the specified version"""
         if not esg_info:
@@ -1671,7 +5717,7 @@ class ESGReportCrawler:
             # Get version-specific statistics
             version_stats = await self.get_version_analysis_statistics()
             
-            print(f"\n=== ESG Analysis Statistics for Version {self.version} ===")
+            print(f"\n=== ESG Analysis Statistics for Version {self.version_key}{self._shard_label()} ===")
             print(f"Total companies with websites: {total_with_websites}")
             print(f"Companies needing analysis: {need_analysis}")
             print(f"Companies already analyzed: {total_with_websites - need_analysis}")
@@ -1693,7 +5739,7 @@ class ESGReportCrawler:
             if force_reanalysis:
                 print(f"\n⚠️  Force reanalysis mode: Will re-analyze ALL {total_with_websites} companies")
             else:
-                print(f"\n✅ Normal mode: Will only analyze companies without Version {self.version}")
+                print(f"\n✅ Normal mode: Will only analyze companies without Version {self.version_key}")
             
             print(f"\nExample commands:")
             print(f"# Process first batch of 10 companies")
@@ -1702,49 +5748,232 @@ class ESGReportCrawler:
             print(f"python esg_crawler.py --version {self.version} --batch-size 10 --offset 10")
             print(f"# Force re-analysis of all companies")
             print(f"python esg_crawler.py --version {self.version} --force-reanalysis --batch-size 5")
+            print(f"# Split the work across 4 independent processes (run 1/4 .. 4/4)")
+            print(f"python esg_crawler.py --version {self.version} --process-all --shard 1/4")
             
         finally:
             await self.close_database()
     
     async def get_version_analysis_statistics(self) -> Dict[str, int]:
         """Get statistics of how many companies have been analyzed by each version"""
-        query = """
-        SELECT 
-            elem->>'crawler_version' as version,
-            COUNT(DISTINCT smm_company_id) as company_count
-        FROM smm_companies,
-        LATERAL jsonb_array_elements(
-            CASE 
-                WHEN jsonb_typeof(esg_info) = 'array' THEN esg_info
-                WHEN esg_info IS NOT NULL THEN jsonb_build_array(esg_info)
-                ELSE '[]'::jsonb
-            END
-        ) AS elem
-        WHERE primary_domain IS NOT NULL 
-        AND primary_domain != ''
-        AND elem->>'crawler_version' IS NOT NULL
-        GROUP BY elem->>'crawler_version'
-        ORDER BY elem->>'crawler_version'
-        """
-        
         async with self.db_pool.acquire() as conn:
-            rows = await conn.fetch(query)
+            if await self._use_version_stats():
+                rows = await self.queries.fetch(conn, "summary_version_statistics")
+            else:
+                rows = await self.queries.fetch(conn, "version_statistics", *self._shard_args())
             return {row['version']: row['company_count'] for row in rows}
     
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080):
+        """
+        Service mode: keep the database pool, HTTP connector and NLP tools warm and analyze on request
+        
+        JSON endpoints:
+            GET  /health                  queue depth and in-flight companies
+            POST /analyze                 {"company_id": 1, "website": "...", "force": true, "wait": true}
+            POST /analyze/batch           {"companies": [{"company_id": 1}, ...], "force": true, "wait": false}
+            GET  /companies/{company_id}  in-flight state and the latest stored analysis per version
+        
+        "website" overrides the stored primary_domain and "force" (default true) analyzes
+        versions the company already has from a fresh fetch. Requests are queued for
+        serve_workers workers, and a request for a company already queued or running joins
+        that analysis. Completed per-URL results are not kept between requests, so only
+        concurrent requests for the same website share a fetch. With "wait" the response
+        carries the results, otherwise it returns 202 once queued.
+        """
+        from aiohttp import web
+        
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.serve_queue_size)
+        in_flight: Dict[int, asyncio.Future] = {}
+        stop_requested = asyncio.Event()
+        status_codes = {"analyzed": 200, "skipped": 200, "queued": 202, "not_found": 404,
+                        "invalid": 400, "rejected": 503, "failed": 500}
+        
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, stop_requested.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        
+        async def submit(company_id: int, website: Optional[str], force: bool) -> asyncio.Future:
+            """Queue a company unless it is already queued or running; resolves to a response payload"""
+            future = in_flight.get(company_id)
+            if future is not None:
+                return future
+            
+            future = loop.create_future()
+            in_flight[company_id] = future
+            future.add_done_callback(lambda _: in_flight.pop(company_id, None))
+            try:
+                company = await self.get_company(company_id)
+                if company is None:
+                    future.set_result({"company_id": company_id, "status": "not_found"})
+                    return future
+                if website:
+                    company = dict(company, website=website)
+                if not company['website']:
+                    future.set_result({"company_id": company_id, "status": "invalid", "error": "company has no website"})
+                    return future
+                queue.put_nowait((company, force, future))
+            except asyncio.QueueFull:
+                future.set_result({"company_id": company_id, "status": "rejected", "error": "analysis queue is full"})
+            except Exception as e:
+                future.set_result({"company_id": company_id, "status": "failed", "error": str(e)})
+            return future
+        
+        async def worker():
+            while True:
+                company, force, future = await queue.get()
+                company_id = company['smm_company_id']
+                payload = {"company_id": company_id, "website": company['website']}
+                try:
+                    # No URLResults: each request is answered from its own fetch (or one in flight)
+                    results = await self._analyze_and_store_company(company, force_reanalysis=force)
+                    payload.update(status="analyzed" if results else "skipped",
+                                   results={version: result.to_dict() for version, result in results.items()})
+                except Exception as e:
+                    logger.error(f"Failed to process company {company_id}: {e}")
+                    payload.update(status="failed", error=str(e))
+                future.set_result(payload)
+        
+        async def read_json(request) -> Dict[str, Any]:
+            try:
+                body = await request.json()
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                raise web.HTTPBadRequest(text=json.dumps({"error": "request body must be JSON"}),
+                                         content_type="application/json")
+            if not isinstance(body, dict):
+                raise web.HTTPBadRequest(text=json.dumps({"error": "request body must be a JSON object"}),
+                                         content_type="application/json")
+            return body
+        
+        def company_request(entry: Any) -> Tuple[int, Optional[str]]:
+            company_id = entry.get("company_id") if isinstance(entry, dict) else None
+            if not isinstance(company_id, int) or isinstance(company_id, bool):
+                raise web.HTTPBadRequest(text=json.dumps({"error": "company_id must be an integer"}),
+                                         content_type="application/json")
+            return company_id, entry.get("website")
+        
+        async def respond(future: asyncio.Future, wait: bool) -> Dict[str, Any]:
+            if wait or future.done():
+                # Shielded so a client disconnect does not cancel an analysis others may share
+                return await asyncio.shield(future)
+            return {"status": "queued"}
+        
+        async def health(request):
+            return web.json_response({"status": "ok", "versions": self.versions, "queued": queue.qsize(),
+                                      "in_flight": len(in_flight), "workers": self.config.serve_workers,
+                                      "sql": self.queries.summary()})
+        
+        async def analyze(request):
+            body = await read_json(request)
+            company_id, website = company_request(body)
+            future = await submit(company_id, website, bool(body.get("force", True)))
+            payload = await respond(future, bool(body.get("wait", True)))
+            payload.setdefault("company_id", company_id)
+            return web.json_response(payload, status=status_codes[payload["status"]], dumps=lambda data: json.dumps(data, default=str))
+        
+        async def analyze_batch(request):
+            body = await read_json(request)
+            entries = body.get("companies")
+            if not isinstance(entries, list) or not entries or len(entries) > self.config.serve_queue_size:
+                raise web.HTTPBadRequest(text=json.dumps({"error": f"companies must be a list of 1 to {self.config.serve_queue_size} entries"}),
+                                         content_type="application/json")
+            batch = [company_request(entry) for entry in entries]
+            force = bool(body.get("force", True))
+            wait = bool(body.get("wait", False))
+            futures = [await submit(company_id, website, force) for company_id, website in batch]
+            payloads = []
+            for (company_id, _), future in zip(batch, futures):
+                payload = dict(await respond(future, wait))
+                payload.setdefault("company_id", company_id)
+                payloads.append(payload)
+            status = 200 if wait or any(payload["status"] != "queued" for payload in payloads) else 202
+            return web.json_response({"companies": payloads}, status=status, dumps=lambda data: json.dumps(data, default=str))
+        
+        async def company_status(request):
+            try:
+                company_id = int(request.match_info["company_id"])
+            except ValueError:
+                raise web.HTTPBadRequest(text=json.dumps({"error": "company_id must be an integer"}),
+                                         content_type="application/json")
+            company = await self.get_company(company_id)
+            if company is None:
+                return web.json_response({"company_id": company_id, "status": "not_found"}, status=404)
+            
+            esg_info = company['esg_info']
+            if isinstance(esg_info, str):
+                esg_info = json.loads(esg_info)
+            analyses = esg_info if isinstance(esg_info, list) else [esg_info] if esg_info else []
+            latest = {}
+            for analysis in analyses:
+                if isinstance(analysis, dict):
+                    latest[analysis.get('crawler_version', '1.0')] = analysis
+            return web.json_response({"company_id": company_id, "website": company['website'],
+                                      "in_flight": company_id in in_flight, "analyses": latest},
+                                     dumps=lambda data: json.dumps(data, default=str))
+        
+        app = web.Application()
+        app.add_routes([
+            web.get("/health", health),
+            web.post("/analyze", analyze),
+            web.post("/analyze/batch", analyze_batch),
+            web.get("/companies/{company_id}", company_status),
+        ])
+        runner = web.AppRunner(app)
+        workers = []
+        
+        try:
+            await self.init_database(open_sink=True)
+            self._http_session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.config.timeout),
+                headers={'User-Agent': self.config.user_agent},
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+            )
+            if '4.0' in self.versions and _load_nlp_libraries():
+                self._get_nlp_tools()
+            
+            workers = [asyncio.create_task(worker()) for _ in range(max(1, self.config.serve_workers))]
+            await runner.setup()
+            await web.TCPSite(runner, host, port).start()
+            logger.info(f"Serving ESG analysis for version {self.version_key} on http://{host}:{port} "
+                        f"({self.config.serve_workers} workers)")
+            await stop_requested.wait()
+            logger.info("Shutting down service")
+            
+        finally:
+            await runner.cleanup()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for future in list(in_flight.values()):
+                if not future.done():
+                    future.cancel()
+            if self._http_session is not None:
+                await self._http_session.close()
+                self._http_session = None
+            await self.close_database()
+    
     async def process_single_company(self, company_id: int, website: str):
-        """Process a single company by ID and website"""
+        """Process a single company by ID and website (like process_source, without a database unless used)"""
         try:
-            await self.init_database()
+            await self._open_source_and_sink()
             
             logger.info(f"Processing single company {company_id}: {website}")
             
-            result = await self.analyze_company_website(website)
-            await self.update_company_esg_info(company_id, result)
+            # The source's row supplies the name and existing esg_info that file sinks write out
+            company = (await self.source.get(self, company_id)
+                       or {'smm_company_id': company_id, 'name': None, 'esg_info': None})
+            company = dict(company, website=website)
+            results = await self.analyze_company_website_versions(website, self.versions, company_id=company_id)
+            await self.sink.write(self, company, results)
             
-            logger.info(f"Company {company_id} - ESG reports found: {result.has_esg_reports}")
-            print(f"Analysis result: {result.to_json()}")
+            for version, result in results.items():
+                logger.info(f"Company {company_id} - ESG v{version} reports found: {result.has_esg_reports}")
+                print(f"Analysis result (v{version}): {result.to_json()}")
             
         finally:
+            await self.source.close()
             await self.close_database()
 
 def main():
@@ -1756,39 +5985,167 @@ def main():
     parser.add_argument('--company-id', type=int, help='Process single company by ID')
     parser.add_argument('--website', type=str, help='Website URL for single company processing')
     parser.add_argument('--user-agent', type=str, default='ESGReportBot/1.0', help='User agent string')
-    parser.add_argument('--version', type=str, default='1.0', choices=['1.0', '2.0', '3.0', '4.0'], help='Crawler version (1.0=basic, 2.0=enhanced scoring, 3.0=document discovery + quantitative analysis, 4.0=advanced NLP processing)')
+    parser.add_argument('--version', type=str, default='1.0', choices=SUPPORTED_VERSIONS, help='Crawler version (1.0=basic, 2.0=enhanced scoring, 3.0=document discovery + quantitative analysis, 4.0=advanced NLP processing)')
+    parser.add_argument('--versions', type=parse_versions, help='Comma-separated versions (e.g. 1.0,3.0,4.0) to run over a single fetch of each site; overrides --version')
     parser.add_argument('--offset', type=int, default=0, help='Starting offset for batch processing (for pagination)')
     parser.add_argument('--force-reanalysis', action='store_true', help='Force re-analysis of companies that already have this version analysis')
     parser.add_argument('--replace-existing', action='store_true', help='Replace existing ESG analysis instead of appending (overwrites all previous analysis)')
     parser.add_argument('--process-all', action='store_true', help='Process ALL companies continuously until complete (overrides offset)')
     parser.add_argument('--show-stats', action='store_true', help='Show statistics about companies needing analysis')
+    parser.add_argument('--cascade', action='store_true', help='Version 4.0: decide clear positives/negatives from keyword and document signals, run NLP only for ambiguous pages')
+    parser.add_argument('--keep-per-version', type=int, default=0, help='Latest analyses kept per version in esg_info when writing; older ones are deleted (default 0 = keep all)')
+    parser.add_argument('--compact-evidence', action='store_true', help='Store crawling evidence in the compact encoding (deduplicated navigation text, capped lists)')
+    parser.add_argument('--source', type=str, metavar='FILE', help='Read companies from a .csv, .jsonl or .sqlite file instead of smm_companies (process all that need analysis)')
+    parser.add_argument('--sink', type=str, metavar='FILE', help='Write analyses to a .jsonl, .sqlite or .parquet file instead of smm_companies.esg_info (with the database as source unless --source is given)')
+    parser.add_argument('--append-sink', action='store_true', help='Append to an existing .jsonl --sink file instead of replacing it')
+    parser.add_argument('--export', type=str, metavar='DIR', help='Export all stored analyses as typed rows partitioned by crawler version into DIR and exit')
+    parser.add_argument('--export-format', choices=['parquet', 'jsonl'], default='parquet', help='File format of --export (parquet needs pyarrow; jsonl is gzip-compressed)')
+    parser.add_argument('--export-chunk-rows', type=int, default=50000, help='Rows buffered per version before --export writes them (Parquet row group size)')
+    parser.add_argument('--export-latest', action='store_true', help='With --export, only the latest analysis per company and version')
+    parser.add_argument('--refresh-stats', action='store_true', help='Install or rebuild the esg_version_stats summary table (and its maintenance trigger) and exit')
+    parser.add_argument('--summary-stats', action='store_true', help='Count companies from the esg_version_stats summary table when installed, instead of smm_companies scans')
+    parser.add_argument('--compact-history', action='store_true', help='Rewrite existing esg_info rows in the compact evidence format, apply --keep-per-version and exit')
+    parser.add_argument('--rescore', nargs='?', const='', metavar='SCORING_JSON', help='Re-score stored page feature vectors of --version (optionally under a JSON scoring definition) without fetching, and exit')
+    parser.add_argument('--rescore-output', type=str, help='CSV file for per-company --rescore results')
+    parser.add_argument('--discover', action='store_true', help='Discover ESG pages through robots.txt Sitemap entries and sitemaps (cached per domain)')
+    parser.add_argument('--analyze-documents', action='store_true', help='Version 3.0+: download the top-ranked sustainability PDFs (within byte/page budgets) and scan their text')
+    parser.add_argument('--document-max-mb', type=float, default=8.0, help='Download cap per PDF in MB for --analyze-documents; larger PDFs are skipped')
+    parser.add_argument('--document-max-pages', type=int, default=15, help='Pages of text extracted per PDF for --analyze-documents')
+    parser.add_argument('--adaptive-concurrency', action='store_true', help='Process each batch concurrently; in-flight fetches follow an AIMD limit driven by p95 latency and error rate')
+    parser.add_argument('--max-concurrency', type=int, default=32, help='Upper bound of the adaptive fetch concurrency')
+    parser.add_argument('--hedge-requests', action='store_true', help='With --adaptive-concurrency, re-issue fetches still running past the recent p99 latency')
+    parser.add_argument('--loop-monitor', action='store_true', help='Measure event-loop lag with a heartbeat; stalls are logged with the stage and company that caused them and lag percentiles are reported at the end of the run')
+    parser.add_argument('--loop-lag-threshold', type=float, default=100.0, help='Heartbeat lag in milliseconds logged as a stall by --loop-monitor')
+    parser.add_argument('--uvloop', action='store_true', help='Run on the uvloop event loop if it is installed')
+    parser.add_argument('--dedupe', action='store_true', help="Reuse the analysis of another company's near-duplicate page analyzed earlier in the run")
+    parser.add_argument('--dedupe-store', action='store_true', help='Like --dedupe, also reusing analyses from earlier runs via the esg_page_fingerprints table')
+    parser.add_argument('--store-fingerprints', action='store_true', help='Store the content fingerprint of every fetched page without --dedupe, so later --recrawl runs can detect page changes (implied by --recrawl)')
+    parser.add_argument('--store-features', action='store_true', help='Persist each page\'s scoring feature vector to esg_page_features (created on first write) for --rescore')
+    parser.add_argument('--enqueue', action='store_true', help='Queue companies needing analysis into the esg_crawl_jobs lease table and exit')
+    parser.add_argument('--worker', action='store_true', help='Work-queue mode: claim leased batches from esg_crawl_jobs until the queue is drained')
+    parser.add_argument('--lease-seconds', type=int, default=300, help='Lease duration for work-queue mode; leases are renewed while working')
+    parser.add_argument('--max-attempts', type=int, default=3, help='Attempts per company in work-queue mode before it is marked failed')
+    parser.add_argument('--serve', action='store_true', help='Run a long-lived HTTP service that keeps the database pool, HTTP connector and NLP tools warm and analyzes companies on request')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Address the --serve API listens on')
+    parser.add_argument('--port', type=int, default=8080, help='Port the --serve API listens on')
+    parser.add_argument('--serve-workers', type=int, default=4, help='Companies analyzed concurrently by --serve')
+    parser.add_argument('--recrawl', type=int, metavar='BUDGET', help='Re-analyze the BUDGET companies most likely to have a different answer, ranked by staleness, observed change rate and last result')
+    parser.add_argument('--recrawl-min-age', type=float, default=7.0, help='Days since the last analysis before a company is considered for --recrawl')
+    parser.add_argument('--plan-only', action='store_true', help='With --recrawl, print the ranked work list without crawling')
+    parser.add_argument('--watch', action='store_true', help='Install the smm_companies NOTIFY trigger and analyze companies as they are inserted or change domain (LISTEN, no table scans)')
+    parser.add_argument('--watch-window', type=float, default=2.0, help='Seconds --watch collects notifications into one micro-batch (up to --batch-size companies)')
+    parser.add_argument('--watch-catch-up', action='store_true', help='With --watch, also process companies still needing analysis whenever listening starts')
+    parser.add_argument('--pipeline', action='store_true', help='Process ALL companies as a staged pipeline (prefilter, fetch, analyze, sink) connected by bounded queues')
+    parser.add_argument('--stage-workers', type=parse_stage_workers, default={}, help='Pipeline workers per stage, e.g. prefilter=8,fetch=16,analyze=1,sink=2')
+    parser.add_argument('--stage-queue-size', type=int, default=100, help='Capacity of each pipeline stage queue')
+    parser.add_argument('--shard', type=parse_shard, help='Only handle shard K of N (e.g. 2/4), partitioned by a stable hash of smm_company_id')
     
     args = parser.parse_args()
     
+    setup_logging()
+    
     # Validate single company arguments
     if args.company_id and not args.website:
         parser.error('--website is required when using --company-id')
     if args.website and not args.company_id:
         parser.error('--company-id is required when using --website')
     
+    if args.uvloop:
+        install_uvloop()
+    
     # Create crawler configuration
     config = CrawlerConfig(
         request_delay=args.delay,
         timeout=args.timeout,
-        user_agent=args.user_agent
+        user_agent=args.user_agent,
+        keep_analyses_per_version=args.keep_per_version,
+        compact_evidence=args.compact_evidence,
+        cascade=args.cascade,
+        store_features=args.store_features,
+        dedupe_pages=args.dedupe or args.dedupe_store,
+        dedupe_store=args.dedupe_store,
+        store_fingerprints=args.store_fingerprints or args.recrawl is not None,
+        sitemap_discovery=args.discover,
+        analyze_documents=args.analyze_documents,
+        adaptive_concurrency=args.adaptive_concurrency,
+        max_concurrency=args.max_concurrency,
+        hedge_requests=args.hedge_requests,
+        loop_monitor=args.loop_monitor,
+        summary_stats=args.summary_stats,
+        serve_workers=args.serve_workers,
+        pipeline_queue_size=args.stage_queue_size,
+        **{f"pipeline_{stage}_workers": count for stage, count in args.stage_workers.items()},
+        loop_lag_threshold=args.loop_lag_threshold / 1000,
+        document_max_bytes=int(args.document_max_mb * 1_000_000),
+        document_max_pages=args.document_max_pages
     )
     
-    crawler = ESGReportCrawler(config, version=args.version)
+    try:
+        source = company_source_for_path(args.source) if args.source else None
+        sink = result_sink_for_path(args.sink, append=args.append_sink) if args.sink else None
+    except ValueError as e:
+        parser.error(str(e))
+    
+    crawler = ESGReportCrawler(config, version=args.version, shard=args.shard, versions=args.versions,
+                               source=source, sink=sink)
     
     try:
         if args.show_stats:
             # Show statistics only
             asyncio.run(crawler.show_analysis_statistics(args.force_reanalysis))
+        elif args.export:
+            asyncio.run(crawler.export_company_analyses(
+                args.export, args.export_format, args.export_chunk_rows, args.export_latest
+            ))
+        elif args.refresh_stats:
+            asyncio.run(crawler.refresh_version_stats())
+        elif args.compact_history:
+            asyncio.run(crawler.compact_esg_history())
+        elif args.rescore is not None:
+            asyncio.run(crawler.rescore_stored_features(args.rescore or None, args.rescore_output))
+        elif args.recrawl is not None:
+            asyncio.run(crawler.process_recrawl(
+                budget=args.recrawl,
+                min_age_days=args.recrawl_min_age,
+                plan_only=args.plan_only,
+                replace_existing=args.replace_existing
+            ))
+        elif args.watch:
+            asyncio.run(crawler.watch_companies(
+                batch_size=args.batch_size,
+                batch_window=args.watch_window,
+                catch_up=args.watch_catch_up,
+                replace_existing=args.replace_existing
+            ))
+        elif args.serve:
+            asyncio.run(crawler.serve(args.host, args.port))
+        elif args.enqueue:
+            asyncio.run(crawler.enqueue_companies(args.force_reanalysis))
+        elif args.worker:
+            asyncio.run(crawler.process_job_queue(
+                batch_size=args.batch_size,
+                lease_seconds=args.lease_seconds,
+                max_attempts=args.max_attempts,
+                force_reanalysis=args.force_reanalysis,
+                replace_existing=args.replace_existing
+            ))
         elif args.company_id and args.website:
             # Process single company
             asyncio.run(crawler.process_single_company(args.company_id, args.website))
+        elif args.source or args.sink:
+            asyncio.run(crawler.process_source(
+                batch_size=args.batch_size,
+                force_reanalysis=args.force_reanalysis,
+                replace_existing=args.replace_existing
+            ))
         else:
-            if args.process_all:
+            if args.pipeline:
+                asyncio.run(crawler.process_companies_pipeline(
+                    batch_size=args.batch_size,
+                    force_reanalysis=args.force_reanalysis,
+                    replace_existing=args.replace_existing
+                ))
+            elif args.process_all:
                 # Process ALL companies continuously
                 asyncio.run(crawler.process_all_companies(
                     batch_size=args.batch_size,
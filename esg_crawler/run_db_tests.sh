@@ -0,0 +1,34 @@
+#!/bin/bash
+
+# Database Test Runner Script
+# Runs the esg_crawler tests, including the ones that need Postgres.
+# With DB_HOST set, the tests use that server; otherwise a throwaway
+# Postgres container is started (needs docker) and removed afterwards.
+
+set -e
+
+# Colors for output
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m' # No Color
+
+cd "$(dirname "$0")/.."
+
+if [ -z "$DB_HOST" ]; then
+    CONTAINER="esg-crawler-test-db-$$"
+    export DB_HOST=localhost
+    export DB_PORT=${DB_PORT:-55432}
+    export DB_NAME=nexus DB_USER=postgres DB_PASSWORD=postgres
+    
+    echo -e "${YELLOW}Starting Postgres in container ${CONTAINER}...${NC}"
+    docker run -d --rm --name "$CONTAINER" -p "$DB_PORT:5432" \
+        -e POSTGRES_DB="$DB_NAME" -e POSTGRES_PASSWORD="$DB_PASSWORD" postgres:16 > /dev/null
+    trap 'docker stop "$CONTAINER" > /dev/null' EXIT
+    
+    until docker exec "$CONTAINER" pg_isready -U "$DB_USER" -d "$DB_NAME" > /dev/null 2>&1; do
+        sleep 1
+    done
+fi
+
+echo -e "${GREEN}Running tests against Postgres at ${DB_HOST}:${DB_PORT:-5432}...${NC}"
+ESG_CRAWLER_TEST_DATABASE=1 python -m pytest esg_crawler/tests "$@"
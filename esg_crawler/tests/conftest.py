@@ -0,0 +1,175 @@
+"""
+Shared fixtures for the esg_crawler tests (run with: python -m pytest esg_crawler/tests)
+
+Tests marked with the `database` fixture need Postgres. They are skipped unless
+ESG_CRAWLER_TEST_DATABASE=1 is set, and then connect with the crawler's DB_* variables.
+Each test runs in its own temporary schema, which is dropped afterwards.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import uuid
+from collections import Counter
+
+import asyncpg
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# esg_crawler.py is a standalone script, so import it from its directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import esg_crawler  # noqa: E402
+
+
+@pytest.fixture
+def crawler_factory():
+    """Build crawlers with a default config overridden by keyword arguments"""
+    def build(version: str = "1.0", versions=None, shard=None, **config):
+        return esg_crawler.ESGReportCrawler(esg_crawler.CrawlerConfig(**config), version=version,
+                                            shard=shard, versions=versions)
+    return build
+
+
+def _db_config():
+    return {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': int(os.getenv('DB_PORT', 5432)),
+        'database': os.getenv('DB_NAME', 'nexus'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', ''),
+    }
+
+
+@pytest.fixture
+def database():
+    """
+    Async context manager factory: `async with database(companies) as pool` creates an
+    smm_companies table in a temporary schema, filled with (id, name, domain, esg_info) rows
+    """
+    if not os.getenv('ESG_CRAWLER_TEST_DATABASE'):
+        pytest.skip("set ESG_CRAWLER_TEST_DATABASE=1 to run tests against Postgres")
+    
+    @contextlib.asynccontextmanager
+    async def connect(companies=()):
+        schema = f"esg_test_{uuid.uuid4().hex[:12]}"
+        admin = await asyncpg.connect(**_db_config())
+        await admin.execute(f"CREATE SCHEMA {schema}")
+        pool = None
+        try:
+            pool = await asyncpg.create_pool(**_db_config(), min_size=1, max_size=5,
+                                             server_settings={'search_path': schema})
+            async with pool.acquire() as conn:
+                await conn.execute("""
+                CREATE TABLE smm_companies (
+                    smm_company_id BIGINT PRIMARY KEY,
+                    name TEXT,
+                    primary_domain TEXT,
+                    esg_info JSONB,
+                    updated_at TIMESTAMPTZ DEFAULT NOW()
+                )
+                """)
+                await conn.executemany(
+                    "INSERT INTO smm_companies (smm_company_id, name, primary_domain, esg_info) VALUES ($1, $2, $3, $4)",
+                    [(company_id, name, domain, json.dumps(esg_info) if esg_info is not None else None)
+                     for company_id, name, domain, esg_info in companies]
+                )
+            yield pool
+        finally:
+            if pool is not None:
+                await pool.close()
+            await admin.execute(f"DROP SCHEMA {schema} CASCADE")
+            await admin.close()
+    
+    return connect
+
+
+@contextlib.asynccontextmanager
+async def worker_pool(pool, max_size: int = 2):
+    """Another pool on the schema of a `database` pool, standing in for a separate worker process"""
+    schema = await pool.fetchval("SELECT current_schema()")
+    worker = await asyncpg.create_pool(**_db_config(), min_size=1, max_size=max_size,
+                                       server_settings={'search_path': schema})
+    try:
+        yield worker
+    finally:
+        await worker.close()
+
+
+def make_companies(count: int, domain: str = "https://example.com/{}"):
+    """(id, name, domain, esg_info) rows for `database`; every seventh company has no domain"""
+    return [(i, f"Company {i}", None if i % 7 == 0 else domain.format(i), None) for i in range(1, count + 1)]
+
+
+ESG_PAGE = """<html lang="en"><head><title>Example Corp - Sustainability</title></head><body>
+<nav><a href="/sustainability">Sustainability</a><a href="/investors">Investors</a></nav>
+<p>Read our annual sustainability report and ESG report. We reduced carbon emissions by 30% in 2023
+and target net zero by 2040 across all operations, with renewable energy reaching 80% of consumption.</p>
+<a href="/reports/sustainability-report-2023.pdf">Sustainability Report 2023 (PDF)</a>
+</body></html>"""
+
+PLAIN_PAGE = """<html lang="en"><head><title>Example Corp - Home</title></head><body>
+<nav><a href="/products">Products</a><a href="/contact">Contact</a></nav>
+<p>We build industrial pumps, valves and fittings for customers in forty countries around the world.</p>
+</body></html>"""
+
+
+class LocalSite:
+    """Pages served by a local aiohttp server; hits counts requests per path"""
+    
+    def __init__(self, server: TestServer, pages: dict):
+        self.server = server
+        self.pages = pages
+        self.hits = Counter()
+    
+    def url(self, path: str = "/") -> str:
+        return str(self.server.make_url(path))
+
+
+@pytest.fixture
+def local_site():
+    """
+    Async context manager factory: `async with local_site({path: html}) as site` serves the
+    pages (editable through site.pages while running) and answers other paths with 404
+    """
+    @contextlib.asynccontextmanager
+    async def serve(pages):
+        site = None
+        
+        async def handle(request):
+            site.hits[request.path] += 1
+            page = site.pages.get(request.path)
+            if page is None:
+                return web.Response(status=404, text="not found")
+            if isinstance(page, bytes):
+                return web.Response(body=page, content_type="application/pdf")
+            return web.Response(text=page, content_type="text/html")
+        
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", handle)
+        server = TestServer(app, host="127.0.0.1")
+        await server.start_server()
+        site = LocalSite(server, dict(pages))
+        try:
+            yield site
+        finally:
+            await server.close()
+    
+    return serve
+
+
+def attach_pool(crawler, pool):
+    """Point a crawler at a `database` pool; its own init/close only open and close the sink, the test owns the pool"""
+    async def open_sink(open_sink=False):
+        if open_sink:
+            await crawler.sink.open()
+    
+    async def close_sink():
+        await crawler.sink.close()
+    
+    crawler.db_pool = pool
+    crawler.init_database = open_sink
+    crawler.close_database = close_sink
+    return crawler
@@ -0,0 +1,103 @@
+"""AIMD fetch concurrency limit and hedge delay"""
+
+import asyncio
+
+from esg_crawler import AdaptiveConcurrencyLimiter
+
+
+async def finish(limiter, count, latency=0.0, failed=False):
+    """Record count fetches that took latency seconds"""
+    for _ in range(count):
+        started = await limiter.acquire()
+        await limiter.release(started - latency, failed)
+
+
+def test_limit_grows_by_one_per_healthy_window():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(initial=4, maximum=6, min_window=5)
+        await finish(limiter, 5)
+        grown = limiter.limit
+        await finish(limiter, 20)
+        return grown, limiter.limit
+
+    assert asyncio.run(scenario()) == (5, 6)
+
+
+def test_limit_halves_on_slow_or_failing_windows():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(initial=8, minimum=3, latency_budget=1.0, error_budget=0.1, min_window=10)
+        await finish(limiter, 10, latency=5.0)
+        slow = limiter.limit
+        await finish(limiter, 8)
+        await finish(limiter, 2, failed=True)
+        return slow, limiter.limit
+
+    slow, failing = asyncio.run(scenario())
+    assert slow == 4
+    # 20% overload errors halve again, but not below the minimum
+    assert failing == 3
+
+
+def test_fetches_started_before_a_decrease_are_ignored():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(initial=4, latency_budget=1.0, min_window=4)
+        stale = [await limiter.acquire() for _ in range(2)]
+        await finish(limiter, 4, latency=5.0)
+        assert limiter.limit == 2
+        for started in stale:
+            await limiter.release(started - 5.0, False)
+        return limiter.limit, len(limiter._window), limiter.in_flight
+
+    assert asyncio.run(scenario()) == (2, 0, 0)
+
+
+def test_acquire_waits_for_a_free_slot():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(initial=1, maximum=1)
+        started = await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await limiter.release(started, False)
+        await asyncio.wait_for(waiter, timeout=1)
+        return limiter.in_flight
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_hedge_delay_is_p99_of_successful_fetches():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(min_window=1000)
+        await finish(limiter, 19, latency=1.0)
+        before = limiter.hedge_delay()
+        await finish(limiter, 5, latency=30.0, failed=True)
+        await finish(limiter, 80, latency=1.0)
+        await finish(limiter, 1, latency=4.0)
+        return before, limiter.hedge_delay()
+
+    before, delay = asyncio.run(scenario())
+    assert before is None
+    assert 1.0 <= delay < 1.5
+
+
+def test_limiter_bounds_concurrent_fetches(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({"/": "<html><body>ok</body></html>"}) as site:
+            crawler = crawler_factory(request_delay=0)
+            crawler._fetch_limiter = AdaptiveConcurrencyLimiter(initial=2, maximum=2)
+            peak = 0
+            original = crawler._fetch_homepage_once
+
+            async def observed(session, base_url, fingerprint=False):
+                nonlocal peak
+                peak = max(peak, crawler._fetch_limiter.in_flight)
+                await asyncio.sleep(0.01)
+                return await original(session, base_url, fingerprint)
+
+            crawler._fetch_homepage_once = observed
+            await asyncio.gather(*(crawler.analyze_company_website_versions(site.url(f"/?page={i}"), ["1.0"])
+                                   for i in range(6)))
+            return peak, crawler._fetch_limiter.in_flight
+
+    assert asyncio.run(scenario()) == (2, 0)
+
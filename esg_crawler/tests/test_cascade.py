@@ -0,0 +1,132 @@
+"""The v4 detection cascade must decide every page exactly like the full v4 pass"""
+
+import itertools
+
+import pytest
+from bs4 import BeautifulSoup
+
+import esg_crawler
+
+SENTENCES = {
+    "keywords": "Our sustainability program covers environmental and social topics.",
+    "report": "Download the annual sustainability report.",
+    "figures": "Emissions fell by 12% and waste by 8%.",
+    "target": "We target net zero by 2040.",
+    "commitment": "We commit to and pledge to ensure responsible sourcing.",
+    "weak": "We may explore green options and could consider renewable power.",
+    "document": '<a href="/files/csr-report-2023.pdf">CSR report</a>',
+    "filler": "We sell pumps and valves to industrial customers.",
+}
+
+
+def borderline_pages():
+    """Every combination of up to three signals, which spans both sides of the v4 thresholds"""
+    names = list(SENTENCES)
+    for size in range(0, 4):
+        for combination in itertools.combinations(names, size):
+            body = "".join(f"<p>{SENTENCES[name]}</p>" for name in combination)
+            yield "+".join(combination) or "empty", f"<html><head><title>Home</title></head><body>{body}</body></html>"
+
+
+def strongest_nlp(crawler):
+    """NLP results at the score and confidence caps, with the real commitment strength of the text"""
+    def analyze(text, sentences=None, esg_sentiment=None):
+        return {
+            "sentiment_analysis": {"esg_specific_sentiment": 1.0},
+            "esg_topics_identified": [{"topic": f"topic {i}"} for i in range(10)],
+            "commitment_strength": crawler._analyze_commitment_strength(text),
+            "credibility_indicators": {"overall_credibility": 1.0, "has_verification": True, "has_specific_metrics": True},
+            "forward_looking_statements": ["statement"] * 5,
+            "named_entities": [{"entity": f"entity {i}"} for i in range(20)],
+        }
+    return analyze
+
+
+@pytest.fixture(params=["strongest", "failed"])
+def nlp_stage(request, monkeypatch):
+    """
+    Replace the NLP stage by its extreme outputs: the largest possible boost and a failed run.
+    A cascade negative must stay negative under the boost, so agreement holds for any lexicon.
+    """
+    monkeypatch.setattr(esg_crawler, "_load_nlp_libraries", lambda: True)
+    monkeypatch.setattr(esg_crawler.ESGReportCrawler, "_ensure_nltk_data", lambda self: None)
+    
+    def install(crawler):
+        if request.param == "strongest":
+            crawler._perform_nlp_analysis = strongest_nlp(crawler)
+        else:
+            crawler._perform_nlp_analysis = lambda text, sentences=None, esg_sentiment=None: {}
+        return crawler
+    return install
+
+
+def detect(crawler, html):
+    soup = BeautifulSoup(html, "html.parser")
+    crawler._detection_memo = {}
+    try:
+        return crawler._detect_with_memo(soup, "4.0")
+    finally:
+        crawler._detection_memo = None
+
+
+def test_cascade_agrees_with_full_v4(crawler_factory, nlp_stage):
+    full = nlp_stage(crawler_factory(version="4.0"))
+    cascade = nlp_stage(crawler_factory(version="4.0", cascade=True))
+    
+    tiers = set()
+    for name, html in borderline_pages():
+        expected, _ = detect(full, html)
+        decided, evidence = detect(cascade, html)
+        assert decided == expected, name
+        tiers.add((evidence["cascade"]["tier"], decided))
+    
+    # The pages exercise early positives, early negatives and escalation to NLP
+    assert {("keyword_signals", True), ("document_signals", False), ("nlp", False)} <= tiers
+
+
+def test_strong_commitment_language_is_never_an_early_negative(crawler_factory, nlp_stage):
+    full = nlp_stage(crawler_factory(version="4.0"))
+    cascade = nlp_stage(crawler_factory(version="4.0", cascade=True))
+    html = f"<html><body><p>{SENTENCES['commitment']}</p></body></html>"
+    
+    decided, evidence = detect(cascade, html)
+    assert evidence["cascade"]["tier"] == "nlp"
+    assert decided == detect(full, html)[0]
+
+
+def test_widened_negative_band_is_still_bounded_by_v4_thresholds(crawler_factory, nlp_stage):
+    # A band wider than the thresholds allow must not create negatives full v4 would reject
+    full = nlp_stage(crawler_factory(version="4.0"))
+    cascade = nlp_stage(crawler_factory(version="4.0", cascade=True, cascade_negative_score=5.0,
+                                        cascade_negative_confidence=0.9))
+    for name, html in borderline_pages():
+        assert detect(cascade, html)[0] == detect(full, html)[0], name
+
+
+def test_batch_detection_applies_the_cascade(crawler_factory, nlp_stage, monkeypatch):
+    pytest.importorskip("numpy")
+    esg_crawler._load_numpy()
+    
+    class NeutralSentiment:
+        def polarity_scores(self, sentence):
+            return {"compound": 0.0}
+    
+    monkeypatch.setattr(esg_crawler, "sent_tokenize", lambda text: text.split(". "), raising=False)
+    monkeypatch.setattr(esg_crawler.ESGReportCrawler, "_get_nlp_tools", lambda self: {"sia": NeutralSentiment()})
+    per_page = nlp_stage(crawler_factory(version="4.0", cascade=True))
+    batched = nlp_stage(crawler_factory(version="4.0", cascade=True))
+    analyze = batched._perform_nlp_analysis
+    nlp_runs = []
+    batched._perform_nlp_analysis = lambda text, **kwargs: nlp_runs.append(text) or analyze(text, **kwargs)
+    
+    pages = [html for _, html in borderline_pages()]
+    batch = batched.detect_esg_content_batch([BeautifulSoup(html, "html.parser") for html in pages], "4.0")
+    
+    for html, (decided, evidence) in zip(pages, batch):
+        expected, expected_evidence = detect(per_page, html)
+        assert decided == expected
+        assert evidence["cascade"] == expected_evidence["cascade"]
+        tier = evidence["cascade"]["tier"]
+        assert evidence["detection_method"] == ("advanced_nlp_processing" if tier == "nlp" else f"cascade_{tier}")
+    # Only the pages the cheap tiers left open reach the NLP stage
+    assert len(nlp_runs) == sum(evidence["cascade"]["tier"] == "nlp" for _, evidence in batch) < len(pages)
@@ -0,0 +1,108 @@
+"""PDF document analysis: report confirmation and the document worker process"""
+
+import asyncio
+import os
+import time
+
+import aiohttp
+import pytest
+
+import esg_crawler
+
+pytest.importorskip("pypdf")
+
+
+def make_pdf(pages, title=None):
+    """A minimal PDF with one line of Helvetica text per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    if title:
+        objects.append(f"<< /Title ({title}) >>")
+
+    body = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{obj}\nendobj\n".encode()
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    body += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    info = f" /Info {len(objects)} 0 R" if title else ""
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R{info} >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return body
+
+
+ESG_REPORT_PDF = make_pdf(["Example Corp Sustainability Report 2023",
+                           "Prepared in accordance with the GRI Standards. Scope 1 emissions fell 12%."])
+ANNUAL_REPORT_PDF = make_pdf(["Example Corp Annual Report 2023",
+                              "Details are in our separate sustainability report and ESG report."])
+TITLED_BY_METADATA_PDF = make_pdf(["Contents", "Our TCFD disclosures and climate targets."],
+                                  title="Climate Report 2023")
+
+
+def test_extraction_returns_metadata_title_and_first_page():
+    extracted = esg_crawler.extract_pdf_text(TITLED_BY_METADATA_PDF, max_pages=5, max_chars=10_000)
+    assert extracted["page_count"] == 2
+    assert extracted["title"].splitlines() == ["Climate Report 2023", "Contents"]
+    assert "TCFD disclosures" in extracted["text"]
+
+
+def analyze_documents(crawler, site, paths):
+    async def run():
+        try:
+            async with aiohttp.ClientSession() as session:
+                return [await crawler._analyze_document(session, site.url(path)) for path in paths]
+        finally:
+            await crawler.close_database()
+    return run()
+
+
+def test_only_titled_reports_citing_a_framework_confirm(crawler_factory, local_site):
+    pdfs = {"/report.pdf": ESG_REPORT_PDF, "/annual.pdf": ANNUAL_REPORT_PDF, "/climate.pdf": TITLED_BY_METADATA_PDF}
+
+    async def scenario():
+        async with local_site(pdfs) as site:
+            crawler = crawler_factory(analyze_documents=True)
+            return await analyze_documents(crawler, site, list(pdfs)), crawler
+
+    analyses, crawler = asyncio.run(scenario())
+    assert [analysis["status"] for analysis in analyses] == ["analyzed"] * 3
+    report, annual, climate = analyses
+    assert report["confirms_report"] and report["report_frameworks"] == ["gri", "scope 1"]
+    # Mentions report phrases, but is neither titled as one nor cites a framework
+    assert annual["report_keywords"] and not annual["confirms_report"]
+    assert climate["confirms_report"]
+    # close_database shut the worker down
+    assert crawler._document_pool is None
+
+
+def test_reset_kills_a_hung_worker(crawler_factory):
+    async def scenario():
+        crawler = crawler_factory()
+        loop = asyncio.get_running_loop()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(loop.run_in_executor(crawler._get_document_pool(), time.sleep, 60), timeout=3)
+        worker_pid = crawler._document_worker_pid.value
+        crawler._reset_document_pool()
+        return crawler, worker_pid
+
+    crawler, worker_pid = asyncio.run(scenario())
+    assert worker_pid and crawler._document_pool is None
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            # Reap it if it is our child, then check whether it still exists
+            os.waitpid(worker_pid, os.WNOHANG)
+            os.kill(worker_pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            break
+        time.sleep(0.1)
+    else:
+        pytest.fail("document worker still running after reset")
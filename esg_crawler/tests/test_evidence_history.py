@@ -0,0 +1,81 @@
+"""Opt-in compact evidence encoding and bounded esg_info history"""
+
+import asyncio
+import json
+
+import pytest
+
+import esg_crawler
+from esg_crawler import EVIDENCE_FORMAT, ESGReportAnalysisResult
+
+
+def make_evidence():
+    return {
+        "navigation_matches": [
+            {"keyword": "sustainability", "nav_text": "Home  Sustainability Investors"},
+            {"keyword": "esg", "nav_text": "Home Sustainability   Investors"},
+            {"keyword": "climate", "nav_text": "Climate"},
+        ],
+        "quantitative_patterns": {"percentages_found": ["30%"] * 3 + [f"{i}%" for i in range(40)]},
+    }
+
+
+def make_result(evidence=None):
+    return ESGReportAnalysisResult(
+        company_website="https://example.com", collection_timestamp="2024-01-01T00:00:00",
+        website_analysis={"base_url": "https://example.com"}, has_esg_reports=True,
+        crawling_evidence=evidence if evidence is not None else make_evidence(), crawler_config={}
+    )
+
+
+def test_compaction_dedupes_navigation_text_and_caps_lists(crawler_factory):
+    crawler = crawler_factory(evidence_list_limit=10)
+    compact = crawler._compact_evidence(make_evidence())
+    
+    assert compact["evidence_format"] == EVIDENCE_FORMAT
+    assert compact["navigation_texts"] == ["Home Sustainability Investors", "Climate"]
+    assert [match["nav_text_id"] for match in compact["navigation_matches"]] == [0, 0, 1]
+    assert compact["quantitative_patterns"]["percentages_found"] == ["30%"] + [f"{i}%" for i in range(9)]
+    assert compact["list_totals"] == {"quantitative_patterns.percentages_found": 43}
+    # Already compact evidence is left alone
+    assert crawler._compact_evidence(compact) is compact
+
+
+def test_evidence_is_stored_verbatim_by_default(crawler_factory, database):
+    async def stored_evidence(**config):
+        async with database([(1, "Company 1", "https://example.com", None)]) as pool:
+            crawler = crawler_factory(**config)
+            crawler.db_pool = pool
+            await crawler.update_company_esg_info_versions(1, {"1.0": make_result()})
+            return json.loads(await pool.fetchval("SELECT esg_info FROM smm_companies"))[0]["crawling_evidence"]
+    
+    assert asyncio.run(stored_evidence()) == make_evidence()
+    assert asyncio.run(stored_evidence(compact_evidence=True))["evidence_format"] == EVIDENCE_FORMAT
+
+
+def test_storing_for_a_missing_company_fails(crawler_factory, database):
+    async def scenario():
+        async with database([(1, "Company 1", "https://example.com", None)]) as pool:
+            crawler = crawler_factory()
+            crawler.db_pool = pool
+            with pytest.raises(ValueError, match="Company 2 not found"):
+                await crawler.update_company_esg_info_versions(2, {"1.0": make_result()}, replace_existing=True)
+            await crawler.update_company_esg_info_versions(1, {"1.0": make_result()}, replace_existing=True)
+            return crawler.queries.summary()["update_esg_info"]["calls"]
+    
+    assert asyncio.run(scenario()) == 2
+
+
+def test_history_is_unbounded_by_default(crawler_factory):
+    assert esg_crawler.CrawlerConfig().keep_analyses_per_version == 0
+    history = [{"crawler_version": "1.0", "n": i} for i in range(12)]
+    assert crawler_factory()._apply_retention(history) == history
+
+
+def test_retention_keeps_latest_analyses_per_version(crawler_factory):
+    history = [{"crawler_version": version, "n": i} for i in range(4) for version in ("1.0", "3.0")]
+    history.insert(0, "legacy entry")
+    
+    retained = crawler_factory(keep_analyses_per_version=2)._apply_retention(history)
+    assert retained == ["legacy entry"] + [{"crawler_version": version, "n": i}
+                                           for i in (2, 3) for version in ("1.0", "3.0")]
@@ -0,0 +1,176 @@
+"""Typed export of stored analyses (flatten_analysis, --export to Parquet or JSONL)"""
+
+import asyncio
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+
+from esg_crawler import EXPORT_COLUMNS, flatten_analysis
+
+COMPANY = {"smm_company_id": 7, "name": "Example Corp", "website": "https://example.com"}
+
+
+def analysis(version="1.0", timestamp="2026-05-01T12:00:00", has_esg=True, **page):
+    return {
+        "crawler_version": version,
+        "analysis_timestamp": timestamp,
+        "has_esg_reports": has_esg,
+        "website_analysis": {"base_url": "https://example.com", "is_accessible": True, "status_code": 200, **page},
+        "crawling_evidence": {
+            "detection_method": "keywords",
+            "sustainability_score": "0.75",
+            "keywords_found": ["esg report", "sustainability report", "net zero"],
+            "url_discovery": {"esg_urls": ["https://example.com/esg"]},
+            "list_totals": {"url_discovery.esg_urls": 12},
+            "cascade": {"tier": "pattern"},
+            "reused_from": {"smm_company_id": "3"},
+        },
+    }
+
+
+def test_flatten_fills_every_export_column():
+    row = flatten_analysis(COMPANY, analysis(page_size="2048", response_time=0.5), is_latest=True)
+    assert list(row) == [name for name, _ in EXPORT_COLUMNS]
+    assert row["smm_company_id"] == 7 and row["company_name"] == "Example Corp"
+    assert row["primary_domain"] == "https://example.com"
+    assert row["analysis_timestamp"] == datetime(2026, 5, 1, 12)
+    assert row["is_latest"] is True and row["has_esg_reports"] is True
+    assert row["sustainability_score"] == 0.75 and row["page_size"] == 2048 and row["status_code"] == 200
+    assert row["keywords_found"] == 3
+    # Compacted lists report their uncapped length
+    assert row["esg_urls_discovered"] == 12
+    assert row["cascade_tier"] == "pattern" and row["reused_from_company_id"] == 3
+
+
+def test_flatten_tolerates_missing_and_malformed_fields():
+    row = flatten_analysis({"smm_company_id": 1}, {"analysis_timestamp": "yesterday",
+                                                   "website_analysis": {"status_code": "n/a"}}, is_latest=False)
+    assert row["crawler_version"] == "1.0"
+    assert row["analysis_timestamp"] is None and row["status_code"] is None
+    assert row["keywords_found"] is None and row["esg_urls_discovered"] is None
+    assert row["company_name"] is None and row["is_latest"] is False
+
+
+def test_flatten_converts_aware_timestamps_to_naive_local_time():
+    row = flatten_analysis(COMPANY, analysis(timestamp="2026-05-01T12:00:00+00:00"), is_latest=True)
+    expected = datetime.fromisoformat("2026-05-01T12:00:00+00:00").astimezone().replace(tzinfo=None)
+    assert row["analysis_timestamp"] == expected and row["analysis_timestamp"].tzinfo is None
+
+
+def test_unknown_export_format_is_rejected(crawler_factory):
+    with pytest.raises(ValueError, match="Unknown export format"):
+        asyncio.run(crawler_factory().export_analyses("unused", "csv"))
+
+
+def stored_companies():
+    return [
+        (1, "One", "https://one.example", [analysis("1.0", "2026-01-01T00:00:00", has_esg=False),
+                                           analysis("1.0", "2026-03-01T00:00:00"),
+                                           analysis("2.0", "2026-03-02T00:00:00")]),
+        (2, "Two", "https://two.example", [analysis("2.0", "2026-04-01T00:00:00", has_esg=False)]),
+        # Legacy single-object esg_info without a version
+        (3, "Three", "https://three.example", {"has_esg_reports": True, "analysis_timestamp": "2025-12-01T00:00:00"}),
+        (4, "Four", "https://four.example", None),
+    ]
+
+
+def read_jsonl(path):
+    with gzip.open(path, "rt", encoding="utf-8") as exported:
+        return [json.loads(line) for line in exported]
+
+
+def test_jsonl_export_partitions_rows_by_version(crawler_factory, database, tmp_path):
+    async def scenario():
+        async with database(stored_companies()) as pool:
+            crawler = crawler_factory()
+            crawler.db_pool = pool
+            # A chunk size of one flushes every row separately into the same file
+            return (await crawler.export_analyses(str(tmp_path / "all"), "jsonl", chunk_rows=1),
+                    await crawler.export_analyses(str(tmp_path / "latest"), "jsonl", latest_only=True))
+
+    exported, latest = asyncio.run(scenario())
+    assert (exported, latest) == (5, 4)
+
+    rows = {version: read_jsonl(tmp_path / "all" / f"crawler_version={version}" / "analyses.jsonl.gz")
+            for version in ("1.0", "2.0")}
+    assert sorted((row["smm_company_id"], row["has_esg_reports"], row["is_latest"]) for row in rows["1.0"]) == \
+        [(1, False, False), (1, True, True), (3, True, True)]
+    assert sorted((row["smm_company_id"], row["has_esg_reports"]) for row in rows["2.0"]) == [(1, True), (2, False)]
+    assert all(set(row) == {name for name, _ in EXPORT_COLUMNS} for version_rows in rows.values() for row in version_rows)
+    # Timestamps are written as text
+    assert {row["analysis_timestamp"] for row in rows["2.0"]} == {"2026-03-02 00:00:00", "2026-04-01 00:00:00"}
+
+    latest_rows = read_jsonl(tmp_path / "latest" / "crawler_version=1.0" / "analyses.jsonl.gz")
+    assert sorted(row["smm_company_id"] for row in latest_rows) == [1, 3]
+    assert all(row["is_latest"] for row in latest_rows)
+
+
+def test_parquet_export_uses_the_typed_schema(crawler_factory, database, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    async def scenario():
+        async with database(stored_companies()) as pool:
+            crawler = crawler_factory()
+            crawler.db_pool = pool
+            return await crawler.export_analyses(str(tmp_path), "parquet", chunk_rows=1)
+
+    assert asyncio.run(scenario()) == 5
+    table = pq.read_table(tmp_path / "crawler_version=1.0" / "analyses.parquet")
+    assert table.num_rows == 3
+    assert table.schema.names == [name for name, _ in EXPORT_COLUMNS]
+
+
+def test_export_reads_one_snapshot_while_analyses_are_written(crawler_factory, database, tmp_path):
+    companies = [(i, f"Company {i}", f"https://{i}.example", [analysis("1.0", "2026-01-01T00:00:00")])
+                 for i in range(1, 1201)]
+    
+    async def write_during_export(pool):
+        # Every company gets a newer analysis, one company is removed and new ones are added
+        async with pool.acquire() as conn:
+            await conn.execute("UPDATE smm_companies SET esg_info = esg_info || $1::jsonb",
+                               json.dumps([analysis("1.0", "2026-06-01T00:00:00", has_esg=False),
+                                           analysis("2.0", "2026-06-01T00:00:00")]))
+            await conn.execute("DELETE FROM smm_companies WHERE smm_company_id = 600")
+            await conn.executemany("INSERT INTO smm_companies (smm_company_id, name, primary_domain, esg_info) "
+                                   "VALUES ($1, $2, $3, $4)",
+                                   [(i, f"Company {i}", f"https://{i}.example",
+                                     json.dumps([analysis("2.0", "2026-06-01T00:00:00")])) for i in range(1201, 1211)])
+    
+    async def scenario():
+        async with database(companies) as pool:
+            crawler = crawler_factory()
+            crawler.db_pool = pool
+            cursor = crawler.queries.cursor
+            
+            async def cursor_with_writes(*args, **kwargs):
+                # The writes commit after the export has read its first company, before it fetches the rest
+                written = False
+                async for company in cursor(*args, **kwargs):
+                    yield company
+                    if not written:
+                        written = True
+                        await write_during_export(pool)
+            
+            crawler.queries.cursor = cursor_with_writes
+            during = await crawler.export_analyses(str(tmp_path / "during"), "jsonl", chunk_rows=100)
+            crawler.queries.cursor = cursor
+            after = await crawler.export_analyses(str(tmp_path / "after"), "jsonl")
+            return during, after
+    
+    during, after = asyncio.run(scenario())
+    
+    assert during == len(companies)
+    assert not (tmp_path / "during" / "crawler_version=2.0").exists()
+    rows = read_jsonl(tmp_path / "during" / "crawler_version=1.0" / "analyses.jsonl.gz")
+    # Exactly the companies and analyses as they were when the export started
+    assert sorted(row["smm_company_id"] for row in rows) == list(range(1, 1201))
+    assert {(row["analysis_timestamp"], row["has_esg_reports"], row["is_latest"]) for row in rows} == \
+        {("2026-01-01 00:00:00", True, True)}
+    
+    # The writes did land: 1199 companies with three analyses each, plus ten new ones
+    assert after == 1199 * 3 + 10
+    latest = [row for row in read_jsonl(tmp_path / "after" / "crawler_version=1.0" / "analyses.jsonl.gz")
+              if row["is_latest"]]
+    assert len(latest) == 1199 and {row["analysis_timestamp"] for row in latest} == {"2026-06-01 00:00:00"}
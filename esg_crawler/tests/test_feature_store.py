@@ -0,0 +1,51 @@
+"""Opt-in per-page feature store (esg_page_features) and --rescore"""
+
+import asyncio
+
+import esg_crawler
+from conftest import ESG_PAGE, PLAIN_PAGE, attach_pool, make_companies
+
+
+def test_feature_store_is_off_by_default():
+    assert esg_crawler.CrawlerConfig().store_features is False
+
+
+async def table_exists(pool, name):
+    async with pool.acquire() as conn:
+        return await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", name)
+
+
+def test_writes_do_not_create_the_feature_table_by_default(crawler_factory, database):
+    async def scenario():
+        async with database(make_companies(2)) as pool:
+            crawler = attach_pool(crawler_factory(version="2.0"), pool)
+            result, = crawler.analyze_html_batch([("https://example.com/1", ESG_PAGE)])
+            await crawler.update_company_esg_info_versions(1, {"2.0": result})
+            assert not await table_exists(pool, "esg_page_features")
+    
+    asyncio.run(scenario())
+
+
+def test_stored_features_are_rescored_without_fetching(crawler_factory, database, tmp_path):
+    async def scenario():
+        async with database(make_companies(2)) as pool:
+            crawler = attach_pool(crawler_factory(version="2.0", store_features=True), pool)
+            results = crawler.analyze_html_batch([("https://example.com/1", ESG_PAGE),
+                                                  ("https://example.com/2", PLAIN_PAGE)])
+            for company_id, result in enumerate(results, 1):
+                await crawler.update_company_esg_info_versions(company_id, {"2.0": result})
+            
+            async with pool.acquire() as conn:
+                rows = await conn.fetch("SELECT smm_company_id, features, has_esg_reports FROM esg_page_features ORDER BY 1")
+            assert [(row['smm_company_id'], row['has_esg_reports']) for row in rows] == [(1, True), (2, False)]
+            assert len(rows[0]['features']) == len(esg_crawler.SCORING_FEATURES)
+            
+            scoring = tmp_path / "scoring.json"
+            scoring.write_text('{"2.0": {"score_threshold": 100, "confidence_threshold": 2}}')
+            output = tmp_path / "rescored.csv"
+            return await crawler.rescore_stored_features(str(scoring), str(output)), output.read_text()
+    
+    summary, csv_text = asyncio.run(scenario())
+    # The ESG page keeps its positive only through its ESG links
+    assert summary == {"pages": 2, "stored_positive": 1, "rescored_positive": 1, "new_positive": 0, "new_negative": 0}
+    assert csv_text.splitlines()[0] == "smm_company_id,stored_has_esg,has_esg,sustainability_score,confidence_level"
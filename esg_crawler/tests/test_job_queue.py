@@ -0,0 +1,148 @@
+"""Postgres lease queue for elastic workers (esg_crawl_jobs, FOR UPDATE SKIP LOCKED)"""
+
+import asyncio
+import contextlib
+from collections import Counter
+
+from conftest import make_companies, worker_pool
+
+
+def test_enqueue_skips_companies_without_domain(crawler_factory, database):
+    async def scenario():
+        async with database(make_companies(20)) as pool:
+            crawler = crawler_factory()
+            crawler.db_pool = pool
+            await crawler.ensure_job_queue()
+            assert await crawler.enqueue_jobs() == 18
+            # Re-enqueueing does not duplicate jobs
+            assert await crawler.enqueue_jobs() == 0
+            assert await crawler.get_active_job_count() == 18
+    
+    asyncio.run(scenario())
+
+
+def test_concurrent_workers_claim_disjoint_batches(crawler_factory, database):
+    async def scenario():
+        async with database(make_companies(20)) as pool:
+            crawler = crawler_factory()
+            crawler.db_pool = pool
+            await crawler.ensure_job_queue()
+            await crawler.enqueue_jobs()
+            
+            batches = await asyncio.gather(*(crawler.claim_jobs(f"worker-{i}", 5, 60, 3) for i in range(4)))
+            claimed = [job['smm_company_id'] for batch in batches for job in batch]
+            assert len(claimed) == len(set(claimed)) == 18
+    
+    asyncio.run(scenario())
+
+
+def test_expired_leases_are_reclaimed_and_attempts_are_bounded(crawler_factory, database):
+    async def scenario():
+        async with database(make_companies(3)) as pool:
+            crawler = crawler_factory()
+            crawler.db_pool = pool
+            await crawler.ensure_job_queue()
+            await crawler.enqueue_jobs()
+            
+            first = await crawler.claim_jobs("worker-a", 10, 60, max_attempts=2)
+            assert [job['smm_company_id'] for job in first] == [1, 2, 3]
+            # Live leases are not handed out twice
+            assert await crawler.claim_jobs("worker-b", 10, 60, max_attempts=2) == []
+            
+            async with pool.acquire() as conn:
+                await conn.execute("UPDATE esg_crawl_jobs SET lease_expires_at = NOW() - INTERVAL '1 second'")
+            second = await crawler.claim_jobs("worker-b", 10, 60, max_attempts=2)
+            assert [job['smm_company_id'] for job in second] == [1, 2, 3]
+            
+            await crawler.complete_job("worker-b", 1)
+            # The old lease holder can no longer touch the jobs
+            await crawler.release_jobs("worker-a", [2, 3], max_attempts=2, error="stale")
+            await crawler.release_jobs("worker-b", [2, 3], max_attempts=2, error="boom")
+            
+            async with pool.acquire() as conn:
+                rows = await conn.fetch("SELECT smm_company_id, status, last_error FROM esg_crawl_jobs ORDER BY 1")
+            assert [(row['smm_company_id'], row['status'], row['last_error']) for row in rows] == [
+                (1, 'done', None), (2, 'failed', 'boom'), (3, 'failed', 'boom')
+            ]
+            assert await crawler.get_active_job_count() == 0
+            # Every queue statement is a named, timed statement
+            assert {"reap_expired_jobs", "claim_jobs", "complete_job", "release_jobs",
+                    "count_active_jobs"} <= set(crawler.queries.summary())
+    
+    asyncio.run(scenario())
+
+
+def test_forced_enqueue_requeues_finished_jobs_only(crawler_factory, database):
+    async def scenario():
+        companies = [(i, f"Company {i}", f"https://example.com/{i}", [{"crawler_version": "1.0"}] if i < 3 else None)
+                     for i in range(1, 5)]
+        async with database(companies) as pool:
+            crawler = crawler_factory()
+            crawler.db_pool = pool
+            await crawler.ensure_job_queue()
+            # Companies 1 and 2 already have version 1.0
+            assert await crawler.enqueue_jobs() == 2
+            [job] = await crawler.claim_jobs("worker-a", 1, 60, 3)
+            await crawler.complete_job("worker-a", job['smm_company_id'])
+            # Forcing adds the analyzed companies and re-queues the finished job; the pending one is left alone
+            assert await crawler.enqueue_jobs(force_reanalysis=True) == 3
+            rows = await pool.fetch("SELECT smm_company_id, status FROM esg_crawl_jobs ORDER BY 1")
+            return [(row['smm_company_id'], row['status']) for row in rows]
+    
+    assert asyncio.run(scenario()) == [(1, 'pending'), (2, 'pending'), (3, 'pending'), (4, 'pending')]
+
+
+def test_workers_with_their_own_connections_drain_the_queue_without_overlap(crawler_factory, database):
+    workers, limit, max_attempts = 8, 7, 3
+    
+    async def scenario():
+        async with database(make_companies(200)) as pool, contextlib.AsyncExitStack() as stack:
+            crawlers = []
+            for _ in range(workers):
+                crawler = crawler_factory()
+                crawler.db_pool = await stack.enter_async_context(worker_pool(pool))
+                crawlers.append(crawler)
+            await crawlers[0].ensure_job_queue()
+            queued = await crawlers[0].enqueue_jobs()
+            
+            # All workers claim at once: SKIP LOCKED hands each a full, disjoint batch
+            first = await asyncio.gather(*(crawler.claim_jobs(f"worker-{i}", limit, 60, max_attempts)
+                                           for i, crawler in enumerate(crawlers)))
+            assert [len(batch) for batch in first] == [limit] * workers
+            
+            held = {}
+            claims = Counter()
+            released = set()
+            
+            async def work(i, crawler, batch):
+                worker_id = f"worker-{i}"
+                while batch:
+                    ids = [job['smm_company_id'] for job in batch]
+                    assert not held.keys() & set(ids), "a job was leased to two workers"
+                    held.update((company_id, worker_id) for company_id in ids)
+                    claims.update(ids)
+                    await asyncio.sleep(0)
+                    # Every fifth company fails its first attempt and goes back to the queue
+                    retry = [company_id for company_id in ids if company_id % 5 == 0 and company_id not in released]
+                    for company_id in ids:
+                        del held[company_id]
+                        if company_id not in retry:
+                            await crawler.complete_job(worker_id, company_id)
+                    released.update(retry)
+                    await crawler.release_jobs(worker_id, retry, max_attempts, error="retry")
+                    batch = await crawler.claim_jobs(worker_id, limit, 60, max_attempts)
+            
+            await asyncio.gather(*(work(i, crawler, batch) for i, (crawler, batch) in enumerate(zip(crawlers, first))))
+            rows = await pool.fetch("SELECT smm_company_id, status, attempts, leased_by FROM esg_crawl_jobs")
+            return queued, claims, released, rows, await crawlers[0].get_active_job_count()
+    
+    queued, claims, released, rows, active = asyncio.run(scenario())
+    
+    with_domain = {company_id for company_id, _, domain, _ in make_companies(200) if domain}
+    assert queued == len(rows) == len(with_domain)
+    assert released == {company_id for company_id in with_domain if company_id % 5 == 0}
+    # Each job was claimed once, plus once more after its release
+    assert claims == {company_id: 2 if company_id in released else 1 for company_id in with_domain}
+    assert {row['smm_company_id']: row['attempts'] for row in rows} == claims
+    assert {(row['status'], row['leased_by']) for row in rows} == {('done', None)}
+    assert active == 0
@@ -0,0 +1,52 @@
+"""Event-loop lag heartbeat and stall attribution"""
+
+import asyncio
+import contextlib
+import time
+
+from esg_crawler import LoopLagMonitor
+
+
+def test_stall_is_attributed_to_the_longest_section():
+    async def scenario():
+        monitor = LoopLagMonitor(interval=0.01, threshold=0.1)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        with monitor.section("detect v4.0", "https://slow.example"):
+            time.sleep(0.25)
+        with monitor.section("parse", "https://fast.example"):
+            pass
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor.summary()
+
+    summary = asyncio.run(scenario())
+    assert summary["stalls"] >= 1
+    assert summary["samples"] >= 3
+    assert summary["max_ms"] >= 150
+    worst = summary["worst"][0]
+    assert (worst["stage"], worst["company"]) == ("detect v4.0", "https://slow.example")
+    assert worst["section_ms"] >= 250
+
+
+def test_stall_without_sections_is_unattributed_and_events_are_bounded():
+    async def scenario():
+        monitor = LoopLagMonitor(interval=0.01, threshold=0.05, max_events=2)
+        monitor.start()
+        for _ in range(3):
+            await asyncio.sleep(0.03)
+            time.sleep(0.1)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(scenario())
+    assert monitor.stalls >= 3
+    assert len(monitor.events) == 2
+    assert {event[1] for event in monitor.events} == {"unattributed"}
+
+
+def test_empty_summary_and_disabled_sections(crawler_factory):
+    assert LoopLagMonitor().summary() == {"samples": 0, "stalls": 0, "worst": []}
+    assert isinstance(crawler_factory()._loop_section("parse"), contextlib.nullcontext)
+    assert crawler_factory(loop_monitor=True)._loop_monitor is not None
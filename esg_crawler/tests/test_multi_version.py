@@ -0,0 +1,68 @@
+"""Several detector versions evaluated over a single fetch of each site"""
+
+import asyncio
+import json
+
+from conftest import ESG_PAGE
+
+
+def test_versions_share_one_fetch(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({"/": ESG_PAGE}) as site:
+            crawler = crawler_factory(versions=["1.0", "2.0", "3.0"], request_delay=0)
+            results = await crawler.analyze_company_website_versions(site.url("/"), crawler.versions)
+            assert site.hits["/"] == 1
+            return results
+    
+    results = asyncio.run(scenario())
+    assert list(results) == ["1.0", "2.0", "3.0"]
+    assert all(result.has_esg_reports for result in results.values())
+    # Every version gets its own evidence and timestamp of the shared fetch
+    assert len({result.collection_timestamp for result in results.values()}) == 1
+    assert results["3.0"].crawling_evidence["detection_method"] != results["1.0"].crawling_evidence.get("detection_method")
+
+
+def test_one_entry_is_stored_per_version(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({"/": ESG_PAGE}) as site:
+            crawler = crawler_factory(versions=["1.0", "3.0"], request_delay=0)
+            results = await crawler.analyze_company_website_versions(site.url("/"), crawler.versions)
+            return crawler._analysis_entries(results)
+    
+    entries = asyncio.run(scenario())
+    assert [entry["crawler_version"] for entry in entries] == ["1.0", "3.0"]
+
+
+def test_only_missing_versions_are_analyzed_and_stored_together(crawler_factory, database, local_site):
+    async def scenario():
+        async with local_site({"/": ESG_PAGE}) as site:
+            async with database([(1, "Company 1", site.url("/"), [{"crawler_version": "1.0"}])]) as pool:
+                crawler = crawler_factory(versions=["1.0", "3.0"], request_delay=0)
+                crawler.db_pool = pool
+                stored = []
+                for force in (False, False, True):
+                    company = dict(await pool.fetchrow("SELECT smm_company_id, name, primary_domain AS website, "
+                                                       "esg_info FROM smm_companies"))
+                    results = await crawler._analyze_and_store_company(company, force_reanalysis=force)
+                    esg_info = json.loads(await pool.fetchval("SELECT esg_info FROM smm_companies"))
+                    stored.append((list(results), [entry["crawler_version"] for entry in esg_info]))
+                return stored, site.hits["/"]
+    
+    stored, hits = asyncio.run(scenario())
+    assert stored == [
+        (["3.0"], ["1.0", "3.0"]),
+        # Every version is present, so the company is skipped
+        ([], ["1.0", "3.0"]),
+        (["1.0", "3.0"], ["1.0", "3.0", "1.0", "3.0"]),
+    ]
+    assert hits == 2
+
+
+def test_versions_to_run_skips_analyzed_versions(crawler_factory):
+    crawler = crawler_factory(versions=["1.0", "3.0"])
+    company = {"smm_company_id": 1, "esg_info": [{"crawler_version": "1.0"}]}
+    assert crawler._versions_to_run(company) == ["3.0"]
+    assert crawler._versions_to_run(company, force_reanalysis=True) == ["1.0", "3.0"]
+    assert crawler._versions_to_run(dict(company, esg_info=[{"crawler_version": "1.0"}, {"crawler_version": "3.0"}])) == []
+    # Legacy rows store a single object instead of a list
+    assert crawler._versions_to_run(dict(company, esg_info={"crawler_version": "3.0"})) == ["1.0"]
@@ -0,0 +1,67 @@
+"""Single-traversal navigation analysis agrees with the original find_all based checks"""
+
+import re
+
+import pytest
+from bs4 import BeautifulSoup
+
+from conftest import ESG_PAGE, PLAIN_PAGE
+
+PAGES = [
+    ESG_PAGE,
+    PLAIN_PAGE,
+    "<html><body><p>No navigation at all</p></body></html>",
+    '<div id="main-nav"><a>Home</a></div>',
+    '<ul class="MainMenu"><li>Products</li></ul>',
+    # Nested nav/menu containers: text must be taken from the outermost one only
+    '<div class="menu"><ul class="nav-list"><li><div class="submenu">ESG Governance</div></li></ul>'
+    '<span>Sustainability</span></div><div class="footer-nav">CSR</div>',
+    '<header><div class="nav"><div class="menu">Environmental</div></div></header>',
+]
+
+ESG_NAV_KEYWORDS = ['sustainability', 'esg', 'csr', 'responsibility', 'environmental', 'governance']
+
+
+def reference_has_navigation(soup):
+    indicators = [
+        soup.find('nav'),
+        soup.find(class_=re.compile(r'nav', re.I)),
+        soup.find(id=re.compile(r'nav', re.I)),
+        soup.find('ul', class_=re.compile(r'menu', re.I)),
+    ]
+    return any(indicator is not None for indicator in indicators)
+
+
+def reference_keywords(soup):
+    found = set()
+    for nav in soup.find_all(['nav', 'ul', 'div'], class_=re.compile(r'nav|menu', re.I)):
+        text = nav.get_text().lower()
+        found.update(keyword for keyword in ESG_NAV_KEYWORDS if keyword in text)
+    return found
+
+
+@pytest.mark.parametrize("html", PAGES)
+def test_matches_reference_implementation(crawler_factory, html):
+    soup = BeautifulSoup(html, "html.parser")
+    features = crawler_factory()._extract_navigation_features(soup)
+    
+    assert features["has_navigation"] == reference_has_navigation(soup)
+    found = {keyword for container in features["containers"] for keyword in ESG_NAV_KEYWORDS
+             if keyword in container["text"]}
+    assert found == reference_keywords(soup)
+
+
+def test_nested_containers_are_read_once(crawler_factory):
+    soup = BeautifulSoup(PAGES[5], "html.parser")
+    containers = crawler_factory()._extract_navigation_features(soup)["containers"]
+    assert [(container["element_type"], container["element_class"]) for container in containers] == [
+        ("div", ["menu"]), ("div", ["footer-nav"])
+    ]
+
+
+def test_features_are_cached_per_page(crawler_factory):
+    crawler = crawler_factory()
+    soup = BeautifulSoup(ESG_PAGE, "html.parser")
+    assert crawler._extract_navigation_features(soup) is crawler._extract_navigation_features(soup)
+    other = BeautifulSoup(PLAIN_PAGE, "html.parser")
+    assert crawler._extract_navigation_features(other) is not crawler._extract_navigation_features(soup)
@@ -0,0 +1,117 @@
+"""Near-duplicate pages: simhash fingerprints and reuse of another company's analysis"""
+
+import asyncio
+
+import pytest
+
+import esg_crawler
+from conftest import ESG_PAGE
+
+PARKED_PAGE = """<html><head><title>{domain} is for sale</title><script>var tracking = "{domain}";</script></head>
+<body><h1>{domain}</h1><p>This domain may be for sale. Buy this domain today through our secure marketplace
+and start building your online presence with a memorable name. Our brokers handle the transfer, escrow and
+payment so you can focus on your business. Financing is available for qualified buyers with flexible monthly
+installments. Make an offer now or contact our sales team, available around the clock, for a quote on this
+premium domain and similar names in our portfolio of thousands of domains.</p></body></html>"""
+
+
+def test_short_pages_are_not_fingerprinted():
+    assert esg_crawler.page_simhash(ESG_PAGE) is None
+    assert esg_crawler.page_simhash("<html><body><script>" + "x = 1; " * 200 + "</script></body></html>") is None
+
+
+def test_fingerprint_ignores_markup_and_tolerates_small_edits():
+    page = PARKED_PAGE.format(domain="example.com")
+    fingerprint = esg_crawler.page_simhash(page)
+    assert fingerprint is not None
+    # Invisible markup does not count
+    assert esg_crawler.page_simhash(page.replace('var tracking', 'var analytics')) == fingerprint
+    assert esg_crawler.page_simhash(PARKED_PAGE.format(domain="example.org")) is not None
+    assert esg_crawler.simhash_distance(fingerprint, esg_crawler.page_simhash(page.replace("today", "now"))) <= 3
+    unrelated = "<p>" + " ".join(f"word{i}" for i in range(80)) + "</p>"
+    assert esg_crawler.simhash_distance(fingerprint, esg_crawler.page_simhash(unrelated)) > 3
+
+
+def test_index_finds_accepted_near_duplicates_and_evicts_oldest():
+    index = esg_crawler.SimhashIndex(max_entries=2)
+    index.add(0b1011, "first")
+    assert index.find(0b1010) == ("first", 1)
+    assert index.find(0b1010, accept=lambda value: value != "first") is None
+    assert index.find(0b1011 ^ 0b11110000) is None
+
+    index.add(1 << 40, "second")
+    index.add(1 << 50, "third")
+    assert len(index) == 2
+    assert index.find(0b1011) is None
+
+
+def _company_pages():
+    return {path: PARKED_PAGE.format(domain="parked.example") for path in ("/a", "/b", "/c")}
+
+
+@pytest.mark.parametrize("dedupe_pages", [False, True])
+def test_another_companys_analysis_is_reused_only_with_dedupe(crawler_factory, local_site, dedupe_pages):
+    async def scenario():
+        async with local_site(_company_pages()) as site:
+            crawler = crawler_factory(request_delay=0, dedupe_pages=dedupe_pages)
+            first = await crawler.analyze_company_website_versions(site.url("/a"), ["1.0"], company_id=1)
+            second = await crawler.analyze_company_website_versions(site.url("/b"), ["1.0"], company_id=2)
+            return first["1.0"], second["1.0"]
+
+    first, second = asyncio.run(scenario())
+    reused_from = second.crawling_evidence.get("reused_from")
+    if dedupe_pages:
+        assert first.website_analysis["content_fingerprint"] == second.website_analysis["content_fingerprint"]
+        assert reused_from["smm_company_id"] == 1
+        assert second.website_analysis["base_url"].endswith("/b")
+    else:
+        assert first.website_analysis["content_fingerprint"] is None
+        assert reused_from is None
+
+
+@pytest.mark.parametrize("config, fingerprinted", [({}, False), ({"store_fingerprints": True}, True),
+                                                   ({"dedupe_pages": True, "dedupe_store": True}, True)])
+def test_pages_are_only_fingerprinted_when_needed(crawler_factory, local_site, monkeypatch, config, fingerprinted):
+    calls = []
+    simhash = esg_crawler.page_simhash
+    monkeypatch.setattr(esg_crawler, "page_simhash", lambda html: calls.append(html) or simhash(html))
+
+    async def scenario():
+        async with local_site(_company_pages()) as site:
+            crawler = crawler_factory(request_delay=0, **config)
+            first = await crawler.analyze_company_website_versions(site.url("/a"), ["1.0"], company_id=1)
+            second = await crawler.analyze_company_website_versions(site.url("/b"), ["1.0"], company_id=2)
+            return first["1.0"], second["1.0"]
+
+    first, second = asyncio.run(scenario())
+    assert len(calls) == (2 if fingerprinted else 0)
+    assert (first.website_analysis["content_fingerprint"] is not None) == fingerprinted
+    # Storing fingerprints alone never reuses another company's analysis
+    assert ("reused_from" in second.crawling_evidence) == bool(config.get("dedupe_pages"))
+
+
+def test_same_company_and_forced_analyses_are_not_reused(crawler_factory, local_site):
+    async def scenario():
+        async with local_site(_company_pages()) as site:
+            crawler = crawler_factory(request_delay=0, dedupe_pages=True)
+            await crawler.analyze_company_website_versions(site.url("/a"), ["1.0"], company_id=1)
+            same_company = await crawler.analyze_company_website_versions(site.url("/b"), ["1.0"], company_id=1)
+            forced = await crawler.analyze_company_website_versions(site.url("/c"), ["1.0"], company_id=2,
+                                                                    reuse_stored=False)
+            return same_company["1.0"], forced["1.0"]
+
+    same_company, forced = asyncio.run(scenario())
+    assert "reused_from" not in same_company.crawling_evidence
+    assert "reused_from" not in forced.crawling_evidence
+
+
+def test_reused_results_drop_the_source_companys_documents(crawler_factory):
+    crawler = crawler_factory()
+    source = {"website_analysis": {"base_url": "https://a.example"}, "has_esg_reports": False,
+              "crawling_evidence": {"document_analysis": [{"url": "https://a.example/report.pdf"}]}}
+    website_analysis = esg_crawler.WebsiteAnalysis(base_url="https://b.example", is_accessible=True)
+    results = crawler._reuse_results("https://b.example", "2026-01-01T00:00:00", website_analysis, ["1.0"],
+                                     {"smm_company_id": 1, "company_website": "https://a.example",
+                                      "hamming_distance": 0}, {"1.0": source})
+    assert "document_analysis" not in results["1.0"].crawling_evidence
+    assert results["1.0"].website_analysis["base_url"] == "https://b.example"
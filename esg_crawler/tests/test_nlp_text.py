@@ -0,0 +1,51 @@
+"""Boilerplate stripping and region-limited text for the v4 NLP stage"""
+
+from bs4 import BeautifulSoup
+
+PAGE = """<html><head><title>Sustainability</title><style>.x{}</style></head><body>
+<header>Sustainability menu</header>
+<nav>Sustainability | ESG | Careers</nav>
+<div class="cookie-banner">We use cookies for a sustainable experience.</div>
+<script>var sustainability = 1;</script>
+<main>
+  <h1>Our approach</h1>
+  <p>The company was founded in 1950. It has offices in Berlin. Our sustainability strategy guides the business.
+  We measure progress every year. Dividends were paid in March. Revenue grew.</p>
+  <p>The company was founded in 1950. It has offices in Berlin. Our sustainability strategy guides the business.
+  We measure progress every year. Dividends were paid in March. Revenue grew.</p>
+  <p>Products ship worldwide. Climate risks are reviewed by the board.</p>
+</main>
+<footer>Sustainability policy | Imprint</footer>
+</body></html>"""
+
+
+def test_boilerplate_subtrees_are_skipped(crawler_factory):
+    soup = BeautifulSoup(PAGE, "html.parser")
+    blocks = crawler_factory()._extract_content_blocks(soup)
+    
+    text = " ".join(blocks)
+    for boilerplate in ("menu", "Careers", "cookies", "var sustainability", "Imprint", ".x{}"):
+        assert boilerplate not in text
+    assert blocks[0] == "Our approach"
+    # The soup itself is left intact for later detectors
+    assert soup.find("nav") is not None and soup.find("script") is not None
+
+
+def test_only_sentences_near_esg_keywords_are_kept_once(crawler_factory):
+    prepared = crawler_factory(nlp_context_sentences=1)._prepare_nlp_text(BeautifulSoup(PAGE, "html.parser"))
+    
+    assert prepared["text"] == (
+        "It has offices in Berlin. Our sustainability strategy guides the business. We measure progress every year. "
+        "Products ship worldwide. Climate risks are reviewed by the board."
+    )
+    assert prepared["stats"]["unique_blocks"] == prepared["stats"]["content_blocks"] - 1
+    assert prepared["stats"]["token_budget_exhausted"] is False
+
+
+def test_token_budget_limits_the_text(crawler_factory):
+    prepared = crawler_factory(nlp_context_sentences=0, nlp_token_budget=6)._prepare_nlp_text(
+        BeautifulSoup(PAGE, "html.parser")
+    )
+    assert prepared["text"] == "Our sustainability strategy guides the business."
+    assert prepared["stats"]["selected_tokens"] == 6
+    assert prepared["stats"]["token_budget_exhausted"] is True
@@ -0,0 +1,34 @@
+"""Staged pipeline mode: companies sharing a website share one analysis"""
+
+import asyncio
+import json
+
+from conftest import ESG_PAGE, PLAIN_PAGE, attach_pool
+
+
+def test_duplicate_websites_share_one_fetch_without_deadlocking(crawler_factory, database, local_site):
+    async def scenario():
+        async with local_site({"/": ESG_PAGE, "/other": PLAIN_PAGE}) as site:
+            companies = [(i, f"Company {i}", site.url("/"), None) for i in range(1, 9)]
+            companies.append((9, "Company 9", site.url("/other"), None))
+            async with database(companies) as pool:
+                # Tiny inboxes: duplicates waiting downstream of their owner would stall the pipeline
+                crawler = attach_pool(crawler_factory(request_delay=0, pipeline_fetch_workers=4,
+                                                      pipeline_sink_workers=1, pipeline_queue_size=1), pool)
+                fetch_website = crawler._fetch_website
+
+                async def slow_fetch(website):
+                    await asyncio.sleep(0.2)
+                    return await fetch_website(website)
+
+                crawler._fetch_website = slow_fetch
+                await asyncio.wait_for(crawler.process_companies_pipeline(batch_size=4), timeout=30)
+                rows = await pool.fetch("SELECT smm_company_id, esg_info FROM smm_companies ORDER BY smm_company_id")
+                return dict(site.hits), crawler._url_flights, rows
+
+    hits, flights, rows = asyncio.run(scenario())
+    assert hits == {"/": 1, "/other": 1}
+    assert flights == {}
+    analyses = {row["smm_company_id"]: json.loads(row["esg_info"]) for row in rows}
+    assert all(len(entries) == 1 for entries in analyses.values())
+    assert [analyses[i][0]["has_esg_reports"] for i in range(1, 10)] == [True] * 8 + [False]
@@ -0,0 +1,85 @@
+"""Budgeted re-crawl planning from analysis history"""
+
+import asyncio
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+NOW = datetime(2026, 6, 1)
+
+
+def analysis(days_ago, has_esg=False, version="1.0", accessible=True, fingerprint=None, etag=None):
+    return {
+        "crawler_version": version,
+        "analysis_timestamp": (NOW - timedelta(days=days_ago)).isoformat(),
+        "has_esg_reports": has_esg,
+        "website_analysis": {"is_accessible": accessible, "content_fingerprint": fingerprint, "etag": etag},
+    }
+
+
+def test_missing_versions_come_first(crawler_factory):
+    crawler = crawler_factory(versions=["1.0", "3.0"])
+    assert crawler._recrawl_priority(None, NOW, 7) == (1.0, {"reason": "missing version", "age_days": None})
+    assert crawler._recrawl_priority([analysis(1)], NOW, 7)[0] == 1.0
+    # Other versions and unparseable entries do not count
+    assert crawler._recrawl_priority('[{"crawler_version": "3.0"}]', NOW, 7)[0] == 1.0
+    assert crawler._recrawl_priority("not json", NOW, 7)[0] == 1.0
+
+
+def test_recent_analyses_are_not_planned(crawler_factory):
+    assert crawler_factory()._recrawl_priority([analysis(3)], NOW, 7) is None
+
+
+def test_priority_grows_with_age_and_observed_changes(crawler_factory):
+    crawler = crawler_factory()
+    young, _ = crawler._recrawl_priority([analysis(10)], NOW, 7)
+    old, details = crawler._recrawl_priority([analysis(100)], NOW, 7)
+    assert 0 < young < old < 1
+    assert details == {"reason": "negative", "age_days": 100.0, "changes": 0,
+                       "change_probability": pytest.approx(1 - math.exp(-100 / 180), abs=1e-3)}
+
+    stable = [analysis(d, fingerprint="aa", etag='"1"') for d in (200, 150, 100, 50)]
+    changing = [analysis(d, fingerprint=f"{d:x}", etag=f'"{d}"') for d in (200, 150, 100, 50)]
+    stable_priority, _ = crawler._recrawl_priority(stable, NOW, 7)
+    changing_priority, changing_details = crawler._recrawl_priority(changing, NOW, 7)
+    assert changing_details["changes"] == 3
+    assert changing_priority > stable_priority
+
+
+def test_last_answer_weights_the_priority(crawler_factory):
+    crawler = crawler_factory()
+    priorities = {
+        reason: crawler._recrawl_priority([entry], NOW, 7)
+        for reason, entry in (("negative", analysis(60)), ("positive", analysis(60, has_esg=True)),
+                              ("error", analysis(60, accessible=False)))
+    }
+    assert {reason: details["reason"] for reason, (_, details) in priorities.items()} == \
+        {"negative": "negative", "positive": "positive", "error": "error"}
+    assert priorities["negative"][0] > priorities["error"][0] > priorities["positive"][0]
+
+
+def test_plan_keeps_the_budget_highest_priorities(crawler_factory, database):
+    now = datetime.now()
+
+    def stored(days_ago, has_esg=False):
+        return [dict(analysis(0, has_esg), analysis_timestamp=(now - timedelta(days=days_ago)).isoformat())]
+
+    companies = [
+        (1, "Recent", "https://one.example", stored(1)),
+        (2, "Old negative", "https://two.example", stored(300)),
+        (3, "Old positive", "https://three.example", stored(300, has_esg=True)),
+        (4, "Never analyzed", "https://four.example", None),
+        (5, "No website", None, None),
+        (6, "Older negative", "https://six.example", stored(400)),
+    ]
+
+    async def scenario():
+        async with database(companies) as pool:
+            crawler = crawler_factory()
+            crawler.db_pool = pool
+            return await crawler.plan_recrawl(budget=3, min_age_days=7)
+
+    plan = asyncio.run(scenario())
+    assert [company["smm_company_id"] for _, company, _ in plan] == [4, 6, 2]
+    assert [priority for priority, _, _ in plan] == sorted((priority for priority, _, _ in plan), reverse=True)
@@ -0,0 +1,88 @@
+"""Service mode (--serve): forced requests always analyze a fresh fetch"""
+
+import asyncio
+import contextlib
+import socket
+
+import aiohttp
+
+from conftest import ESG_PAGE, PLAIN_PAGE, attach_pool
+
+
+@contextlib.asynccontextmanager
+async def serving(crawler):
+    """Run crawler.serve() on a free local port; yields the service's base URL"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    service = asyncio.ensure_future(crawler.serve("127.0.0.1", port))
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with aiohttp.ClientSession() as session:
+            for _ in range(100):
+                try:
+                    async with session.get(f"{base_url}/health"):
+                        break
+                except aiohttp.ClientConnectionError:
+                    await asyncio.sleep(0.05)
+        yield base_url
+    finally:
+        service.cancel()
+        await asyncio.gather(service, return_exceptions=True)
+
+
+def test_forced_requests_fetch_every_time(crawler_factory, database, local_site):
+    async def scenario():
+        async with local_site({"/": PLAIN_PAGE}) as site:
+            async with database([(1, "Company 1", site.url("/"), None)]) as pool:
+                crawler = attach_pool(crawler_factory(request_delay=0, dedupe_pages=True), pool)
+                async with serving(crawler) as base_url, aiohttp.ClientSession() as session:
+                    payloads = []
+                    for page in (PLAIN_PAGE, ESG_PAGE):
+                        site.pages["/"] = page
+                        async with session.post(f"{base_url}/analyze", json={"company_id": 1, "force": True}) as response:
+                            assert response.status == 200
+                            payloads.append(await response.json())
+                    return site.hits["/"], payloads
+
+    hits, payloads = asyncio.run(scenario())
+    assert hits == 2
+    assert [payload["results"]["1.0"]["has_esg_reports"] for payload in payloads] == [False, True]
+
+
+def test_unforced_request_is_skipped_when_analyzed(crawler_factory, database, local_site):
+    async def scenario():
+        async with local_site({"/": PLAIN_PAGE}) as site:
+            async with database([(1, "Company 1", site.url("/"), None), (2, "Company 2", None, None)]) as pool:
+                crawler = attach_pool(crawler_factory(request_delay=0), pool)
+                async with serving(crawler) as base_url, aiohttp.ClientSession() as session:
+                    statuses = []
+                    for body in ({"company_id": 1, "force": False}, {"company_id": 1, "force": False},
+                                 {"company_id": 2}, {"company_id": 3}):
+                        async with session.post(f"{base_url}/analyze", json=body) as response:
+                            statuses.append((response.status, (await response.json())["status"]))
+                    return site.hits["/"], statuses
+
+    hits, statuses = asyncio.run(scenario())
+    assert hits == 1
+    assert statuses == [(200, "analyzed"), (200, "skipped"), (400, "invalid"), (404, "not_found")]
+
+
+def test_requests_do_not_share_completed_analyses(crawler_factory, database, local_site):
+    async def scenario():
+        async with local_site({"/": PLAIN_PAGE}) as site:
+            companies = [(i, f"Company {i}", site.url("/"), None) for i in (1, 2)]
+            async with database(companies) as pool:
+                crawler = attach_pool(crawler_factory(request_delay=0), pool)
+                async with serving(crawler) as base_url, aiohttp.ClientSession() as session:
+                    found = []
+                    for company_id, page in ((1, PLAIN_PAGE), (2, ESG_PAGE)):
+                        site.pages["/"] = page
+                        async with session.post(f"{base_url}/analyze", json={"company_id": company_id}) as response:
+                            found.append((await response.json())["results"]["1.0"]["has_esg_reports"])
+                    return site.hits["/"], found
+
+    hits, found = asyncio.run(scenario())
+    # The second company shares the website but is answered from its own fetch
+    assert hits == 2
+    assert found == [False, True]
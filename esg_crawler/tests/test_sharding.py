@@ -0,0 +1,116 @@
+"""Deterministic partitioning of companies across crawler processes (--shard K/N)"""
+
+import argparse
+import asyncio
+import gzip
+import json
+from collections import Counter
+
+import pytest
+
+import esg_crawler
+from esg_crawler import company_shard, parse_shard
+
+
+def test_parse_shard_is_one_based_on_the_command_line():
+    assert parse_shard("1/4") == (0, 4)
+    assert parse_shard("4/4") == (3, 4)
+
+
+@pytest.mark.parametrize("value", ["0/4", "5/4", "1/0", "a/b", "1", "1/2/3"])
+def test_parse_shard_rejects_invalid_specs(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_shard(value)
+
+
+def test_every_company_belongs_to_exactly_one_shard():
+    company_ids = range(1, 20001)
+    for shard_count in (1, 2, 3, 8):
+        shards = [company_shard(company_id, shard_count) for company_id in company_ids]
+        assert all(0 <= shard < shard_count for shard in shards)
+        # The hash spreads sequential ids evenly
+        counts = Counter(shards)
+        assert max(counts.values()) - min(counts.values()) < len(company_ids) / shard_count * 0.1
+
+
+BOUNDARY_IDS = [0, 1, 7, 65535, 65536, 2**31 - 1, 2**31, 2**32 - 1, 2**32, 3474613459, 3474613460,
+                2**48 + 12345, 2**63 - 1, -1, -65536, -2**31, -2**63]
+
+
+def test_shard_is_stable_across_calls_and_matches_the_hash_definition():
+    # High 16 bits of the low 32 bits of id * multiplier, with two's complement bits for negative ids
+    for company_id in BOUNDARY_IDS:
+        hashed = (company_id * esg_crawler.SHARD_HASH_MULTIPLIER) % 2**32 // 65536
+        assert company_shard(company_id, 5) == hashed % 5 == company_shard(company_id, 5)
+
+
+def test_shard_query_arguments(crawler_factory):
+    assert crawler_factory()._shard_args() == (1, 0)
+    assert crawler_factory(shard=(2, 4))._shard_args() == (4, 2)
+
+
+def test_sharded_statements_are_prepared_once_with_parameters():
+    # Shard, version and version-key values are bound as parameters, never pasted into the SQL
+    for name in ("select_recrawl_candidates", "select_export_companies", "select_history_batch",
+                 "select_page_features", "enqueue_jobs"):
+        assert "% $1::int = $2::int" in esg_crawler.SHARDED_CRAWLER_QUERIES[name]
+        # Unsharded runs only compare the parameters, without hashing every row
+        assert "$1::int = 1 AND $2::int = 0" in esg_crawler.CRAWLER_QUERIES[name]
+        assert str(esg_crawler.SHARD_HASH_MULTIPLIER) not in esg_crawler.CRAWLER_QUERIES[name]
+    assert "$5::text" in esg_crawler.CRAWLER_QUERIES["enqueue_jobs"]
+
+
+def test_crawlers_pick_the_statement_variant_of_their_shard(crawler_factory):
+    assert crawler_factory().queries.statements is esg_crawler.CRAWLER_QUERIES
+    assert crawler_factory(shard=(0, 2)).queries.statements is esg_crawler.SHARDED_CRAWLER_QUERIES
+
+
+def test_sql_shards_match_company_shard_at_id_boundaries(crawler_factory, database):
+    companies = [(company_id, f"Company {company_id}", f"https://example.com/{company_id}", None)
+                 for company_id in BOUNDARY_IDS]
+
+    async def scenario():
+        async with database(companies) as pool:
+            selected = {}
+            for shard_count in (2, 3, 7):
+                for index in range(shard_count):
+                    crawler = crawler_factory(shard=(index, shard_count))
+                    crawler.db_pool = pool
+                    rows = await crawler.get_companies_by_ids(BOUNDARY_IDS)
+                    selected[shard_count, index] = sorted(row["smm_company_id"] for row in rows)
+            unsharded = crawler_factory()
+            unsharded.db_pool = pool
+            return selected, len(await unsharded.get_companies_by_ids(BOUNDARY_IDS))
+
+    selected, unsharded = asyncio.run(scenario())
+    assert unsharded == len(BOUNDARY_IDS)
+    for (shard_count, index), ids in selected.items():
+        assert ids == sorted(i for i in BOUNDARY_IDS if company_shard(i, shard_count) == index)
+
+
+def test_sharded_crawlers_enqueue_plan_and_export_disjoint_companies(crawler_factory, database, tmp_path):
+    companies = [(i, f"Company {i}", None if i % 7 == 0 else f"https://example.com/{i}",
+                  [{"crawler_version": "1.0", "has_esg_reports": False}]) for i in range(1, 41)]
+
+    async def scenario():
+        async with database(companies) as pool:
+            per_shard = []
+            for index in range(3):
+                crawler = crawler_factory(shard=(index, 3), versions=["1.0", "2.0"])
+                crawler.db_pool = pool
+                await crawler.ensure_job_queue()
+                queued = await crawler.enqueue_jobs()
+                planned = [company["smm_company_id"] for _, company, _ in await crawler.plan_recrawl(budget=100)]
+                await crawler.export_analyses(str(tmp_path / str(index)), "jsonl")
+                per_shard.append((queued, sorted(planned)))
+            return per_shard
+
+    per_shard = asyncio.run(scenario())
+    with_domain = [i for i in range(1, 41) if i % 7]
+    assert sum(queued for queued, _ in per_shard) == len(with_domain)
+    for index, (queued, planned) in enumerate(per_shard):
+        expected = [i for i in with_domain if company_shard(i, 3) == index]
+        assert planned == expected and queued == len(expected)
+        with gzip.open(tmp_path / str(index) / "crawler_version=1.0" / "analyses.jsonl.gz", "rt") as exported:
+            ids = sorted(json.loads(line)["smm_company_id"] for line in exported)
+        assert ids == sorted(i for i in range(1, 41) if company_shard(i, 3) == index)
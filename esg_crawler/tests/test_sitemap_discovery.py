@@ -0,0 +1,94 @@
+"""ESG URL discovery from robots.txt and sitemaps, and its per-domain cache"""
+
+import asyncio
+import gzip
+from urllib.parse import urlparse
+
+import aiohttp
+
+SITEMAP_NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(*paths, base=""):
+    return f"<?xml version='1.0'?><urlset {SITEMAP_NS}>" + "".join(
+        f"<url><loc>{base}{path}</loc></url>" for path in paths) + "</urlset>"
+
+
+def sitemap_index(*urls):
+    return f"<?xml version='1.0'?><sitemapindex {SITEMAP_NS}>" + "".join(
+        f"<sitemap><loc>{url}</loc></sitemap>" for url in urls) + "</sitemapindex>"
+
+
+def discover(crawler, site, path="/"):
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            return await crawler._discover_esg_urls(session, site.url(path))
+    return run()
+
+
+def test_robots_sitemap_index_reads_esg_children_first(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({}) as site:
+            site.pages.update({
+                "/robots.txt": f"User-agent: *\nSitemap: {site.url('/sitemap-index.xml')}\n",
+                "/sitemap-index.xml": sitemap_index(site.url("/sitemap-products.xml"),
+                                                    site.url("/sitemap-sustainability.xml")),
+                "/sitemap-products.xml": urlset("/products/pumps", "/products/valves", base=site.url("")),
+                "/sitemap-sustainability.xml": urlset("/sustainability", "/esg/report-2023", base=site.url("")),
+            })
+            crawler = crawler_factory(request_delay=0, sitemap_max_files=2)
+            return await discover(crawler, site), site.hits
+
+    discovery, hits = asyncio.run(scenario())
+    assert discovery["sitemap_source"] == "robots.txt"
+    # The index plus one child fit the budget, and the ESG-looking child goes first
+    assert discovery["sitemaps_read"] == 2
+    assert hits["/sitemap-products.xml"] == 0
+    assert [urlparse(url).path for url in discovery["esg_urls"]] == ["/sustainability", "/esg/report-2023"]
+    assert discovery["from_cache"] is False
+
+
+def test_default_sitemap_and_gzip(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({}) as site:
+            site.pages["/sitemap.xml"] = sitemap_index(site.url("/pages.xml.gz"))
+            site.pages["/pages.xml.gz"] = gzip.compress(urlset("/about", "/csr", base=site.url("")).encode())
+            return await discover(crawler_factory(request_delay=0), site)
+
+    discovery = asyncio.run(scenario())
+    assert discovery["sitemap_source"] == "default"
+    assert discovery["urls_scanned"] == 2
+    assert [urlparse(url).path for url in discovery["esg_urls"]] == ["/csr"]
+
+
+def test_url_budget_stops_scanning(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({}) as site:
+            paths = [f"/products/{i}" for i in range(20)] + ["/sustainability"]
+            site.pages["/sitemap.xml"] = urlset(*paths, base=site.url(""))
+            return await discover(crawler_factory(request_delay=0, sitemap_max_urls=10), site)
+
+    discovery = asyncio.run(scenario())
+    assert discovery["urls_scanned"] == 10
+    assert discovery["esg_urls"] == []
+
+
+def test_discovery_is_cached_per_domain(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({}) as site:
+            site.pages["/sitemap.xml"] = urlset("/sustainability", base=site.url(""))
+            crawler = crawler_factory(request_delay=0)
+            concurrent = await asyncio.gather(discover(crawler, site, "/"), discover(crawler, site, "/about"))
+            later = await discover(crawler, site)
+            hits = dict(site.hits)
+
+            expired = crawler_factory(request_delay=0, discovery_cache_ttl=0)
+            await discover(expired, site)
+            await discover(expired, site)
+            return concurrent, later, hits, site.hits["/sitemap.xml"] - hits["/sitemap.xml"]
+
+    concurrent, later, hits, hits_without_ttl = asyncio.run(scenario())
+    assert hits == {"/robots.txt": 1, "/sitemap.xml": 1}
+    assert sorted(result["from_cache"] for result in concurrent) == [False, True]
+    assert later["from_cache"] is True and later["esg_urls"] == concurrent[0]["esg_urls"]
+    assert hits_without_ttl == 2
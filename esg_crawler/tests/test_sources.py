@@ -0,0 +1,203 @@
+"""Company sources and result sinks (--source / --sink) outside smm_companies"""
+
+import asyncio
+import csv
+import json
+import sqlite3
+
+import pytest
+
+from conftest import ESG_PAGE, PLAIN_PAGE, attach_pool
+from esg_crawler import (CompanySource, CsvCompanySource, FileCompanySource, JsonlCompanySource, JsonlResultSink,
+                         ParquetResultSink, ResultSink, SqliteCompanySource, SqliteResultSink, company_shard,
+                         company_source_for_path, result_sink_for_path)
+
+
+def test_base_classes_are_abstract():
+    for base in (CompanySource, ResultSink):
+        with pytest.raises(TypeError):
+            base()
+
+    class NoRecords(FileCompanySource):
+        pass
+
+    with pytest.raises(TypeError):
+        NoRecords("companies.csv")
+
+
+def test_file_kind_follows_the_extension(tmp_path):
+    assert type(company_source_for_path("a.csv.gz")) is CsvCompanySource
+    assert type(company_source_for_path("a.ndjson")) is JsonlCompanySource
+    assert type(company_source_for_path("a.sqlite3")) is SqliteCompanySource
+    assert type(result_sink_for_path("a.jsonl.gz")) is JsonlResultSink
+    assert type(result_sink_for_path("a.db")) is SqliteResultSink
+    assert type(result_sink_for_path("a.parquet")) is ParquetResultSink
+    for pick in (company_source_for_path, result_sink_for_path):
+        with pytest.raises(ValueError):
+            pick("a.txt")
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["smm_company_id", "name", "website", "esg_info"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_file_sources_apply_the_database_selection(crawler_factory, tmp_path):
+    path = tmp_path / "companies.csv"
+    write_csv(path, [
+        {"smm_company_id": i, "name": f"Company {i}", "website": "" if i == 3 else f"https://example.com/{i}",
+         "esg_info": json.dumps([{"crawler_version": "1.0"}]) if i == 2 else ""}
+        for i in range(1, 21)
+    ])
+
+    async def selected(crawler, force=False):
+        batches = [batch async for batch in CsvCompanySource(str(path)).batches(crawler, 4, force)]
+        assert all(len(batch) <= 4 for batch in batches)
+        return [company["smm_company_id"] for batch in batches for company in batch]
+
+    everyone = [i for i in range(1, 21) if i != 3]
+    assert asyncio.run(selected(crawler_factory())) == [i for i in everyone if i != 2]
+    assert asyncio.run(selected(crawler_factory(), force=True)) == everyone
+    assert asyncio.run(selected(crawler_factory(shard=(1, 2)), force=True)) == \
+        [i for i in everyone if company_shard(i, 2) == 1]
+
+
+def test_csv_into_jsonl_replaces_unless_appending(crawler_factory, local_site, tmp_path):
+    source_path, sink_path = tmp_path / "companies.csv", tmp_path / "results.jsonl"
+
+    async def scenario():
+        async with local_site({"/esg": ESG_PAGE, "/plain": PLAIN_PAGE}) as site:
+            write_csv(source_path, [{"smm_company_id": 1, "name": "One", "website": site.url("/esg"), "esg_info": ""},
+                                    {"smm_company_id": 2, "name": "Two", "website": site.url("/plain"), "esg_info": ""}])
+            for append in (False, True, False):
+                crawler = crawler_factory(request_delay=0)
+                crawler.source = CsvCompanySource(str(source_path))
+                crawler.sink = JsonlResultSink(str(sink_path), append=append)
+                await crawler.process_source(batch_size=2, force_reanalysis=True)
+                yield read_jsonl(sink_path)
+
+    async def collect():
+        return [lines async for lines in scenario()]
+
+    first, appended, replaced = asyncio.run(collect())
+    assert len(first) == 2 and len(appended) == 4 and len(replaced) == 2
+    results = {line["smm_company_id"]: line for line in replaced}
+    assert results[1]["esg_info"][0]["has_esg_reports"] and not results[2]["esg_info"][0]["has_esg_reports"]
+    # The sink output is a valid source again
+    assert [record["smm_company_id"] for record in JsonlCompanySource(str(sink_path)).records()] == [1, 2]
+
+
+def test_sqlite_file_is_updated_in_place(crawler_factory, local_site, tmp_path):
+    path = str(tmp_path / "companies.sqlite")
+
+    async def scenario():
+        async with local_site({"/": ESG_PAGE}) as site:
+            sink = SqliteResultSink(path)
+            await sink.open()
+            await sink.close()
+            with sqlite3.connect(path) as conn:
+                conn.executemany("INSERT INTO smm_companies VALUES (?, ?, ?, ?)",
+                                 [(1, "One", site.url("/"), None),
+                                  (2, "Two", site.url("/"), json.dumps([{"crawler_version": "1.0"}]))])
+            crawler = crawler_factory(request_delay=0)
+            crawler.source, crawler.sink = SqliteCompanySource(path), SqliteResultSink(path)
+            await crawler.process_source(batch_size=10)
+            return site.hits["/"]
+
+    hits = asyncio.run(scenario())
+    assert hits == 1
+    with sqlite3.connect(path) as conn:
+        rows = dict(conn.execute("SELECT smm_company_id, esg_info FROM smm_companies").fetchall())
+    assert json.loads(rows[1])[0]["has_esg_reports"] is True
+    assert json.loads(rows[2]) == [{"crawler_version": "1.0"}]
+
+
+def test_jsonl_sink_replaces_the_file_only_when_closed(crawler_factory, tmp_path):
+    path = tmp_path / "results.jsonl.gz"
+    path.write_bytes(b"previous run")
+    company = {"smm_company_id": 1, "name": "One", "website": "https://example.com", "esg_info": None}
+
+    async def scenario():
+        sink = JsonlResultSink(str(path))
+        await sink.open()
+        await sink.write(crawler_factory(), company, {})
+        during = path.read_bytes(), sorted(p.name for p in tmp_path.iterdir())
+        await sink.close()
+        return during
+
+    during, files_during = asyncio.run(scenario())
+    # A run that dies before closing leaves the previous file in place
+    assert during == b"previous run" and len(files_during) == 2
+    assert [record["smm_company_id"] for record in JsonlCompanySource(str(path)).records()] == [1]
+    assert [p.name for p in tmp_path.iterdir()] == ["results.jsonl.gz"]
+
+
+def test_parquet_sinks_cannot_be_appended_to():
+    with pytest.raises(ValueError):
+        result_sink_for_path("results.parquet", append=True)
+
+
+def test_read_only_modes_leave_the_sink_closed(crawler_factory, database, tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"smm_company_id": 1}\n')
+
+    async def scenario():
+        # The fixture skips without a test database; init_database connects with the same settings
+        async with database([]):
+            crawler = crawler_factory()
+            crawler.sink = JsonlResultSink(str(path))
+            await crawler.init_database()
+            opened = crawler.sink._file is not None
+            await crawler.close_database()
+            return opened
+
+    assert asyncio.run(scenario()) is False
+    assert path.read_text() == '{"smm_company_id": 1}\n'
+
+
+def test_single_company_is_written_through_the_sink(crawler_factory, database, local_site, tmp_path):
+    path = tmp_path / "results.jsonl"
+
+    async def scenario():
+        async with local_site({"/": ESG_PAGE}) as site:
+            async with database([(1, "One", "https://stale.example", [{"crawler_version": "2.0"}])]) as pool:
+                crawler = crawler_factory(request_delay=0)
+                crawler.sink = JsonlResultSink(str(path))
+                await attach_pool(crawler, pool).process_single_company(1, site.url("/"))
+                return site.url("/"), await pool.fetchval("SELECT esg_info::text FROM smm_companies")
+
+    website, stored = asyncio.run(scenario())
+    [line] = read_jsonl(path)
+    assert line["name"] == "One" and line["website"] == website
+    assert [entry["crawler_version"] for entry in line["esg_info"]] == ["2.0", "1.0"]
+    # The database row is left alone when a file sink is given
+    assert json.loads(stored) == [{"crawler_version": "2.0"}]
+
+
+def test_single_company_from_a_file_source_needs_no_database(crawler_factory, local_site, tmp_path):
+    source_path, sink_path = tmp_path / "companies.csv", tmp_path / "results.jsonl"
+
+    async def no_database(open_sink=False):
+        raise AssertionError("the database was opened")
+
+    async def scenario():
+        async with local_site({"/": ESG_PAGE}) as site:
+            write_csv(source_path, [{"smm_company_id": 1, "name": "One", "website": "https://stale.example",
+                                     "esg_info": json.dumps([{"crawler_version": "2.0"}])}])
+            crawler = crawler_factory(request_delay=0)
+            crawler.source, crawler.sink = CsvCompanySource(str(source_path)), JsonlResultSink(str(sink_path))
+            crawler.init_database = no_database
+            await crawler.process_single_company(1, site.url("/"))
+            return site.url("/")
+
+    website = asyncio.run(scenario())
+    [line] = read_jsonl(sink_path)
+    assert line["name"] == "One" and line["website"] == website
+    assert [entry["crawler_version"] for entry in line["esg_info"]] == ["2.0", "1.0"]
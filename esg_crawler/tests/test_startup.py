@@ -0,0 +1,35 @@
+"""Import-time behavior: heavy NLP libraries and logging are deferred to first use"""
+
+import os
+import subprocess
+import sys
+
+CRAWLER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code: str) -> str:
+    result = subprocess.run([sys.executable, "-c", code], cwd=CRAWLER_DIR, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def test_import_does_not_load_nlp_libraries():
+    output = run_python(
+        "import sys, esg_crawler; "
+        "print(sorted(m for m in ('nltk', 'numpy') if m in sys.modules), esg_crawler.NLP_AVAILABLE)"
+    )
+    assert output == "[] None"
+
+
+def test_import_does_not_configure_logging():
+    output = run_python("import logging, esg_crawler; print(len(logging.getLogger().handlers))")
+    assert output == "0"
+
+
+def test_non_nlp_versions_do_not_load_nlp_libraries():
+    output = run_python(
+        "import sys, esg_crawler; "
+        "crawler = esg_crawler.ESGReportCrawler(esg_crawler.CrawlerConfig(), version='3.0'); "
+        "crawler.analyze_html_batch([('https://example.com', '<html><body>Sustainability report</body></html>')]); "
+        "print('nltk' in sys.modules)"
+    )
+    assert output == "False"
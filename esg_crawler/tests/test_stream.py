@@ -0,0 +1,126 @@
+"""Bounded-concurrency streaming analysis and cancellation on early close"""
+
+import asyncio
+
+from conftest import ESG_PAGE, PLAIN_PAGE
+
+
+def test_stream_yields_every_website_with_its_index(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({"/esg": ESG_PAGE, "/plain": PLAIN_PAGE}) as site:
+            crawler = crawler_factory(request_delay=0)
+
+            async def websites():
+                for path in ("/esg", "/plain", "/missing"):
+                    yield site.url(path)
+
+            return [item async for item in crawler.stream_analyze_companies(websites(), concurrency=2)]
+
+    results = dict(asyncio.run(scenario()))
+    assert sorted(results) == [0, 1, 2]
+    assert results[0].has_esg_reports and not results[1].has_esg_reports
+    assert results[2].website_analysis["status_code"] == 404
+
+
+def test_closing_early_cancels_and_awaits_analyses_in_flight(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({"/fast": PLAIN_PAGE, "/slow": PLAIN_PAGE}) as site:
+            crawler = crawler_factory(request_delay=0)
+            fetch_website = crawler._fetch_website
+            cancelled = []
+
+            async def fetch(website):
+                if "/slow" in website:
+                    try:
+                        await asyncio.sleep(30)
+                    except asyncio.CancelledError:
+                        cancelled.append(website)
+                        raise
+                return await fetch_website(website)
+
+            crawler._fetch_website = fetch
+            stream = crawler.stream_analyze_companies([site.url("/slow"), site.url("/slow?copy"), site.url("/fast")])
+            first = await stream.__anext__()
+            await stream.aclose()
+            others = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            return first, cancelled, others, crawler._url_flights
+
+    (index, _), cancelled, others, flights = asyncio.run(scenario())
+    assert index == 2
+    # Both slow analyses were cancelled and had finished unwinding when aclose() returned
+    assert len(cancelled) == 2
+    assert others == [] and flights == {}
+
+
+def test_shared_analysis_survives_until_its_last_caller_leaves(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({"/": PLAIN_PAGE}) as site:
+            crawler = crawler_factory(request_delay=0)
+            fetch_website = crawler._fetch_website
+            release = asyncio.Event()
+
+            async def fetch(website):
+                await release.wait()
+                return await fetch_website(website)
+
+            crawler._fetch_website = fetch
+            callers = [asyncio.ensure_future(crawler.analyze_company_website(site.url("/"))) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            callers[0].cancel()
+            await asyncio.sleep(0.01)
+            release.set()
+            return await callers[1], site.hits["/"]
+
+    result, hits = asyncio.run(scenario())
+    assert hits == 1 and result.website_analysis["status_code"] == 200
+
+
+def test_batch_analysis_is_bounded_by_max_concurrency(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({"/": PLAIN_PAGE}) as site:
+            crawler = crawler_factory(request_delay=0, max_concurrency=3)
+            fetch_website = crawler._fetch_website
+            running, peak = 0, 0
+
+            async def counting_fetch(website):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                try:
+                    await asyncio.sleep(0.02)
+                    return await fetch_website(website)
+                finally:
+                    running -= 1
+
+            crawler._fetch_website = counting_fetch
+            results = await crawler.batch_analyze_companies([site.url(f"/?page={i}") for i in range(10)])
+            return peak, results
+
+    peak, results = asyncio.run(scenario())
+    assert peak == 3
+    assert len(results) == 10 and all(results)
+
+
+def test_streams_keep_their_own_completed_results(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({"/": ESG_PAGE, "/other": PLAIN_PAGE}) as site:
+            crawler = crawler_factory(request_delay=0)
+            other_stream_done = asyncio.Event()
+
+            async def websites():
+                yield site.url("/")
+                await other_stream_done.wait()
+                yield site.url("/")
+
+            async def first_stream():
+                return [item async for item in crawler.stream_analyze_companies(websites(), concurrency=1)]
+
+            first = asyncio.ensure_future(first_stream())
+            while not site.hits["/"]:
+                await asyncio.sleep(0.01)
+            other = [item async for item in crawler.stream_analyze_companies([site.url("/other")])]
+            other_stream_done.set()
+            return site.hits["/"], len(await first), len(other)
+
+    # Closing the second stream does not drop the first stream's result for "/"
+    assert asyncio.run(scenario()) == (1, 2, 1)
@@ -0,0 +1,95 @@
+"""Per-URL analysis sharing: in-flight coalescing, forced bypass and batch scope"""
+
+import asyncio
+from collections import OrderedDict
+
+from conftest import ESG_PAGE, PLAIN_PAGE
+
+
+def test_concurrent_calls_share_one_fetch(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({"/": ESG_PAGE}) as site:
+            crawler = crawler_factory(request_delay=0)
+            results = await asyncio.gather(*(crawler.analyze_company_website_versions(site.url("/"), ["1.0"])
+                                             for _ in range(3)))
+            return site.hits["/"], results
+
+    hits, results = asyncio.run(scenario())
+    assert hits == 1
+    # Every caller gets its own copy
+    assert len({id(result["1.0"].crawling_evidence) for result in results}) == 3
+
+
+def test_forced_analysis_fetches_again(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({"/": PLAIN_PAGE}) as site:
+            crawler = crawler_factory(request_delay=0)
+            url_results = OrderedDict()
+            first = await crawler.analyze_company_website_versions(site.url("/"), ["1.0"], url_results=url_results)
+            site.pages["/"] = ESG_PAGE
+            cached = await crawler.analyze_company_website_versions(site.url("/"), ["1.0"], url_results=url_results)
+            forced = await crawler.analyze_company_website_versions(site.url("/"), ["1.0"], reuse_stored=False,
+                                                                    url_results=url_results)
+            return site.hits["/"], first["1.0"], cached["1.0"], forced["1.0"]
+
+    hits, first, cached, forced = asyncio.run(scenario())
+    assert hits == 2
+    assert not first.has_esg_reports and not cached.has_esg_reports
+    assert forced.has_esg_reports
+
+
+def test_completed_results_are_only_reused_through_the_callers_cache(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({"/": ESG_PAGE}) as site:
+            crawler = crawler_factory(request_delay=0)
+            for _ in range(2):
+                await crawler.analyze_company_website_versions(site.url("/"), ["1.0"])
+            return site.hits["/"], crawler._url_flights
+
+    hits, flights = asyncio.run(scenario())
+    assert hits == 2
+    assert not flights
+
+
+def test_results_are_shared_within_a_batch_only(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({"/": ESG_PAGE}) as site:
+            crawler = crawler_factory(request_delay=0)
+            companies = [{"smm_company_id": i, "website": site.url("/")} for i in range(1, 4)]
+
+            async def handle(i, company, url_results):
+                await crawler.analyze_company_website_versions(company["website"], ["1.0"],
+                                                               company_id=company["smm_company_id"],
+                                                               url_results=url_results)
+
+            await crawler._run_company_tasks(companies, handle)
+            hits_after_first_batch = site.hits["/"]
+            await crawler._run_company_tasks(companies, handle)
+            return hits_after_first_batch, site.hits["/"]
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_finishing_a_batch_keeps_the_results_of_overlapping_batches(crawler_factory, local_site):
+    async def scenario():
+        async with local_site({"/": ESG_PAGE, "/other": PLAIN_PAGE}) as site:
+            crawler = crawler_factory(request_delay=0)
+            short_batch_done = asyncio.Event()
+
+            async def long_handle(i, company, url_results):
+                await crawler.analyze_company_website_versions(site.url("/"), ["1.0"], url_results=url_results)
+                await short_batch_done.wait()
+                await crawler.analyze_company_website_versions(site.url("/"), ["1.0"], url_results=url_results)
+
+            async def short_handle(i, company, url_results):
+                await crawler.analyze_company_website_versions(site.url("/other"), ["1.0"], url_results=url_results)
+
+            long_batch = asyncio.ensure_future(crawler._run_company_tasks([{"smm_company_id": 1}], long_handle))
+            while not site.hits["/"]:
+                await asyncio.sleep(0.01)
+            await crawler._run_company_tasks([{"smm_company_id": 2}], short_handle)
+            short_batch_done.set()
+            await long_batch
+            return site.hits["/"], site.hits["/other"]
+
+    assert asyncio.run(scenario()) == (1, 1)
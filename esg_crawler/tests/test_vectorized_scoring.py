@@ -0,0 +1,67 @@
+"""Batched, vectorized v2-v4 scoring reproduces the per-page detectors"""
+
+import pytest
+from bs4 import BeautifulSoup
+
+import esg_crawler
+from esg_crawler import score_feature_matrix, scoring_feature_vector, merge_scoring
+from test_cascade import borderline_pages
+
+np = pytest.importorskip("numpy")
+esg_crawler._load_numpy()
+
+PAGES = [html for _, html in borderline_pages()]
+
+
+def per_page(crawler, html, version):
+    soup = BeautifulSoup(html, "html.parser")
+    crawler._detection_memo = {}
+    try:
+        return crawler._detect_with_memo(soup, version)
+    finally:
+        crawler._detection_memo = None
+
+
+@pytest.mark.parametrize("version", ["2.0", "3.0"])
+def test_batch_matches_per_page_detection(crawler_factory, version):
+    crawler = crawler_factory(version=version)
+    soups = [BeautifulSoup(html, "html.parser") for html in PAGES]
+    batch = crawler.detect_esg_content_batch(soups, version)
+    
+    for html, (has_esg, evidence) in zip(PAGES, batch):
+        expected_has_esg, expected = per_page(crawler, html, version)
+        assert has_esg == expected_has_esg
+        assert evidence["sustainability_score"] == pytest.approx(expected["sustainability_score"])
+        assert evidence["confidence_level"] == pytest.approx(expected["confidence_level"])
+
+
+@pytest.mark.parametrize("strength", [0.0, 0.35, 0.7, 1.0])
+def test_v4_matrix_matches_scalar_formula(crawler_factory, monkeypatch, strength):
+    monkeypatch.setattr(esg_crawler, "_load_nlp_libraries", lambda: True)
+    monkeypatch.setattr(esg_crawler.ESGReportCrawler, "_ensure_nltk_data", lambda self: None)
+    crawler = crawler_factory(version="4.0")
+    crawler._perform_nlp_analysis = lambda text, sentences=None, esg_sentiment=None: {
+        "sentiment_analysis": {"esg_specific_sentiment": 0.4},
+        "esg_topics_identified": [{}] * 3,
+        "commitment_strength": strength,
+        "credibility_indicators": {"overall_credibility": 0.5, "has_verification": True},
+        "forward_looking_statements": ["a", "b"],
+        "named_entities": [{}] * 4,
+    }
+    
+    detections = [per_page(crawler, html, "4.0") for html in PAGES]
+    matrix = np.array([scoring_feature_vector(evidence) for _, evidence in detections])
+    scores, confidences, has_esg = score_feature_matrix(matrix, "4.0")
+    
+    assert list(has_esg) == [decision for decision, _ in detections]
+    assert scores == pytest.approx([evidence["sustainability_score"] for _, evidence in detections])
+    assert confidences == pytest.approx([evidence["confidence_level"] for _, evidence in detections])
+
+
+def test_merge_scoring_rejects_unknown_parameters():
+    assert merge_scoring({"4.0": {"score_threshold": 3.5}})["4.0"]["score_threshold"] == 3.5
+    assert esg_crawler.DEFAULT_SCORING["4.0"]["score_threshold"] == 3.0
+    with pytest.raises(ValueError):
+        merge_scoring({"4.0": {"no_such_weight": 1.0}})
+    with pytest.raises(ValueError):
+        merge_scoring({"5.0": {}})
@@ -0,0 +1,131 @@
+"""Opt-in esg_version_stats summary table and its fallback to live counts"""
+
+import asyncio
+import json
+
+from conftest import make_companies
+
+
+def companies_with_history():
+    companies = make_companies(12)
+    analyzed = {1: ["1.0"], 2: ["1.0", "3.0"], 3: ["3.0"], 7: ["1.0"]}
+    return [(company_id, name, domain, [{"crawler_version": version} for version in analyzed.get(company_id, [])] or None)
+            for company_id, name, domain, _ in companies]
+
+
+async def counts(crawler):
+    return (await crawler.get_total_companies_count(), await crawler.get_total_companies_count(force_reanalysis=True),
+            await crawler.get_version_analysis_statistics())
+
+
+async def stats_table_exists(pool):
+    return await pool.fetchval("SELECT to_regclass('esg_version_stats') IS NOT NULL")
+
+
+def test_counting_never_installs_the_summary_table(crawler_factory, database):
+    async def scenario():
+        async with database(companies_with_history()) as pool:
+            results = []
+            for summary_stats in (False, True):
+                crawler = crawler_factory(versions=["1.0", "3.0"], summary_stats=summary_stats)
+                crawler.db_pool = pool
+                results.append(await counts(crawler))
+            return results, await stats_table_exists(pool)
+
+    (default, opted_in), installed = asyncio.run(scenario())
+    assert not installed
+    # Company 7 has no website; only company 2 has both versions
+    assert default == opted_in == (10, 11, {"1.0": 2, "3.0": 2})
+
+
+def test_installed_summary_matches_live_counts_and_follows_writes(crawler_factory, database):
+    async def scenario():
+        async with database(companies_with_history()) as pool:
+            live = crawler_factory(versions=["1.0", "3.0"])
+            live.db_pool = pool
+            summary = crawler_factory(versions=["1.0", "3.0"], summary_stats=True)
+            summary.db_pool = pool
+            await summary.install_version_stats()
+
+            before = (await counts(live), await counts(summary))
+            await pool.execute("UPDATE smm_companies SET esg_info = $1 WHERE smm_company_id = 4",
+                               json.dumps([{"crawler_version": "1.0"}, {"crawler_version": "3.0"}]))
+            await pool.execute("UPDATE smm_companies SET primary_domain = NULL WHERE smm_company_id = 5")
+            after = (await counts(live), await counts(summary))
+            version_sets = await pool.fetchval("SELECT COUNT(DISTINCT analyzed_versions) FROM esg_version_stats")
+            return before, after, version_sets
+
+    before, after, version_sets = asyncio.run(scenario())
+    assert before[0] == before[1] == (10, 11, {"1.0": 2, "3.0": 2})
+    assert after[0] == after[1] == (8, 10, {"1.0": 3, "3.0": 3})
+    assert version_sets <= 2 ** 2
+
+
+async def writers_in_different_slots(pool, connections):
+    """Two connections whose trigger writes land in different counter slots"""
+    by_slot = {}
+    for conn in connections:
+        by_slot.setdefault(await conn.fetchval("SELECT pg_backend_pid() % 16"), conn)
+    assert len(by_slot) >= 2, "all test connections share one counter slot"
+    return list(by_slot.values())[:2]
+
+
+def test_concurrent_writers_do_not_wait_on_one_counter_row(crawler_factory, database):
+    async def scenario():
+        async with database(companies_with_history()) as pool:
+            summary = crawler_factory(versions=["1.0", "3.0"], summary_stats=True)
+            summary.db_pool = pool
+            await summary.install_version_stats()
+            
+            connections = [await pool.acquire() for _ in range(3)]
+            try:
+                first, second = await writers_in_different_slots(pool, connections)
+                analyzed = json.dumps([{"crawler_version": "1.0"}])
+                # Both updates move a company from the unanalyzed set to {"1.0"}
+                first_tx = first.transaction()
+                await first_tx.start()
+                await first.execute("UPDATE smm_companies SET esg_info = $1 WHERE smm_company_id = 4", analyzed)
+                await second.execute("SET lock_timeout = '2s'")
+                async with second.transaction():
+                    await second.execute("UPDATE smm_companies SET esg_info = $1 WHERE smm_company_id = 5", analyzed)
+                during = await counts(summary)
+                await first_tx.commit()
+            finally:
+                for conn in connections:
+                    await pool.release(conn)
+            
+            live = crawler_factory(versions=["1.0", "3.0"])
+            live.db_pool = pool
+            return during, await counts(summary), await counts(live)
+
+    during, after, live = asyncio.run(scenario())
+    # Only the committed second write is visible while the first is open
+    assert during == (10, 11, {"1.0": 3, "3.0": 2})
+    assert after == live == (10, 11, {"1.0": 4, "3.0": 2})
+
+
+def test_rebuild_does_not_block_or_lose_open_writes(crawler_factory, database):
+    async def scenario():
+        async with database(companies_with_history()) as pool:
+            summary = crawler_factory(versions=["1.0", "3.0"], summary_stats=True)
+            summary.db_pool = pool
+            await summary.install_version_stats()
+            
+            async with pool.acquire() as writer:
+                writer_tx = writer.transaction()
+                await writer_tx.start()
+                await writer.execute("UPDATE smm_companies SET esg_info = $1 WHERE smm_company_id = 4",
+                                     json.dumps([{"crawler_version": "3.0"}]))
+                await writer.execute("DELETE FROM smm_companies WHERE smm_company_id = 1")
+                # The rebuild must not wait for the open transaction
+                await asyncio.wait_for(summary.install_version_stats(), timeout=5)
+                during = await counts(summary)
+                await writer_tx.commit()
+            
+            live = crawler_factory(versions=["1.0", "3.0"])
+            live.db_pool = pool
+            return during, await counts(summary), await counts(live)
+
+    during, after, live = asyncio.run(scenario())
+    assert during == (10, 11, {"1.0": 2, "3.0": 2})
+    assert after == live == (9, 10, {"1.0": 1, "3.0": 3})
@@ -0,0 +1,52 @@
+"""Watch mode (--watch): notified companies are analyzed from a fresh fetch in micro-batches"""
+
+import asyncio
+import json
+
+from conftest import attach_pool
+from test_near_duplicates import PARKED_PAGE
+
+
+async def wait_for_analysis(pool, company_id, count=1):
+    for _ in range(200):
+        esg_info = await pool.fetchval("SELECT esg_info FROM smm_companies WHERE smm_company_id = $1", company_id)
+        if esg_info and len(json.loads(esg_info)) >= count:
+            return json.loads(esg_info)
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"company {company_id} was not analyzed")
+
+
+def test_batches_share_no_results_or_pages(crawler_factory, database, local_site):
+    async def scenario():
+        async with local_site({"/": PARKED_PAGE.format(domain="first.example")}) as site:
+            async with database() as pool:
+                crawler = attach_pool(crawler_factory(request_delay=0, dedupe_pages=True), pool)
+                watcher = asyncio.ensure_future(crawler.watch_companies(batch_window=0.1))
+                try:
+                    while not await pool.fetchval("SELECT COUNT(*) FROM pg_trigger "
+                                                  "WHERE tgrelid = 'smm_companies'::regclass"):
+                        await asyncio.sleep(0.05)
+                    # Give the watcher time to LISTEN after creating the trigger
+                    await asyncio.sleep(0.2)
+
+                    await pool.execute("INSERT INTO smm_companies (smm_company_id, name, primary_domain) "
+                                       "VALUES (1, 'Company 1', $1)", site.url("/"))
+                    first = await wait_for_analysis(pool, 1)
+                    await asyncio.sleep(0.1)
+                    state_after_batch = (len(crawler._page_index), len(crawler._url_flights))
+
+                    site.pages["/"] = PARKED_PAGE.format(domain="second.example")
+                    await pool.execute("INSERT INTO smm_companies (smm_company_id, name, primary_domain) "
+                                       "VALUES (2, 'Company 2', $1)", site.url("/"))
+                    second = await wait_for_analysis(pool, 2)
+                finally:
+                    watcher.cancel()
+                    await asyncio.gather(watcher, return_exceptions=True)
+                return site.hits["/"], state_after_batch, first[0], second[0]
+
+    hits, state_after_batch, first, second = asyncio.run(scenario())
+    assert hits == 2
+    assert state_after_batch == (0, 0)
+    assert "reused_from" not in second["crawling_evidence"]
+    assert first["website_analysis"]["content_fingerprint"] != second["website_analysis"]["content_fingerprint"]
+